@@ -0,0 +1,104 @@
+"""
+文件删除功能测试脚本
+"""
+
+import logging
+import tempfile
+from pathlib import Path
+
+# 添加项目根目录到路径
+import sys
+sys.path.append(str(Path(__file__).parent.parent))
+
+from toolkits.file.file_deleter import FileDeleter
+
+
+def setup_test_environment():
+    """创建测试环境"""
+    temp_dir = Path(tempfile.mkdtemp())
+    print(f"创建临时测试目录: {temp_dir}")
+
+    (temp_dir / "logs" / "old").mkdir(parents=True)
+    (temp_dir / "keep").mkdir()
+    test_files = [
+        temp_dir / "a.log",
+        temp_dir / "a.txt",
+        temp_dir / "logs" / "b.log",
+        temp_dir / "logs" / "old" / "c.log",
+        temp_dir / "keep" / "d.log",
+        temp_dir / "keep" / "e.txt",
+    ]
+    for file_path in test_files:
+        file_path.write_text(f"测试文件: {file_path.name}")
+
+    # 同一目录下的大量文件会拆成多批并行删除
+    (temp_dir / "many").mkdir()
+    for i in range(1200):
+        (temp_dir / "many" / f"f{i}.log").write_text("x")
+
+    return temp_dir
+
+
+def test_delete_and_remove_empty_dirs():
+    """测试删除匹配的文件，并删除因此变空的目录（不含根目录）"""
+    print("\n" + "="*60)
+    print("测试 1: 删除文件并清理空目录")
+    print("="*60)
+
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    temp_dir = setup_test_environment()
+    deleter = FileDeleter(logger=logging.getLogger("test_deleter"))
+
+    files, errors = deleter.find_files(str(temp_dir), "扩展名匹配", "log")
+    assert len(files) == 1204 and not errors
+
+    deleted, errors = deleter.delete_files(
+        files, remove_empty_dirs=True, root_dir=str(temp_dir)
+    )
+    assert deleted == 1204 and not errors
+
+    remaining = sorted(
+        str(path.relative_to(temp_dir)) for path in temp_dir.rglob("*")
+    )
+    print(f"剩余: {remaining}")
+    assert remaining == ["a.txt", "keep", str(Path("keep") / "e.txt")]
+
+
+def test_delete_reports_missing_files():
+    """测试已不存在的文件记为错误，其余文件照常删除"""
+    print("\n" + "="*60)
+    print("测试 2: 删除时文件已不存在")
+    print("="*60)
+
+    temp_dir = setup_test_environment()
+    deleter = FileDeleter(logger=logging.getLogger("test_deleter"))
+
+    files = [temp_dir / "a.log", temp_dir / "missing.log", temp_dir / "a.txt"]
+    deleted, errors = deleter.delete_files(files)
+    assert deleted == 2
+    assert len(errors) == 1 and "missing.log" in errors[0]
+    assert not (temp_dir / "a.txt").exists()
+    assert (temp_dir / "logs" / "b.log").exists()
+
+
+def main():
+    """运行所有测试"""
+    print("文件删除功能测试")
+    print("="*60)
+
+    try:
+        test_delete_and_remove_empty_dirs()
+        test_delete_reports_missing_files()
+
+        print("\n" + "="*60)
+        print("✓ 所有测试完成!")
+        print("="*60)
+
+    except Exception as e:
+        print(f"\n✗ 测试失败: {e}")
+        import traceback
+        traceback.print_exc()
+
+
+if __name__ == "__main__":
+    main()
@@ -165,6 +165,296 @@ def test_with_name_filter():
     return temp_dir
 
 
+def test_nested_output_dir():
+    """测试输出目录位于输入目录中：重复提取并覆盖时不会处理输出目录中的文件"""
+    print("\n" + "="*60)
+    print("测试 4: 输出目录位于输入目录中（重复提取并覆盖）")
+    print("="*60)
+
+    temp_dir = setup_test_environment()
+    output_dir = temp_dir / "level1" / "output_nested"
+    logger = logging.getLogger("test_nested")
+
+    for _ in range(2):
+        extractor = FileExtractor(
+            logger=logger,
+            input_dir=temp_dir,
+            output_dir=output_dir,
+            file_filter_strategy=None,
+            overwrite=True,
+        )
+        result = extractor.extract_files()
+        assert result["total_count"] == 8
+        assert result["success_count"] == 8
+        assert result["error_count"] == 0
+
+    assert sorted(f.name for f in output_dir.iterdir()) == sorted(
+        f"test{i}{ext}"
+        for i, ext in enumerate(
+            [".txt", ".doc", ".txt", ".xlsx", ".txt", ".pdf", ".txt", ".docx"], 1
+        )
+    )
+    assert (temp_dir / "test1.txt").read_text() == "测试文件: test1.txt"
+
+    return temp_dir
+
+
+def test_output_dir_same_as_input():
+    """测试输出目录与输入目录相同：不提取任何文件，源文件保持不变"""
+    print("\n" + "="*60)
+    print("测试 5: 输出目录与输入目录相同")
+    print("="*60)
+
+    temp_dir = setup_test_environment()
+    logger = logging.getLogger("test_same_dir")
+
+    extractor = FileExtractor(
+        logger=logger,
+        input_dir=temp_dir,
+        output_dir=temp_dir,
+        file_filter_strategy=None,
+        overwrite=True,
+    )
+    result = extractor.extract_files()
+
+    assert result["total_count"] == 0
+    assert (temp_dir / "test1.txt").read_text() == "测试文件: test1.txt"
+    assert (temp_dir / "level1" / "level2a" / "test5.txt").exists()
+
+    return temp_dir
+
+
+def test_archive_output_inside_input():
+    """测试输出压缩包位于输入目录中：压缩包及其临时文件不会被写入压缩包"""
+    print("\n" + "="*60)
+    print("测试 6: 输出压缩包位于输入目录中")
+    print("="*60)
+
+    import zipfile
+
+    temp_dir = setup_test_environment()
+    output_dir = temp_dir / "output_archive"
+    logger = logging.getLogger("test_archive")
+
+    for _ in range(2):
+        extractor = FileExtractor(
+            logger=logger,
+            input_dir=temp_dir,
+            output_dir=output_dir,
+            file_filter_strategy=None,
+            overwrite=True,
+            scan_archives=True,
+            archive_format="zip",
+        )
+        result = extractor.extract_files()
+        assert result["success_count"] == 8
+        assert result["error_count"] == 0
+
+    with zipfile.ZipFile(temp_dir / "output_archive.zip") as archive:
+        names = archive.namelist()
+    print(f"压缩包内容: {sorted(names)}")
+    assert len(names) == 8
+    assert not any(name.endswith((".zip", ".extracting")) for name in names)
+
+    return temp_dir
+
+
+def test_parallel_dir_extraction():
+    """测试并行提取文件夹：嵌套的匹配归并到最上层，内容与校验和和源一致"""
+    print("\n" + "="*60)
+    print("测试 7: 并行提取文件夹并计算校验和")
+    print("="*60)
+
+    import hashlib
+
+    temp_dir = setup_test_environment()
+    output_dir = temp_dir / "output_dirs"
+    logger = logging.getLogger("test_dirs")
+
+    extractor = FileExtractor(
+        logger=logger,
+        input_dir=temp_dir,
+        output_dir=output_dir,
+        file_filter_strategy=NameIncludeStrategy("level"),
+        extract_target="dirs",
+        max_workers=4,
+        checksum="sha256",
+    )
+    result = extractor.extract_files()
+    # level1 与其中的 level2a、level2b 都匹配，只复制最上层的 level1
+    assert result["total_count"] == 1
+    assert result["success_count"] == 1
+
+    source = temp_dir / "level1"
+    copied = output_dir / "level1"
+    source_files = sorted(p.relative_to(source) for p in source.rglob("*") if p.is_file())
+    copied_files = sorted(p.relative_to(copied) for p in copied.rglob("*") if p.is_file())
+    assert copied_files == source_files
+    for relative in source_files:
+        assert (copied / relative).read_bytes() == (source / relative).read_bytes()
+
+    lines = (output_dir / ".extract_checksums.sha256").read_text().splitlines()
+    assert len(lines) == len(source_files)
+    for line in lines:
+        digest, relative = line.split("  ", 1)
+        assert digest == hashlib.sha256((output_dir / relative).read_bytes()).hexdigest()
+
+    return temp_dir
+
+
+def test_checksums_kept_for_skipped_files():
+    """测试再次提取时，跳过的文件仍保留在校验和清单中，更新的文件只保留新校验和"""
+    print("\n" + "="*60)
+    print("测试 8: 再次提取时的校验和清单")
+    print("="*60)
+
+    import hashlib
+
+    temp_dir = setup_test_environment()
+    output_dir = temp_dir / "output_checksums"
+    logger = logging.getLogger("test_checksums")
+    manifest = output_dir / ".extract_checksums.sha256"
+
+    def extract(sync_mode=None):
+        return FileExtractor(
+            logger=logger,
+            input_dir=temp_dir,
+            output_dir=output_dir,
+            file_filter_strategy=ExtensionStrategy(["txt"]),
+            sync_mode=sync_mode,
+            checksum="sha256",
+        ).extract_files()
+
+    assert extract()["success_count"] == 4
+    # 再次提取：全部已存在而跳过，清单不变
+    assert extract()["skipped_count"] == 4
+    assert len(manifest.read_text().splitlines()) == 4
+
+    # 同步模式只更新变化的文件
+    (temp_dir / "test1.txt").write_text("已修改")
+    result = extract(sync_mode="quick")
+    assert result["success_count"] == 1 and result["skipped_count"] == 3
+
+    lines = manifest.read_text().splitlines()
+    assert len(lines) == 4
+    for line in lines:
+        digest, relative = line.split("  ", 1)
+        assert digest == hashlib.sha256((output_dir / relative).read_bytes()).hexdigest()
+
+    return temp_dir
+
+
+def test_overwrite_keeps_old_target_on_failure():
+    """测试覆盖已有目标：复制失败时旧目标不变，成功时整体替换（旧目录中多余的文件不残留）"""
+    print("\n" + "="*60)
+    print("测试 9: 覆盖已有目标")
+    print("="*60)
+
+    from unittest import mock
+    import toolkits.file.copy_engine as copy_engine
+
+    temp_dir = setup_test_environment()
+    output_dir = temp_dir / "output_overwrite"
+    logger = logging.getLogger("test_overwrite")
+
+    old_file = output_dir / "test1.txt"
+    old_dir = output_dir / "level1"
+    (old_dir / "stale").mkdir(parents=True)
+    (old_dir / "stale" / "old.txt").write_text("旧内容")
+    old_file.write_text("旧内容")
+
+    def extract(file_filter, extract_target="files"):
+        return FileExtractor(
+            logger=logger,
+            input_dir=temp_dir,
+            output_dir=output_dir,
+            file_filter_strategy=file_filter,
+            extract_target=extract_target,
+            overwrite=True,
+        ).extract_files()
+
+    with mock.patch.object(copy_engine, "copy_file", side_effect=OSError("模拟失败")):
+        assert extract(NameIncludeStrategy("test1"))["error_count"] == 1
+        assert extract(NameIncludeStrategy("level1"), "dirs")["error_count"] == 1
+    assert old_file.read_text() == "旧内容"
+    assert (old_dir / "stale" / "old.txt").read_text() == "旧内容"
+
+    assert extract(NameIncludeStrategy("test1"))["success_count"] == 1
+    assert old_file.read_text() == "测试文件: test1.txt"
+    assert extract(NameIncludeStrategy("level1"), "dirs")["success_count"] == 1
+    assert not (old_dir / "stale").exists()
+    assert (old_dir / "level2a" / "test5.txt").exists()
+    # 没有残留的临时文件
+    assert sorted(p.name for p in output_dir.iterdir()) == ["level1", "test1.txt"]
+
+    return temp_dir
+
+
+def test_archive_output_symlinks_and_failure():
+    """测试输出为压缩包：zip 与 tar 对符号链接的处理一致，写入失败时不保留压缩包"""
+    print("\n" + "="*60)
+    print("测试 10: 输出为压缩包")
+    print("="*60)
+
+    import tarfile
+    import zipfile
+    from unittest import mock
+    from toolkits.file.archive_sink import ArchiveSink
+
+    temp_dir = setup_test_environment()
+    input_dir = temp_dir / "level1"
+    (input_dir / "level2b" / "link.txt").symlink_to(input_dir / "test3.txt")
+    (input_dir / "level2b" / "linkdir").symlink_to(input_dir / "level2a")
+    logger = logging.getLogger("test_archive")
+
+    def extract(archive_format, output_dir):
+        return FileExtractor(
+            logger=logger,
+            input_dir=input_dir,
+            output_dir=output_dir,
+            file_filter_strategy=NameIncludeStrategy("level2b"),
+            extract_target="dirs",
+            archive_format=archive_format,
+        ).extract_files()
+
+    assert extract("zip", temp_dir / "out_zip")["success_count"] == 1
+    assert extract("tar", temp_dir / "out_tar")["success_count"] == 1
+    zip_path = temp_dir / "out_zip.zip"
+    tar_path = temp_dir / "out_tar.tar.gz"
+    with zipfile.ZipFile(zip_path) as zf:
+        zip_files = {
+            name: zf.read(name) for name in zf.namelist() if not name.endswith("/")
+        }
+    with tarfile.open(tar_path) as tf:
+        tar_files = {
+            m.name: tf.extractfile(m).read() for m in tf.getmembers() if m.isfile()
+        }
+    # 符号链接按指向的内容写入
+    assert zip_files == tar_files
+    assert zip_files["level2b/link.txt"] == "测试文件: test3.txt".encode()
+    assert "level2b/linkdir/test5.txt" in zip_files
+
+    # 写入失败时放弃整个压缩包，不留下临时文件
+    add_path = ArchiveSink._add_path
+
+    def failing_add_path(self, path, arcname):
+        add_path(self, path, arcname)
+        if arcname.endswith("test7.txt"):
+            raise OSError("模拟写入失败")
+
+    with mock.patch.object(ArchiveSink, "_add_path", failing_add_path):
+        try:
+            extract("zip", temp_dir / "out_failed")
+        except RuntimeError:
+            pass
+        else:
+            raise AssertionError("写入失败时应放弃压缩包")
+    assert not any(p.name.startswith(".out_failed") for p in temp_dir.iterdir())
+    assert not (temp_dir / "out_failed.zip").exists()
+
+    return temp_dir
+
+
 def main():
     """运行所有测试"""
     print("文件提取功能测试")
@@ -174,6 +464,13 @@ def main():
         test_basic_extraction()
         test_with_extension_filter()
         test_with_name_filter()
+        test_nested_output_dir()
+        test_output_dir_same_as_input()
+        test_archive_output_inside_input()
+        test_parallel_dir_extraction()
+        test_checksums_kept_for_skipped_files()
+        test_overwrite_keeps_old_target_on_failure()
+        test_archive_output_symlinks_and_failure()
 
         print("\n" + "="*60)
         print("✓ 所有测试完成!")
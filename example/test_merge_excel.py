@@ -0,0 +1,203 @@
+"""
+Excel 合并去重测试脚本
+"""
+
+import logging
+import tempfile
+from pathlib import Path
+
+# 添加项目根目录到路径
+import sys
+sys.path.append(str(Path(__file__).parent.parent))
+
+from openpyxl import Workbook, load_workbook
+
+from toolkits.excel.dedup import RowDeduplicator
+from toolkits.excel.merge_excel import ExcelMerger
+from toolkits.excel.sinks import SqliteSink
+
+
+def setup_test_environment():
+    """创建测试环境：两个数据从第 2 行开始的工作簿"""
+    temp_dir = Path(tempfile.mkdtemp())
+    print(f"创建临时测试目录: {temp_dir}")
+
+    input_dir = temp_dir / "input"
+    input_dir.mkdir()
+    for name, values in [("file1.xlsx", ["x", "y"]), ("file2.xlsx", ["x", "w"])]:
+        wb = Workbook()
+        ws = wb.active
+        for row, value in enumerate(values, start=2):
+            ws.cell(row=row, column=1, value=value)
+        wb.save(input_dir / name)
+
+    return temp_dir
+
+
+def merge_with_dedup(temp_dir: Path, max_workers: int) -> list:
+    """去重合并，返回每个输出工作表中非空单元格的 (坐标, 值)"""
+    output_file = temp_dir / f"merged_{max_workers}.xlsx"
+    logger = logging.getLogger("test_merge_excel")
+
+    with RowDeduplicator(header_rows=0) as deduplicator:
+        merger = ExcelMerger(
+            logger=logger,
+            input_dir=temp_dir / "input",
+            output_file=output_file,
+            max_workers=max_workers,
+            deduplicator=deduplicator,
+        )
+        assert merger.merge_excel() == 2
+
+    wb = load_workbook(output_file)
+    sheets = [
+        [
+            (cell.coordinate, cell.value)
+            for row in ws.iter_rows()
+            for cell in row
+            if cell.value is not None
+        ]
+        for ws in wb.worksheets
+    ]
+    print(f"合并结果 (max_workers={max_workers}): {sheets}")
+    return sheets
+
+
+def test_dedup_serial_and_parallel():
+    """测试跨文件去重：数据不从第 1 行开始时，串行与并行结果一致"""
+    print("\n" + "="*60)
+    print("测试 1: 跨文件去重（串行与并行）")
+    print("="*60)
+
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    temp_dir = setup_test_environment()
+
+    expected = [[("A2", "x"), ("A3", "y")], [("A2", "w")]]
+    assert merge_with_dedup(temp_dir, max_workers=1) == expected
+    assert merge_with_dedup(temp_dir, max_workers=2) == expected
+
+
+def test_sqlite_sink_header_conflicts():
+    """测试与来源列同名、只有大小写不同的表头不会覆盖数据"""
+    print("\n" + "="*60)
+    print("测试 2: SQLite 输出的表头冲突")
+    print("="*60)
+
+    import sqlite3
+
+    temp_dir = Path(tempfile.mkdtemp())
+    input_dir = temp_dir / "input"
+    input_dir.mkdir()
+    for name, header in [("a.xlsx", ["source", "Name"]), ("b.xlsx", ["name", "NAME"])]:
+        wb = Workbook()
+        ws = wb.active
+        ws.append(header)
+        ws.append([f"{name}-1", f"{name}-2"])
+        wb.save(input_dir / name)
+
+    output_file = temp_dir / "merged.db"
+    merger = ExcelMerger(
+        logger=logging.getLogger("test_merge_excel"),
+        input_dir=input_dir,
+        output_file=output_file,
+        sink=SqliteSink(),
+    )
+    assert merger.merge_excel() == 2
+
+    conn = sqlite3.connect(output_file)
+    conn.row_factory = sqlite3.Row
+    rows = [dict(row) for row in conn.execute("SELECT * FROM merged")]
+    conn.close()
+    print(f"合并结果: {rows}")
+
+    # 来源名称由命名策略生成，只比较其余列（先出现的大小写形式作为列名）
+    records = sorted(
+        sorted((name.lower(), value) for name, value in row.items() if name != "source")
+        for row in rows
+    )
+    assert records == [
+        [("name", "a.xlsx-2"), ("name_2", None), ("source_2", "a.xlsx-1")],
+        [("name", "b.xlsx-1"), ("name_2", "b.xlsx-2"), ("source_2", None)],
+    ]
+    assert not (temp_dir / "merged.db-wal").exists()
+
+
+def test_dedup_blank_key_cells():
+    """测试按键列去重：键列全空的行都保留，不互相视为重复"""
+    print("\n" + "="*60)
+    print("测试 3: 键列为空的行")
+    print("="*60)
+
+    rows = [
+        ("id", "name"),
+        (1, "a"),
+        (None, "b"),
+        (None, "c"),
+        (1, "d"),
+        (None, None, "e"),
+    ]
+    with RowDeduplicator(key_cols=["A"]) as deduplicator:
+        kept = list(deduplicator.filter_rows(rows))
+        assert kept == [rows[0], rows[1], rows[2], rows[3], rows[5]]
+        assert deduplicator.kept_count == 1
+        assert deduplicator.dropped_count == 1
+
+
+def test_sink_all_sheets_name_conflicts():
+    """测试合并所有工作表到 SQLite 时，截断后同名的工作表只写出第一个"""
+    print("\n" + "="*60)
+    print("测试 4: 截断后同名的工作表")
+    print("="*60)
+
+    import sqlite3
+
+    temp_dir = Path(tempfile.mkdtemp())
+    input_dir = temp_dir / "input"
+    input_dir.mkdir()
+    wb = Workbook()
+    for i, ws in enumerate([wb.active, wb.create_sheet()], start=1):
+        # 加上来源名称前缀后超过 31 个字符，截断后相同
+        ws.title = "x" * 30 + str(i)
+        ws.append(["value"])
+        ws.append([f"sheet-{i}"])
+    wb.save(input_dir / "a.xlsx")
+
+    output_file = temp_dir / "merged.db"
+    merger = ExcelMerger(
+        logger=logging.getLogger("test_merge_excel"),
+        input_dir=input_dir,
+        output_file=output_file,
+        all_sheets=True,
+        sink=SqliteSink(),
+    )
+    assert merger.merge_excel() == 1
+
+    conn = sqlite3.connect(output_file)
+    values = [row[0] for row in conn.execute("SELECT value FROM merged")]
+    conn.close()
+    assert values == ["sheet-1"]
+
+
+def main():
+    """运行所有测试"""
+    print("Excel 合并去重测试")
+    print("="*60)
+
+    try:
+        test_dedup_serial_and_parallel()
+        test_sqlite_sink_header_conflicts()
+        test_dedup_blank_key_cells()
+        test_sink_all_sheets_name_conflicts()
+
+        print("\n" + "="*60)
+        print("✓ 所有测试完成!")
+        print("="*60)
+
+    except Exception as e:
+        print(f"\n✗ 测试失败: {e}")
+        import traceback
+        traceback.print_exc()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""
+暂存删除功能测试脚本
+"""
+
+import logging
+import os
+import stat
+import tempfile
+from pathlib import Path
+
+# 添加项目根目录到路径
+import sys
+sys.path.append(str(Path(__file__).parent.parent))
+
+from toolkits.file.file_deleter import FileDeleter
+from toolkits.file.staging import STAGING_DIR_NAME, StagingArea
+
+
+def setup_test_environment():
+    """创建测试环境"""
+    temp_dir = Path(tempfile.mkdtemp())
+    print(f"创建临时测试目录: {temp_dir}")
+
+    data_dir = temp_dir / "data"
+    (data_dir / "sub").mkdir(parents=True)
+    test_files = [
+        data_dir / "a.tmp",
+        data_dir / "b.txt",
+        data_dir / "sub" / "c.tmp",
+    ]
+    for file_path in test_files:
+        file_path.write_text(f"测试文件: {file_path.name}")
+
+    return temp_dir
+
+
+def test_stage_and_restore_across_instances():
+    """测试暂存后由新实例（模拟重新启动）找到并恢复"""
+    print("\n" + "="*60)
+    print("测试 1: 跨实例恢复暂存的文件")
+    print("="*60)
+
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    logger = logging.getLogger("test_staging")
+    temp_dir = setup_test_environment()
+    data_dir = temp_dir / "data"
+    registry = temp_dir / "staging_dirs.json"
+
+    staging = StagingArea(logger=logger, registry=registry)
+    deleter = FileDeleter(logger=logger, staging=staging)
+    files, errors = deleter.find_files(str(data_dir), "扩展名匹配", "tmp")
+    assert len(files) == 2 and not errors
+
+    staged, errors = deleter.stage_files(files, root_dir=str(data_dir))
+    staging.close()
+    assert staged == 2 and not errors
+    assert not (data_dir / "a.tmp").exists()
+
+    # 暂存目录在根目录下，只有当前用户可以访问，且不参与之后的查找
+    staging_dir = data_dir / STAGING_DIR_NAME
+    assert stat.S_IMODE(os.stat(staging_dir).st_mode) == 0o700
+    assert deleter.find_files(str(data_dir), "扩展名匹配", "tmp") == ([], [])
+
+    restarted = StagingArea(logger=logger, registry=registry)
+    batches = restarted.batches()
+    assert len(batches) == 1
+    assert sorted(batches[0]["origins"]) == sorted(str(f) for f in files)
+
+    restored, errors = restarted.restore(batches[0]["path"])
+    assert restored == 2 and not errors
+    assert (data_dir / "sub" / "c.tmp").read_text() == "测试文件: c.tmp"
+    assert restarted.batches() == []
+
+
+def test_purge_across_instances():
+    """测试新实例（模拟重新启动）清理之前暂存的文件"""
+    print("\n" + "="*60)
+    print("测试 2: 跨实例清理暂存的文件")
+    print("="*60)
+
+    logger = logging.getLogger("test_staging")
+    temp_dir = setup_test_environment()
+    data_dir = temp_dir / "data"
+    registry = temp_dir / "staging_dirs.json"
+
+    staging = StagingArea(logger=logger, registry=registry)
+    staged, errors = staging.stage([data_dir / "b.txt"], root_dir=str(data_dir))
+    staging.close()
+    assert staged == 1 and not errors
+
+    # 未到保留时间，不清理
+    assert StagingArea(logger=logger, registry=registry).purge() == 0
+
+    restarted = StagingArea(max_age=0, logger=logger, registry=registry)
+    assert restarted.purge() == 1
+    assert restarted.batches() == []
+    assert not (data_dir / "b.txt").exists()
+    assert list((data_dir / STAGING_DIR_NAME).iterdir()) == []
+
+
+def test_purge_skips_batch_being_written():
+    """测试其他实例（模拟其他进程）清理时跳过正在写入的批次"""
+    print("\n" + "="*60)
+    print("测试 3: 清理时跳过正在写入的批次")
+    print("="*60)
+
+    logger = logging.getLogger("test_staging")
+    temp_dir = setup_test_environment()
+    data_dir = temp_dir / "data"
+    registry = temp_dir / "staging_dirs.json"
+
+    writer = StagingArea(logger=logger, registry=registry)
+    other = StagingArea(max_age=0, logger=logger, registry=registry)
+    purged = []
+
+    def progress(current, total):
+        # 写入过程中其他实例清理全部批次
+        purged.append(other.purge(everything=True))
+
+    paths = [data_dir / "a.tmp", data_dir / "b.txt"]
+    staged, errors = writer.stage(paths, root_dir=str(data_dir), progress_callback=progress)
+    writer.close()
+    assert staged == 2 and not errors
+    assert purged == [0, 0]
+
+    # 写入完成后可以恢复，也可以被清理
+    batches = other.batches()
+    assert len(batches) == 1
+    assert sorted(batches[0]["origins"]) == sorted(str(p) for p in paths)
+    assert other.purge(everything=True) == 1
+
+
+def main():
+    """运行所有测试"""
+    print("暂存删除功能测试")
+    print("="*60)
+
+    try:
+        test_stage_and_restore_across_instances()
+        test_purge_across_instances()
+        test_purge_skips_batch_being_written()
+
+        print("\n" + "="*60)
+        print("✓ 所有测试完成!")
+        print("="*60)
+
+    except Exception as e:
+        print(f"\n✗ 测试失败: {e}")
+        import traceback
+        traceback.print_exc()
+
+
+if __name__ == "__main__":
+    main()
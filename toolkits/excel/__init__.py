@@ -2,10 +2,25 @@ from .split_excel import ExcelSplitter
 from .merge_excel import ExcelMerger
 from .time_filler import ExcelTimeFiller
 from .human_loader import ExcelHumanLoader
+from .diff_excel import ExcelDiffer
+from .group_by import GroupBy
+from .dedup import RowDeduplicator
+from .template_cloner import TemplateCloner
+from .cache import ParseCache
+from .sinks import MergeSink, CsvSink, JsonLinesSink, SqliteSink
 
 __all__ = [
     "ExcelSplitter",
     "ExcelMerger",
     "ExcelTimeFiller",
     "ExcelHumanLoader",
+    "ExcelDiffer",
+    "GroupBy",
+    "RowDeduplicator",
+    "TemplateCloner",
+    "ParseCache",
+    "MergeSink",
+    "CsvSink",
+    "JsonLinesSink",
+    "SqliteSink",
 ]
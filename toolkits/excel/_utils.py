@@ -1,37 +1,281 @@
+import datetime
+import hashlib
+from copy import copy
 from pathlib import Path
-from openpyxl.utils import get_column_letter
-from typing import Optional
+from zipfile import ZipFile, ZIP_DEFLATED
+from itertools import groupby
+from operator import itemgetter
+from openpyxl.utils import column_index_from_string, get_column_letter, range_boundaries
+from openpyxl.writer.excel import ExcelWriter
+from typing import Any, Optional, Sequence
 
 from toolkits.utils.file_filter import FileFilterStrategy
 
+# 保存配置：控制写出 xlsx 时 zip 包的压缩方式与压缩级别
+# - fast: 最低压缩级别，保存最快，文件较大，适合交互式使用
+# - balanced: zlib 默认级别，与 openpyxl 默认行为一致
+# - small: 最高压缩级别，文件最小，保存最慢
+SAVE_PROFILES = {
+    "fast": (ZIP_DEFLATED, 1),
+    "balanced": (ZIP_DEFLATED, 6),
+    "small": (ZIP_DEFLATED, 9),
+}
+DEFAULT_SAVE_PROFILE = "balanced"
 
-def copy_sheet(source_sheet, target_sheet):
+# snapshot_sheet 最多缓存的单元格数（按已用区域的行数 × 列数估计）。
+# 每个单元格约占 100 字节，上限约对应 100MB 的快照；更大的工作表不做快照，
+# 由调用方在主进程中直接逐行复制
+SNAPSHOT_MAX_CELLS = 1_000_000
+
+
+def validate_save_profile(save_profile: str) -> str:
+    """Check that save_profile is one of SAVE_PROFILES and return it."""
+    if save_profile not in SAVE_PROFILES:
+        raise ValueError(
+            f"未知的保存配置: {save_profile}，可选值: {', '.join(SAVE_PROFILES)}"
+        )
+    return save_profile
+
+
+def save_workbook(
+    workbook, filename: Path | str, save_profile: str = DEFAULT_SAVE_PROFILE
+) -> None:
+    """
+    Save a workbook like `Workbook.save`, but with the zip compression
+    taken from the given save profile.
+
+    Args:
+        workbook: openpyxl workbook to save
+        filename: Output file path
+        save_profile: One of SAVE_PROFILES
+    """
+    compression, compresslevel = SAVE_PROFILES[validate_save_profile(save_profile)]
+
+    if workbook.read_only:
+        raise TypeError("Workbook is read-only")
+    if workbook.write_only and not workbook.worksheets:
+        workbook.create_sheet()
+
+    archive = ZipFile(
+        str(filename),
+        "w",
+        compression=compression,
+        compresslevel=compresslevel,
+        allowZip64=True,
+    )
+    workbook.properties.modified = datetime.datetime.now(
+        tz=datetime.timezone.utc
+    ).replace(tzinfo=None)
+    writer = ExcelWriter(workbook, archive)
+    writer.save()
+
+
+def copy_sheet(source_sheet, target_sheet, row_map: Optional[dict] = None):
+    """
+    Copy values, styles, dimensions and merged cells from source_sheet.
+
+    row_map optionally maps source row numbers to target row numbers
+    (see RowDeduplicator.row_map); rows missing from it are dropped.
+    """
     for row in source_sheet.iter_rows():
+        target_row = _map_row(row[0].row, row_map)
+        if target_row is None:
+            continue
         src_row_dim = source_sheet.row_dimensions[row[0].row]
         if src_row_dim.height is not None:
-            target_sheet.row_dimensions[row[0].row].height = src_row_dim.height
+            target_sheet.row_dimensions[target_row].height = src_row_dim.height
 
-    for col in source_sheet.iter_cols():
+    for col in source_sheet.iter_cols(max_row=1):
         col_letter = get_column_letter(col[0].column)
         src_col_dim = source_sheet.column_dimensions[col_letter]
         if src_col_dim.width is not None:
             target_sheet.column_dimensions[col_letter].width = src_col_dim.width
 
+    # Cells sharing a source style share the resulting target style, so each
+    # distinct style is copied and registered in the target workbook only once.
+    style_cache = {}
     for row in source_sheet.iter_rows():
+        target_row = _map_row(row[0].row, row_map)
+        if target_row is None:
+            continue
         for cell in row:
-            new_cell = target_sheet[cell.coordinate]
+            new_cell = target_sheet.cell(row=target_row, column=cell.column)
             new_cell.value = cell.value
             if cell.has_style:
-                new_cell.font = cell.font.copy()
-                new_cell.border = cell.border.copy()
-                new_cell.fill = cell.fill.copy()
+                key = tuple(cell._style)
+                cached = style_cache.get(key)
+                if cached is not None:
+                    new_cell._style = copy(cached)
+                    continue
+                new_cell.font = copy(cell.font)
+                new_cell.border = copy(cell.border)
+                new_cell.fill = copy(cell.fill)
                 new_cell.number_format = cell.number_format
-                new_cell.protection = cell.protection.copy()
-                new_cell.alignment = cell.alignment.copy()
+                new_cell.protection = copy(cell.protection)
+                new_cell.alignment = copy(cell.alignment)
+                style_cache[key] = copy(new_cell._style)
 
     # merged_cells
     for merged_range in source_sheet.merged_cells.ranges:
-        target_sheet.merge_cells(str(merged_range))
+        _merge_mapped(target_sheet, str(merged_range), row_map)
+
+
+def snapshot_sheet(
+    source_sheet, max_cells: Optional[int] = SNAPSHOT_MAX_CELLS
+) -> Optional[dict]:
+    """
+    Capture everything copy_sheet copies as plain picklable data, so the
+    expensive load/scan can run in a worker process.
+
+    The whole sheet is buffered, so sheets larger than max_cells (used
+    range, rows x columns) are not captured; None means no limit.
+
+    Returns:
+        Dict with title, row_heights, col_widths, cells
+        ((row, column, value, style index or -1) tuples), styles and merged;
+        None if the sheet exceeds max_cells
+    """
+    if (
+        max_cells is not None
+        and source_sheet.max_row * source_sheet.max_column > max_cells
+    ):
+        return None
+
+    row_heights = {}
+    cells = []
+    styles = []
+    style_index = {}
+    for row in source_sheet.iter_rows():
+        src_row_dim = source_sheet.row_dimensions[row[0].row]
+        if src_row_dim.height is not None:
+            row_heights[row[0].row] = src_row_dim.height
+        for cell in row:
+            idx = -1
+            if cell.has_style:
+                key = tuple(cell._style)
+                idx = style_index.get(key, -1)
+                if idx < 0:
+                    idx = style_index[key] = len(styles)
+                    styles.append(
+                        (
+                            copy(cell.font),
+                            copy(cell.border),
+                            copy(cell.fill),
+                            cell.number_format,
+                            copy(cell.protection),
+                            copy(cell.alignment),
+                        )
+                    )
+            cells.append((cell.row, cell.column, cell.value, idx))
+
+    col_widths = {}
+    for col in source_sheet.iter_cols(max_row=1):
+        col_letter = get_column_letter(col[0].column)
+        src_col_dim = source_sheet.column_dimensions[col_letter]
+        if src_col_dim.width is not None:
+            col_widths[col_letter] = src_col_dim.width
+
+    return {
+        "title": source_sheet.title,
+        "row_heights": row_heights,
+        "col_widths": col_widths,
+        "cells": cells,
+        "styles": styles,
+        "merged": [str(r) for r in source_sheet.merged_cells.ranges],
+    }
+
+
+def apply_sheet_snapshot(
+    snapshot: dict, target_sheet, row_map: Optional[dict] = None
+):
+    """Write a snapshot_sheet result into target_sheet, like copy_sheet."""
+    for row, height in snapshot["row_heights"].items():
+        target_row = _map_row(row, row_map)
+        if target_row is not None:
+            target_sheet.row_dimensions[target_row].height = height
+    for col_letter, width in snapshot["col_widths"].items():
+        target_sheet.column_dimensions[col_letter].width = width
+
+    styles = snapshot["styles"]
+    style_cache = {}
+    for row, column, value, idx in snapshot["cells"]:
+        target_row = _map_row(row, row_map)
+        if target_row is None:
+            continue
+        new_cell = target_sheet.cell(row=target_row, column=column)
+        new_cell.value = value
+        if idx < 0:
+            continue
+        cached = style_cache.get(idx)
+        if cached is not None:
+            new_cell._style = copy(cached)
+            continue
+        font, border, fill, number_format, protection, alignment = styles[idx]
+        new_cell.font = font
+        new_cell.border = border
+        new_cell.fill = fill
+        new_cell.number_format = number_format
+        new_cell.protection = protection
+        new_cell.alignment = alignment
+        style_cache[idx] = copy(new_cell._style)
+
+    for merged_range in snapshot["merged"]:
+        _merge_mapped(target_sheet, merged_range, row_map)
+
+
+def snapshot_rows(snapshot: dict):
+    """Yield (row number, row values) from a snapshot_sheet result."""
+    for row, cells in groupby(snapshot["cells"], key=itemgetter(0)):
+        yield row, tuple(cell[2] for cell in cells)
+
+
+def _map_row(row: int, row_map: Optional[dict]) -> Optional[int]:
+    return row if row_map is None else row_map.get(row)
+
+
+def _merge_mapped(target_sheet, merged_range: str, row_map: Optional[dict]):
+    """Merge a range in target_sheet, shifted by row_map; skipped if any of
+    its rows were dropped or it would no longer be contiguous."""
+    if row_map is None:
+        target_sheet.merge_cells(merged_range)
+        return
+    min_col, min_row, max_col, max_row = range_boundaries(merged_range)
+    top, bottom = row_map.get(min_row), row_map.get(max_row)
+    if top is None or bottom is None or bottom - top != max_row - min_row:
+        return
+    target_sheet.merge_cells(
+        start_row=top, start_column=min_col, end_row=bottom, end_column=max_col
+    )
+
+
+def column_index(col: str | int) -> int:
+    """Convert a column letter ('A') or 1-based index to a 1-based index."""
+    if isinstance(col, str):
+        return column_index_from_string(col.upper())
+    elif isinstance(col, int) and col > 0:
+        return col
+    else:
+        raise ValueError(f"无效的列标识: {col}")
+
+
+def trim_row(row: Sequence[Any]) -> tuple:
+    """Drop trailing empty cells so rows of different widths compare equal."""
+    end = len(row)
+    while end > 0 and row[end - 1] is None:
+        end -= 1
+    return tuple(row[:end])
+
+
+def row_hash(values: Sequence[Any]) -> bytes:
+    """128-bit digest of a row of cell values."""
+    return hashlib.blake2b(repr(values).encode("utf-8"), digest_size=16).digest()
+
+
+def safe_sheet_title(title: str) -> str:
+    """Replace characters Excel forbids in sheet titles and cap at 31 chars."""
+    for char in "\\/?*[]:":
+        title = title.replace(char, "_")
+    return title[:31]
 
 
 def find_all_excel_files(
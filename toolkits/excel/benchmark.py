@@ -0,0 +1,405 @@
+"""
+Excel 工具性能基准
+
+生成合成工作簿并测量 ExcelMerger、ExcelSplitter、ExcelTimeFiller、ExcelHumanLoader
+的吞吐量（行/秒）、各阶段耗时（load、copy、save）与峰值内存（RSS）。
+
+每个工具在独立子进程中运行，峰值内存互不影响。
+
+用法:
+    python -m toolkits.excel.benchmark --rows 20000 --files 5
+    python -m toolkits.excel.benchmark --save-baseline baseline.json
+    python -m toolkits.excel.benchmark --baseline baseline.json --threshold 0.1
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import multiprocessing
+import random
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from openpyxl import Workbook
+from openpyxl.styles import Alignment, Border, Font, PatternFill, Side
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+TOOLS = ["merger", "splitter", "time_filler", "human_loader"]
+
+
+def generate_workbooks(
+    output_dir: Path,
+    files: int = 3,
+    rows: int = 10000,
+    cols: int = 10,
+    styles: int = 8,
+    merged_cells: int = 10,
+    groups: int = 20,
+    seed: int = 0,
+) -> List[Path]:
+    """
+    生成合成工作簿
+
+    第 1 行为表头；A 列为分组键，H 列为金额（满足 ExcelSplitter 的要求），
+    B、C 列为时间列（供 ExcelTimeFiller 填充），其余为随机文本/数字。
+
+    Args:
+        output_dir: 输出目录
+        files: 文件数
+        rows: 每个文件的数据行数
+        cols: 列数（至少 8 列）
+        styles: 不同单元格样式的数量，0 表示不设置样式
+        merged_cells: 每个文件中合并单元格区域的数量（位于表头行数据区右侧）
+        groups: A 列分组键的数量
+        seed: 随机种子
+
+    Returns:
+        生成的文件路径列表
+    """
+    cols = max(cols, 8)
+    rng = random.Random(seed)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    style_pool = [
+        (
+            Font(bold=i % 2 == 0, italic=i % 3 == 0, size=10 + i % 4),
+            PatternFill("solid", fgColor=f"{rng.randrange(0xFFFFFF):06X}"),
+            Border(bottom=Side(style="thin")),
+            Alignment(horizontal=("left", "center", "right")[i % 3]),
+        )
+        for i in range(styles)
+    ]
+
+    start = datetime(2025, 1, 1)
+    paths = []
+    for file_index in range(files):
+        wb = Workbook()
+        ws = wb.active
+        ws.append([f"col{c}" for c in range(1, cols + 1)])
+        for r in range(rows):
+            row: List[Any] = [f"group{rng.randrange(groups)}"]
+            row.append(start + timedelta(minutes=rng.randrange(525600)))
+            row.append(start + timedelta(minutes=rng.randrange(525600)))
+            for c in range(4, cols + 1):
+                if c == 8:
+                    row.append(round(rng.uniform(1, 10000), 2))
+                elif c % 2:
+                    row.append(rng.randrange(100000))
+                else:
+                    row.append(f"text{rng.randrange(1000)}")
+            ws.append(row)
+
+        if style_pool:
+            for r in range(2, rows + 2):
+                font, fill, border, alignment = style_pool[r % len(style_pool)]
+                for c in range(1, cols + 1):
+                    cell = ws.cell(r, c)
+                    cell.font = font
+                    cell.fill = fill
+                    cell.border = border
+                    cell.alignment = alignment
+
+        # 合并单元格放在表头行数据区右侧，ExcelTimeFiller 不会改写表头
+        for m in range(merged_cells):
+            left = cols + 2 + m * 2
+            ws.cell(1, left, value=f"merged{m + 1}")
+            ws.merge_cells(start_row=1, start_column=left, end_row=1, end_column=left + 1)
+
+        path = output_dir / f"synthetic_{file_index + 1}.xlsx"
+        wb.save(str(path))
+        paths.append(path)
+
+    return paths
+
+
+def generate_roster(output_file: Path, rows: int = 1000, seed: int = 0) -> Path:
+    """生成 ExcelHumanLoader 格式的人员信息表（日期 x.xx / 时间 xx:xx-xx:xx / 名称）"""
+    rng = random.Random(seed)
+    wb = Workbook()
+    ws = wb.active
+    ws.append(["日期", "时间", "名称"])
+    for _ in range(rows):
+        cell_row = ws.max_row + 1
+        ws.cell(cell_row, 1, value=rng.randrange(1, 13) + rng.randrange(1, 29) / 100)
+        ws.cell(cell_row, 1).number_format = "0.00"
+        start_hour = rng.randrange(8, 12)
+        ws.cell(cell_row, 2, value=f"{start_hour:02d}:00-{start_hour + 8:02d}:00")
+        ws.cell(cell_row, 3, value=f"员工{rng.randrange(100)} 员工{rng.randrange(100)}")
+    wb.save(str(output_file))
+    return output_file
+
+
+class StageTimer:
+    """通过包装模块中的 load_workbook / save_workbook 统计各阶段耗时"""
+
+    def __init__(self):
+        self.times = {"load": 0.0, "save": 0.0}
+
+    def _wrap(self, stage: str, func: Callable) -> Callable:
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.times[stage] += time.perf_counter() - start
+
+        return wrapper
+
+    @contextmanager
+    def instrument(self, module):
+        originals = {}
+        for name, stage in (("load_workbook", "load"), ("save_workbook", "save")):
+            if hasattr(module, name):
+                originals[name] = getattr(module, name)
+                setattr(module, name, self._wrap(stage, originals[name]))
+        try:
+            yield self
+        finally:
+            for name, func in originals.items():
+                setattr(module, name, func)
+
+
+def _peak_rss_mb() -> Optional[float]:
+    """当前进程的峰值 RSS（MB），不支持的平台返回 None"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 单位为 KB，macOS 为字节
+    if sys.platform == "darwin":
+        return peak / (1024 * 1024)
+    return peak / 1024
+
+
+def _run_tool(tool: str, data_dir: str, work_dir: str, save_profile: str) -> Dict[str, Any]:
+    """在子进程中运行单个工具并返回测量结果"""
+    from toolkits.excel import human_loader, merge_excel, split_excel, time_filler
+    from toolkits.utils.naming import FILENAME_STRATEGY
+
+    logger = logging.getLogger(f"benchmark.{tool}")
+    logger.setLevel(logging.WARNING)
+    data_path = Path(data_dir)
+    work_path = Path(work_dir)
+    sources = sorted((data_path / "sources").glob("*.xlsx"))
+    first_source = sources[0]
+    timer = StageTimer()
+
+    start = time.perf_counter()
+    if tool == "merger":
+        with timer.instrument(merge_excel):
+            merge_excel.ExcelMerger(
+                logger,
+                data_path / "sources",
+                work_path / "merged.xlsx",
+                FILENAME_STRATEGY,
+                save_profile=save_profile,
+            ).merge_excel()
+        counted = sources
+    elif tool == "splitter":
+        with timer.instrument(split_excel):
+            split_excel.ExcelSplitter(logger).split_by_first_column(
+                first_source, work_path / "split.xlsx", save_profile=save_profile
+            )
+        counted = [first_source]
+    elif tool == "time_filler":
+        with timer.instrument(time_filler):
+            time_filler.ExcelTimeFiller(logger).fill_time_columns(
+                first_source,
+                start_time_col="B",
+                end_time_col="C",
+                output_file=work_path / "filled.xlsx",
+                save_profile=save_profile,
+            )
+        counted = [first_source]
+    elif tool == "human_loader":
+        roster = data_path / "roster.xlsx"
+        with timer.instrument(human_loader):
+            human_loader.ExcelHumanLoader(logger).load_humans_from_excel(roster)
+        counted = [roster]
+    else:
+        raise ValueError(f"未知的工具: {tool}")
+    wall = time.perf_counter() - start
+    rows = sum(_count_rows(path) for path in counted)
+
+    load, save = timer.times["load"], timer.times["save"]
+    return {
+        "rows": rows,
+        "wall_time": wall,
+        "rows_per_sec": rows / wall if wall > 0 else 0.0,
+        "stages": {"load": load, "copy": max(wall - load - save, 0.0), "save": save},
+        "peak_rss_mb": _peak_rss_mb(),
+    }
+
+
+def _count_rows(path: Path) -> int:
+    from openpyxl import load_workbook
+
+    wb = load_workbook(str(path), read_only=True)
+    try:
+        return max((wb.worksheets[0].max_row or 1) - 1, 0)
+    finally:
+        wb.close()
+
+
+def run_benchmark(
+    rows: int = 10000,
+    cols: int = 10,
+    files: int = 3,
+    styles: int = 8,
+    merged_cells: int = 10,
+    tools: Optional[List[str]] = None,
+    save_profile: str = "balanced",
+    seed: int = 0,
+) -> Dict[str, Any]:
+    """
+    生成合成数据并依次测量各工具
+
+    Returns:
+        {"params": {...}, "results": {工具名: 测量结果}}
+    """
+    tools = tools or TOOLS
+    params = {
+        "rows": rows,
+        "cols": cols,
+        "files": files,
+        "styles": styles,
+        "merged_cells": merged_cells,
+        "save_profile": save_profile,
+        "seed": seed,
+    }
+
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="tools4linn_bench_") as tmp:
+        data_dir = Path(tmp) / "data"
+        generate_workbooks(
+            data_dir / "sources", files, rows, cols, styles, merged_cells, seed=seed
+        )
+        generate_roster(data_dir / "roster.xlsx", rows, seed=seed)
+
+        ctx = multiprocessing.get_context("spawn")
+        for tool in tools:
+            work_dir = Path(tmp) / tool
+            work_dir.mkdir()
+            with ctx.Pool(1) as pool:
+                results[tool] = pool.apply(
+                    _run_tool, (tool, str(data_dir), str(work_dir), save_profile)
+                )
+
+    return {"params": params, "results": results}
+
+
+def compare_with_baseline(
+    current: Dict[str, Any], baseline: Dict[str, Any], threshold: float = 0.1
+) -> List[Dict[str, Any]]:
+    """
+    与基线结果比较
+
+    Args:
+        current: run_benchmark 的返回值
+        baseline: 之前保存的基线
+        threshold: 吞吐量下降超过该比例视为退化
+
+    Returns:
+        每个工具的比较结果列表，包含 tool、baseline、current、change、regression
+    """
+    comparisons = []
+    for tool, result in current["results"].items():
+        base = baseline.get("results", {}).get(tool)
+        if base is None or not base.get("rows_per_sec"):
+            continue
+        change = result["rows_per_sec"] / base["rows_per_sec"] - 1
+        comparisons.append(
+            {
+                "tool": tool,
+                "baseline": base["rows_per_sec"],
+                "current": result["rows_per_sec"],
+                "change": change,
+                "regression": change < -threshold,
+            }
+        )
+    return comparisons
+
+
+def format_results(report: Dict[str, Any]) -> str:
+    """将测量结果格式化为表格文本"""
+    lines = [
+        f"{'tool':<14}{'rows':>9}{'rows/s':>11}{'wall(s)':>9}"
+        f"{'load':>8}{'copy':>8}{'save':>8}{'rss(MB)':>9}"
+    ]
+    for tool, r in report["results"].items():
+        rss = f"{r['peak_rss_mb']:.0f}" if r["peak_rss_mb"] is not None else "-"
+        stages = r["stages"]
+        lines.append(
+            f"{tool:<14}{r['rows']:>9}{r['rows_per_sec']:>11.0f}{r['wall_time']:>9.2f}"
+            f"{stages['load']:>8.2f}{stages['copy']:>8.2f}{stages['save']:>8.2f}{rss:>9}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Excel 工具性能基准")
+    parser.add_argument("--rows", type=int, default=10000, help="每个文件的数据行数")
+    parser.add_argument("--cols", type=int, default=10, help="列数（至少 8）")
+    parser.add_argument("--files", type=int, default=3, help="合并测试的文件数")
+    parser.add_argument("--styles", type=int, default=8, help="不同样式的数量")
+    parser.add_argument("--merged-cells", type=int, default=10, help="合并单元格区域数")
+    parser.add_argument("--tools", nargs="+", choices=TOOLS, help="只测量指定工具")
+    parser.add_argument(
+        "--save-profile", default="balanced", help="保存配置 fast/balanced/small"
+    )
+    parser.add_argument("--seed", type=int, default=0, help="随机种子")
+    parser.add_argument("--json", type=Path, help="将结果写入 JSON 文件")
+    parser.add_argument("--save-baseline", type=Path, help="将结果保存为基线")
+    parser.add_argument("--baseline", type=Path, help="与基线比较")
+    parser.add_argument(
+        "--threshold", type=float, default=0.1, help="吞吐量下降超过该比例视为退化"
+    )
+    args = parser.parse_args(argv)
+
+    report = run_benchmark(
+        rows=args.rows,
+        cols=args.cols,
+        files=args.files,
+        styles=args.styles,
+        merged_cells=args.merged_cells,
+        tools=args.tools,
+        save_profile=args.save_profile,
+        seed=args.seed,
+    )
+    print(format_results(report))
+
+    for path in (args.json, args.save_baseline):
+        if path is not None:
+            path.write_text(json.dumps(report, indent=4), encoding="utf-8")
+
+    if args.baseline is None:
+        return 0
+
+    baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+    if baseline.get("params") != report["params"]:
+        print("警告: 基线参数与本次不同，比较结果仅供参考")
+
+    regressed = False
+    print()
+    for c in compare_with_baseline(report, baseline, args.threshold):
+        flag = "  <-- 退化" if c["regression"] else ""
+        print(
+            f"{c['tool']:<14}{c['baseline']:>11.0f} -> {c['current']:>11.0f} rows/s"
+            f" ({c['change']:+.1%}){flag}"
+        )
+        regressed = regressed or c["regression"]
+    return 1 if regressed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
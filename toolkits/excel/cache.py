@@ -0,0 +1,236 @@
+"""
+解析结果缓存
+
+按文件内容哈希 + 加载参数缓存表格解析结果（记录与解析警告），
+输入未变化时直接从磁盘读取，避免重复解析工作簿。
+缓存按最近使用时间淘汰：写入时删除超过保留时间的缓存，
+总大小超过上限时从最久未使用的开始删除。
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import os
+import time
+from logging import Logger, getLogger
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from toolkits.utils.hashing import hash_file
+
+# 缓存格式版本，解析逻辑或存储格式变化时递增以使旧缓存失效
+CACHE_FORMAT_VERSION = 1
+
+# 默认缓存总大小上限（字节）
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+# 默认保留时间（秒），超过该时间未使用的缓存被删除
+DEFAULT_MAX_AGE = 30 * 24 * 3600.0
+
+ParseResult = Tuple[List[Any], List[str]]
+
+
+class ParseCache:
+    """
+    表格解析结果缓存。
+
+    缓存键由文件内容哈希、命名空间（解析器名称）与加载参数共同决定，
+    缓存内容以 gzip 压缩的 JSON 存储，每个键对应一个文件。
+    文件的修改时间记录最近一次使用（命中时更新），put() 之后按此淘汰。
+    """
+
+    def __init__(
+        self,
+        cache_dir: Optional[Path | str] = None,
+        logger: Optional[Logger] = None,
+        max_bytes: Optional[int] = DEFAULT_MAX_BYTES,
+        max_age: Optional[float] = DEFAULT_MAX_AGE,
+    ):
+        """
+        Args:
+            cache_dir: 缓存目录，None 表示使用 ~/.tools4linn/cache
+            logger: 日志记录器
+            max_bytes: 缓存总大小上限（字节），None 表示不限制
+            max_age: 保留时间（秒），超过该时间未使用的缓存被删除，None 表示不限制
+        """
+        if cache_dir is None:
+            self.cache_dir = Path.home() / ".tools4linn" / "cache"
+        else:
+            self.cache_dir = Path(cache_dir)
+        self.logger = logger or getLogger(__name__)
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+
+    def make_key(
+        self, file_path: Path | str, namespace: str, params: Dict[str, Any]
+    ) -> str:
+        """
+        生成缓存键
+
+        Args:
+            file_path: 被解析的文件路径
+            namespace: 命名空间，用于区分不同的解析器
+            params: 影响解析结果的参数
+
+        Returns:
+            缓存键
+        """
+        payload = json.dumps(
+            {
+                "version": CACHE_FORMAT_VERSION,
+                "namespace": namespace,
+                "content": hash_file(file_path),
+                "params": params,
+            },
+            sort_keys=True,
+            ensure_ascii=False,
+            default=str,
+        )
+        return hashlib.blake2b(payload.encode("utf-8"), digest_size=20).hexdigest()
+
+    def get(self, key: str) -> Optional[ParseResult]:
+        """
+        读取缓存
+
+        Returns:
+            (记录列表, 警告列表)，未命中或缓存损坏时返回 None
+        """
+        cache_file = self._cache_file(key)
+        if not cache_file.exists():
+            return None
+
+        try:
+            with gzip.open(cache_file, "rt", encoding="utf-8") as f:
+                data = json.load(f)
+            result = data["records"], data["warnings"]
+        except (OSError, ValueError, KeyError) as e:
+            self.logger.warning(f"读取缓存失败 {cache_file}: {e}")
+            return None
+
+        try:
+            # 记录最近使用时间，淘汰时保留常用的缓存
+            os.utime(cache_file)
+        except OSError:
+            pass
+        return result
+
+    def put(self, key: str, records: List[Any], warnings: List[str]) -> None:
+        """
+        写入缓存（先写临时文件再重命名，避免留下不完整的缓存），之后淘汰旧缓存
+        """
+        cache_file = self._cache_file(key)
+        tmp_file = cache_file.with_name(f"{cache_file.name}.{os.getpid()}.tmp")
+        try:
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
+            with gzip.open(tmp_file, "wt", encoding="utf-8", compresslevel=6) as f:
+                json.dump(
+                    {"records": records, "warnings": warnings},
+                    f,
+                    ensure_ascii=False,
+                    separators=(",", ":"),
+                )
+            os.replace(tmp_file, cache_file)
+        except (OSError, TypeError, ValueError) as e:
+            self.logger.warning(f"写入缓存失败 {cache_file}: {e}")
+            tmp_file.unlink(missing_ok=True)
+            return
+        self.prune()
+
+    def load_or_parse(
+        self,
+        file_path: Path | str,
+        namespace: str,
+        params: Dict[str, Any],
+        parse_func: Callable[[], ParseResult],
+    ) -> ParseResult:
+        """
+        优先从缓存读取解析结果，未命中时调用 parse_func 解析并写入缓存
+
+        Args:
+            file_path: 被解析的文件路径
+            namespace: 命名空间，用于区分不同的解析器
+            params: 影响解析结果的参数
+            parse_func: 实际的解析函数，返回 (记录列表, 警告列表)
+
+        Returns:
+            (记录列表, 警告列表)
+        """
+        key = self.make_key(file_path, namespace, params)
+        cached = self.get(key)
+        if cached is not None:
+            self.logger.debug(f"命中解析缓存: {file_path}")
+            return cached
+
+        records, warnings = parse_func()
+        self.put(key, records, warnings)
+        return records, warnings
+
+    def prune(self) -> int:
+        """
+        淘汰缓存：删除超过保留时间未使用的缓存，总大小超过上限时
+        再从最久未使用的开始删除
+
+        Returns:
+            删除的缓存文件数
+        """
+        if self.max_bytes is None and self.max_age is None:
+            return 0
+
+        entries = []
+        try:
+            with os.scandir(self.cache_dir) as it:
+                for entry in it:
+                    if not entry.name.endswith(".json.gz"):
+                        continue
+                    try:
+                        st = entry.stat(follow_symlinks=False)
+                    except OSError:
+                        continue
+                    entries.append((st.st_mtime, st.st_size, entry.path))
+        except OSError:
+            return 0
+
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+        now = time.time()
+        count = 0
+        for mtime, size, path in entries:
+            expired = self.max_age is not None and now - mtime > self.max_age
+            if not expired and (self.max_bytes is None or total <= self.max_bytes):
+                break
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                self.logger.warning(f"删除缓存失败 {path}: {e}")
+                continue
+            total -= size
+            count += 1
+        if count:
+            self.logger.debug(f"已淘汰 {count} 个解析缓存")
+        return count
+
+    def clear(self) -> int:
+        """
+        清空缓存目录
+
+        Returns:
+            删除的缓存文件数
+        """
+        if not self.cache_dir.exists():
+            return 0
+
+        count = 0
+        for cache_file in self.cache_dir.glob("*.json.gz"):
+            try:
+                cache_file.unlink()
+                count += 1
+            except OSError as e:
+                self.logger.warning(f"删除缓存失败 {cache_file}: {e}")
+        return count
+
+    def _cache_file(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json.gz"
@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import os
+import sqlite3
+import tempfile
+from logging import Logger, getLogger
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, Optional, Sequence, Tuple
+
+from toolkits.excel._utils import column_index, row_hash, trim_row
+
+
+class RowDeduplicator:
+    """
+    流式行去重器。
+
+    每行只计算一次 128 位哈希（整行或指定键列），已出现过的哈希保存在内存集合中；
+    内存中的哈希数超过 max_memory_hashes 时写入临时 SQLite 文件（溢出到磁盘），
+    之后的查找先查内存再查磁盘索引，适合超大输入。
+    同一个实例可在多个文件之间共享，实现跨文件去重。
+    空行、表头行与键列全空的行不参与去重。
+    """
+
+    def __init__(
+        self,
+        key_cols: Optional[Sequence[str | int]] = None,
+        header_rows: int = 1,
+        max_memory_hashes: Optional[int] = 5_000_000,
+        spill_dir: Optional[Path | str] = None,
+        logger: Optional[Logger] = None,
+    ):
+        """
+        Args:
+            key_cols: 可选，键列标识列表，支持 'A' 或 1（从1开始），None 表示整行
+            header_rows: 每个工作表的表头行数，表头行总是保留
+            max_memory_hashes: 内存中最多保存的哈希数，None 表示不溢出到磁盘
+            spill_dir: 溢出文件所在目录，None 表示系统临时目录
+            logger: 日志记录器
+        """
+        self.key_indexes = (
+            [column_index(col) - 1 for col in key_cols] if key_cols else None
+        )
+        self.header_rows = header_rows
+        self.max_memory_hashes = max_memory_hashes
+        self.spill_dir = spill_dir
+        self.logger = logger or getLogger(__name__)
+
+        self._hashes: set[bytes] = set()
+        self._spill: Optional[sqlite3.Connection] = None
+        self._spill_path: Optional[str] = None
+        self.kept_count = 0
+        self.dropped_count = 0
+
+    def is_duplicate(self, values: Sequence[Any]) -> bool:
+        """
+        判断一行是否重复；不重复时记录该行
+
+        Args:
+            values: 行值（values_only 形式）
+        """
+        values = trim_row(values)
+        if not values:
+            return False
+
+        if self.key_indexes is not None:
+            width = len(values)
+            values = tuple(values[i] if i < width else None for i in self.key_indexes)
+            if all(value is None for value in values):
+                # 键列全空的行不参与去重（与分组时的空键一致）
+                return False
+        digest = row_hash(values)
+
+        if digest in self._hashes or (
+            self._spill is not None
+            and self._spill.execute(
+                "SELECT 1 FROM hashes WHERE h = ?", (digest,)
+            ).fetchone()
+        ):
+            self.dropped_count += 1
+            return True
+
+        self._hashes.add(digest)
+        self.kept_count += 1
+        if (
+            self.max_memory_hashes is not None
+            and len(self._hashes) >= self.max_memory_hashes
+        ):
+            self._spill_to_disk()
+        return False
+
+    def filter_rows(self, rows: Iterable[Sequence[Any]]) -> Iterator[Sequence[Any]]:
+        """过滤一个工作表的行迭代器：保留表头行，丢弃重复的数据行"""
+        for i, values in enumerate(rows):
+            if i < self.header_rows or not self.is_duplicate(values):
+                yield values
+
+    def row_map(self, rows: Iterable[Tuple[int, Sequence[Any]]]) -> Dict[int, int]:
+        """
+        计算一个工作表去重后的行号映射
+
+        Args:
+            rows: (行号, 行值) 迭代器，行号从 1 开始且递增
+
+        Returns:
+            {原行号: 新行号}，被丢弃的行不在映射中
+        """
+        mapping = {}
+        target = 0
+        for row_num, values in rows:
+            if row_num > self.header_rows and self.is_duplicate(values):
+                continue
+            target += 1
+            mapping[row_num] = target
+        return mapping
+
+    def close(self) -> None:
+        """释放内存与溢出文件"""
+        self._hashes.clear()
+        if self._spill is not None:
+            self._spill.close()
+            self._spill = None
+        if self._spill_path is not None:
+            try:
+                os.unlink(self._spill_path)
+            except OSError as e:
+                self.logger.warning(f"删除去重溢出文件失败 {self._spill_path}: {e}")
+            self._spill_path = None
+
+    def __enter__(self) -> "RowDeduplicator":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _spill_to_disk(self) -> None:
+        """将内存中的哈希写入磁盘索引"""
+        if self._spill is None:
+            fd, self._spill_path = tempfile.mkstemp(
+                prefix="tools4linn_dedup_", suffix=".db", dir=self.spill_dir
+            )
+            os.close(fd)
+            self._spill = sqlite3.connect(self._spill_path)
+            self._spill.execute("PRAGMA journal_mode=OFF")
+            self._spill.execute("PRAGMA synchronous=OFF")
+            self._spill.execute(
+                "CREATE TABLE hashes (h BLOB PRIMARY KEY) WITHOUT ROWID"
+            )
+            self.logger.info(f"去重哈希超过 {self.max_memory_hashes} 个，溢出到磁盘")
+
+        self._spill.executemany(
+            "INSERT OR IGNORE INTO hashes VALUES (?)",
+            ((h,) for h in self._hashes),
+        )
+        self._spill.commit()
+        self._hashes.clear()
@@ -0,0 +1,228 @@
+from __future__ import annotations
+
+from collections import deque
+from logging import Logger, getLogger
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from openpyxl import load_workbook
+from openpyxl.utils import get_column_letter
+
+from toolkits.excel._utils import column_index, row_hash, trim_row
+
+
+class ExcelDiffer:
+    """
+    比较两个 Excel 工作表的差异（如昨天与今天的合并结果）。
+
+    两个文件均以只读模式流式读取，每行计算一次哈希：
+    - 较小的一侧建立 {键: 行} 哈希索引；
+    - 较大的一侧逐行查找索引，哈希相同即视为未变化；
+    - 未指定键列时以整行哈希作为键，只报告新增/删除的行；
+    - 指定键列时按键配对，哈希不同的行再逐单元格比较，报告变化的单元格。
+    总耗时与文件大小成线性关系。
+    """
+
+    def __init__(self, logger: Optional[Logger] = None):
+        self.logger = logger or getLogger(__name__)
+
+    def diff_workbooks(
+        self,
+        old_file: Path | str,
+        new_file: Path | str,
+        key_cols: Optional[List[str | int]] = None,
+        sheet_name: Optional[str] = None,
+        header_rows: int = 1,
+    ) -> Dict[str, Any]:
+        """
+        比较两个工作簿
+
+        Args:
+            old_file: 旧文件路径
+            new_file: 新文件路径
+            key_cols: 可选，键列标识列表，支持 'A' 或 1（从1开始）
+            sheet_name: 工作表名，None 表示第一个工作表
+            header_rows: 表头行数，表头不参与比较
+
+        Returns:
+            包含比较结果的字典:
+            - added: 新增行列表，每项包含 row、key、values
+            - removed: 删除行列表，每项包含 row、key、values
+            - changed: 变化行列表，每项包含 key、old_row、new_row、cells
+              （cells 中每项包含 column、old、new）
+            - unchanged_count: 未变化的行数
+            - duplicate_key_count: 重复键的行数（仅指定键列时）
+        """
+        old_path = Path(old_file)
+        new_path = Path(new_file)
+        for path in (old_path, new_path):
+            if not path.exists():
+                raise FileNotFoundError(f"输入文件不存在: {path}")
+
+        key_indexes = (
+            [column_index(col) - 1 for col in key_cols] if key_cols else None
+        )
+
+        # 为较小的一侧建立索引，流式扫描较大的一侧
+        index_old = old_path.stat().st_size <= new_path.stat().st_size
+        index_path, scan_path = (
+            (old_path, new_path) if index_old else (new_path, old_path)
+        )
+
+        index: Dict[Any, deque] = {}
+        duplicate_key_count = 0
+        for row_num, key, digest, values in self._iter_rows(
+            index_path, sheet_name, header_rows, key_indexes
+        ):
+            entries = index.setdefault(key, deque())
+            if entries and key_indexes is not None:
+                duplicate_key_count += 1
+            entries.append((row_num, digest, values))
+
+        only_scan: List[Dict[str, Any]] = []
+        changed: List[Dict[str, Any]] = []
+        unchanged_count = 0
+        for row_num, key, digest, values in self._iter_rows(
+            scan_path, sheet_name, header_rows, key_indexes
+        ):
+            entries = index.get(key)
+            if not entries:
+                only_scan.append(
+                    {"row": row_num, "key": key if key_indexes else None, "values": values}
+                )
+                continue
+
+            index_row, index_digest, index_values = entries.popleft()
+            if not entries:
+                del index[key]
+
+            if index_digest == digest:
+                unchanged_count += 1
+                continue
+
+            if index_old:
+                old_row, old_values, new_row, new_values = (
+                    index_row, index_values, row_num, values
+                )
+            else:
+                old_row, old_values, new_row, new_values = (
+                    row_num, values, index_row, index_values
+                )
+            changed.append(
+                {
+                    "key": key,
+                    "old_row": old_row,
+                    "new_row": new_row,
+                    "cells": self._diff_cells(old_values, new_values),
+                }
+            )
+
+        only_index = [
+            {"row": row_num, "key": key if key_indexes else None, "values": values}
+            for key, entries in index.items()
+            for row_num, _, values in entries
+        ]
+        only_index.sort(key=lambda item: item["row"])
+
+        if index_old:
+            removed, added = only_index, only_scan
+        else:
+            removed, added = only_scan, only_index
+
+        if duplicate_key_count:
+            self.logger.warning(f"存在 {duplicate_key_count} 行重复键，按出现顺序配对")
+
+        self.logger.info(
+            f"比较完成: 新增={len(added)}, 删除={len(removed)}, "
+            f"变化={len(changed)}, 未变化={unchanged_count}"
+        )
+
+        return {
+            "added": added,
+            "removed": removed,
+            "changed": changed,
+            "unchanged_count": unchanged_count,
+            "duplicate_key_count": duplicate_key_count,
+        }
+
+    @staticmethod
+    def format_report(result: Dict[str, Any], limit: int = 50) -> str:
+        """
+        将比较结果格式化为可读文本
+
+        Args:
+            result: diff_workbooks 的返回值
+            limit: 每类最多列出的条目数
+
+        Returns:
+            格式化后的文本
+        """
+        lines = [
+            f"新增 {len(result['added'])} 行，删除 {len(result['removed'])} 行，"
+            f"变化 {len(result['changed'])} 行，未变化 {result['unchanged_count']} 行"
+        ]
+
+        for title, items in (("新增", result["added"]), ("删除", result["removed"])):
+            if not items:
+                continue
+            lines.append(f"\n{title}:")
+            for item in items[:limit]:
+                lines.append(f"  第 {item['row']} 行: {list(item['values'])}")
+            if len(items) > limit:
+                lines.append(f"  ... 共 {len(items)} 行")
+
+        if result["changed"]:
+            lines.append("\n变化:")
+            for item in result["changed"][:limit]:
+                cells = "，".join(
+                    f"{cell['column']}: {cell['old']!r} -> {cell['new']!r}"
+                    for cell in item["cells"]
+                )
+                lines.append(
+                    f"  第 {item['old_row']} 行 -> 第 {item['new_row']} 行: {cells}"
+                )
+            if len(result["changed"]) > limit:
+                lines.append(f"  ... 共 {len(result['changed'])} 行")
+
+        return "\n".join(lines)
+
+    def _iter_rows(
+        self,
+        file_path: Path,
+        sheet_name: Optional[str],
+        header_rows: int,
+        key_indexes: Optional[List[int]],
+    ) -> Iterator[Tuple[int, Any, bytes, Tuple[Any, ...]]]:
+        """流式读取工作表，产出 (行号, 键, 行哈希, 行值)"""
+        wb = load_workbook(str(file_path), read_only=True, data_only=True)
+        try:
+            ws = wb[sheet_name] if sheet_name else wb.worksheets[0]
+            for row_num, row in enumerate(
+                ws.iter_rows(min_row=header_rows + 1, values_only=True),
+                start=header_rows + 1,
+            ):
+                values = trim_row(row)
+                if not values:
+                    continue
+                digest = row_hash(values)
+                if key_indexes is None:
+                    key = digest
+                else:
+                    key = tuple(
+                        values[i] if i < len(values) else None for i in key_indexes
+                    )
+                yield row_num, key, digest, values
+        finally:
+            wb.close()
+
+    def _diff_cells(
+        self, old_values: Tuple[Any, ...], new_values: Tuple[Any, ...]
+    ) -> List[Dict[str, Any]]:
+        """逐单元格比较两行"""
+        cells = []
+        for i in range(max(len(old_values), len(new_values))):
+            old = old_values[i] if i < len(old_values) else None
+            new = new_values[i] if i < len(new_values) else None
+            if old != new:
+                cells.append({"column": get_column_letter(i + 1), "old": old, "new": new})
+        return cells
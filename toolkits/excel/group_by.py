@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from toolkits.excel._utils import column_index
+
+# 支持的聚合函数及其中文名称
+AGGREGATES = {
+    "sum": "求和",
+    "count": "计数",
+    "min": "最小值",
+    "max": "最大值",
+    "distinct": "去重计数",
+}
+
+_SUM, _COUNT, _MIN, _MAX, _DISTINCT = range(5)
+_KINDS = {"sum": _SUM, "count": _COUNT, "min": _MIN, "max": _MAX, "distinct": _DISTINCT}
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float))
+
+
+class GroupBy:
+    """
+    单次扫描的多聚合分组引擎。
+
+    每个分组只保存一个累加器列表（每个聚合一个槽位，去重计数为集合），
+    逐行调用 add_row() 即可同时计算任意数量的聚合：
+    - sum / min / max：只统计数值（int/float）
+    - count：统计非空值的个数，col 为 None 时统计行数
+    - distinct：统计不同非空值的个数
+    分组按首次出现的顺序输出，键为空（全部键列为空）的行会被跳过。
+    """
+
+    def __init__(
+        self,
+        key_cols: Sequence[str | int],
+        aggregates: Sequence[Tuple[str, Optional[str | int]]],
+        collect_rows: bool = False,
+    ):
+        """
+        Args:
+            key_cols: 分组键列标识列表，支持 'A' 或 1（从1开始）
+            aggregates: (聚合函数, 值列标识) 列表，聚合函数见 AGGREGATES
+            collect_rows: 是否记录每个分组包含的行号
+        """
+        if not key_cols:
+            raise ValueError("分组键列不能为空")
+
+        self._key_indexes = [column_index(col) - 1 for col in key_cols]
+        self._ops: List[Tuple[int, int]] = []
+        self.aggregates: List[Tuple[str, Optional[str | int]]] = []
+        for func, col in aggregates:
+            if func not in _KINDS:
+                raise ValueError(
+                    f"未知的聚合函数: {func}，可选值: {', '.join(AGGREGATES)}"
+                )
+            if col is None and func != "count":
+                raise ValueError(f"聚合函数 {func} 需要指定值列")
+            self._ops.append((_KINDS[func], -1 if col is None else column_index(col) - 1))
+            self.aggregates.append((func, col))
+
+        self.collect_rows = collect_rows
+        self._groups: Dict[Any, list] = {}
+        self.rows: Dict[Any, List[int]] = {}
+
+    def add_row(self, values: Sequence[Any], row_num: Optional[int] = None) -> None:
+        """
+        累加一行
+
+        Args:
+            values: 行值（values_only 形式）
+            row_num: 行号，collect_rows=True 时记录
+        """
+        width = len(values)
+        if len(self._key_indexes) == 1:
+            i = self._key_indexes[0]
+            key = values[i] if i < width else None
+            if key is None:
+                return
+        else:
+            key = tuple(values[i] if i < width else None for i in self._key_indexes)
+            if all(k is None for k in key):
+                return
+
+        acc = self._groups.get(key)
+        if acc is None:
+            acc = self._groups[key] = [
+                set() if kind == _DISTINCT else (0 if kind in (_SUM, _COUNT) else None)
+                for kind, _ in self._ops
+            ]
+            if self.collect_rows:
+                self.rows[key] = []
+
+        if self.collect_rows:
+            self.rows[key].append(row_num)
+
+        for slot, (kind, idx) in enumerate(self._ops):
+            if idx < 0:
+                acc[slot] += 1
+                continue
+            value = values[idx] if idx < width else None
+            if value is None:
+                continue
+            if kind == _SUM:
+                if _is_number(value):
+                    acc[slot] += value
+            elif kind == _COUNT:
+                acc[slot] += 1
+            elif kind == _DISTINCT:
+                acc[slot].add(value)
+            elif _is_number(value):
+                current = acc[slot]
+                if (
+                    current is None
+                    or (kind == _MIN and value < current)
+                    or (kind == _MAX and value > current)
+                ):
+                    acc[slot] = value
+
+    def scan(self, rows: Iterable[Sequence[Any]], start_row: int = 1) -> "GroupBy":
+        """
+        扫描多行
+
+        Args:
+            rows: 行值迭代器
+            start_row: 第一行的行号
+        """
+        for row_num, values in enumerate(rows, start=start_row):
+            self.add_row(values, row_num)
+        return self
+
+    def keys(self) -> List[Any]:
+        """按首次出现顺序返回所有分组键"""
+        return list(self._groups)
+
+    def result(self, key: Any) -> List[Any]:
+        """返回某个分组的聚合结果，顺序与 aggregates 一致"""
+        return [
+            len(value) if isinstance(value, set) else value
+            for value in self._groups[key]
+        ]
+
+    def results(self) -> List[Tuple[Any, List[Any]]]:
+        """返回 [(分组键, 聚合结果列表)]，按首次出现顺序"""
+        return [(key, self.result(key)) for key in self._groups]
@@ -2,10 +2,12 @@ from __future__ import annotations
 
 from logging import Logger, getLogger
 from pathlib import Path
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Tuple
 
 from openpyxl import load_workbook
 
+from toolkits.excel.cache import ParseCache
+
 
 class ExcelHumanLoader:
     """
@@ -13,8 +15,18 @@ class ExcelHumanLoader:
     支持从特定格式的 Excel 表格中提取日期、时间和人员信息。
     """
 
-    def __init__(self, logger: Optional[Logger] = None):
+    def __init__(
+        self, logger: Optional[Logger] = None, cache: Optional[ParseCache] = None
+    ):
+        """
+        Args:
+            logger: 日志记录器
+            cache: 可选的解析缓存，文件内容与参数未变化时直接读取缓存结果
+        """
         self.logger = logger or getLogger(__name__)
+        self.cache = cache
+        # 最近一次加载产生的解析警告
+        self.last_warnings: List[str] = []
 
     def load_humans_from_excel(
         self,
@@ -46,12 +58,49 @@ class ExcelHumanLoader:
         if not input_path.exists():
             raise FileNotFoundError(f"输入文件不存在: {input_path}")
 
+        def parse():
+            return self._parse_humans(
+                input_path, date_col, time_col, name_col, sheet_name
+            )
+
+        if self.cache is not None:
+            humans, warnings = self.cache.load_or_parse(
+                input_path,
+                "human_loader",
+                {
+                    "date_col": date_col,
+                    "time_col": time_col,
+                    "name_col": name_col,
+                    "sheet_name": sheet_name,
+                },
+                parse,
+            )
+        else:
+            humans, warnings = parse()
+
+        for warning in warnings:
+            self.logger.warning(warning)
+        self.last_warnings = warnings
+
+        self.logger.info(f"成功加载 {len(humans)} 条人员信息")
+        return humans
+
+    def _parse_humans(
+        self,
+        input_path: Path,
+        date_col: int,
+        time_col: int,
+        name_col: int,
+        sheet_name: Optional[str],
+    ) -> Tuple[List[Dict[str, str]], List[str]]:
+        """解析人员信息，返回 (人员信息列表, 解析警告列表)"""
         wb = load_workbook(str(input_path))
         ws = wb[sheet_name] if sheet_name else wb.active
         if ws is None:
             raise ValueError(f"工作表不存在")
 
         humans = []
+        warnings: List[str] = []
 
         # 遍历所有行（跳过表头）
         for i, row in enumerate(ws.iter_rows(values_only=True)):
@@ -134,8 +183,7 @@ class ExcelHumanLoader:
                     }
                 )
             except Exception as e:
-                self.logger.warning(f"解析第 {i+1} 行数据失败: {e}")
+                warnings.append(f"解析第 {i+1} 行数据失败: {e}")
                 continue
 
-        self.logger.info(f"成功加载 {len(humans)} 条人员信息")
-        return humans
+        return humans, warnings
@@ -1,9 +1,24 @@
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
 from logging import Logger
 from pathlib import Path
 from openpyxl import load_workbook, Workbook
-from typing import Optional
+from typing import Iterator, Optional
 
-from toolkits.excel._utils import copy_sheet, find_all_excel_files
+from toolkits.excel._utils import (
+    DEFAULT_SAVE_PROFILE,
+    apply_sheet_snapshot,
+    copy_sheet,
+    find_all_excel_files,
+    safe_sheet_title,
+    save_workbook,
+    snapshot_rows,
+    snapshot_sheet,
+    validate_save_profile,
+)
+from toolkits.excel.dedup import RowDeduplicator
+from toolkits.excel.sinks import MergeSink
 from toolkits.utils.naming import INDEXED_STRATEGY, NamingStrategy
 from toolkits.utils.file_filter import FileFilterStrategy
 
@@ -16,6 +31,11 @@ class ExcelMerger:
         output_file: Path,
         sheet_naming_strategy: Optional[NamingStrategy] = None,
         file_filter_strategy: Optional[FileFilterStrategy] = None,
+        save_profile: str = DEFAULT_SAVE_PROFILE,
+        sink: Optional[MergeSink] = None,
+        all_sheets: bool = False,
+        max_workers: int = 1,
+        deduplicator: Optional[RowDeduplicator] = None,
     ):
         self.logger = logger
         self.input_dir = input_dir
@@ -28,8 +48,26 @@ class ExcelMerger:
             self.sheet_naming_strategy = sheet_naming_strategy
 
         self.file_filter_strategy = file_filter_strategy
+        self.save_profile = validate_save_profile(save_profile)
+
+        # Optional non-xlsx output (CSV/JSONL/SQLite); skips all style handling
+        self.sink = sink
+
+        # Merge every sheet of each source instead of only the first one;
+        # output sheets are named "<strategy name>_<sheet title>"
+        self.all_sheets = all_sheets
+
+        # >1 loads and scans sources in that many worker processes
+        self.max_workers = max_workers
+
+        # Drops rows already seen in any earlier sheet/file; shared across the
+        # whole merge. The caller owns it (and closes it).
+        self.deduplicator = deduplicator
 
     def merge_excel(self) -> int:
+        if self.sink is not None:
+            return self._merge_to_sink(self.sink)
+
         wb_out = Workbook()
         if wb_out.active is not None:
             wb_out.remove(wb_out.active)
@@ -38,23 +76,152 @@ class ExcelMerger:
         used_names = set()  # Track used sheet names to avoid duplicates
 
         success_count = 0
-        for excel_file in excel_files:
-            wb_in = load_workbook(excel_file, data_only=True)
-            if len(wb_in.worksheets) == 0:
+        for excel_file, sheets in self._iter_source_sheets(excel_files):
+            if not sheets:
                 self.logger.warning(f"excel file {excel_file} has no sheets")
                 continue
 
-            sheet_name = self.sheet_naming_strategy.generate_name(excel_file)
-            if sheet_name in used_names:
-                self.logger.error(
-                    f"sheet name {sheet_name} already exists, file path: {excel_file}"
+            base_name = self.sheet_naming_strategy.generate_name(excel_file)
+            if not self.all_sheets:
+                sheets = sheets[:1]
+
+            copied = False
+            for title, sheet in sheets:
+                if self.all_sheets:
+                    sheet_name = safe_sheet_title(f"{base_name}_{title}")
+                else:
+                    sheet_name = base_name
+                if sheet_name in used_names:
+                    self.logger.error(
+                        f"sheet name {sheet_name} already exists, file path: {excel_file}"
+                    )
+                    continue
+                used_names.add(sheet_name)
+
+                target_sheet = wb_out.create_sheet(title=sheet_name)
+                if isinstance(sheet, dict):
+                    apply_sheet_snapshot(sheet, target_sheet, self._row_map(sheet))
+                else:
+                    copy_sheet(sheet, target_sheet, self._row_map(sheet))
+                copied = True
+            if copied:
+                success_count += 1
+        save_workbook(wb_out, self.output_file, self.save_profile)
+        self._log_dedup()
+        return success_count
+
+    def _row_map(self, sheet) -> Optional[dict]:
+        """Source-to-target row numbers after dedup, or None without dedup."""
+        if self.deduplicator is None:
+            return None
+        if isinstance(sheet, dict):
+            rows = snapshot_rows(sheet)
+        else:
+            # iter_rows() always starts at row 1, like copy_sheet and snapshot_sheet
+            rows = enumerate(sheet.iter_rows(values_only=True), start=1)
+        return self.deduplicator.row_map(rows)
+
+    def _log_dedup(self) -> None:
+        if self.deduplicator is not None:
+            self.logger.info(
+                f"dedup kept {self.deduplicator.kept_count} rows, "
+                f"dropped {self.deduplicator.dropped_count} duplicates"
+            )
+
+    def _iter_source_sheets(self, excel_files: list[Path]) -> Iterator[tuple]:
+        """
+        Yield (file, [(sheet title, sheet)]) in file order. With max_workers > 1
+        sources are loaded in worker processes and each sheet is a snapshot
+        dict for apply_sheet_snapshot; otherwise it is the worksheet itself.
+
+        At most max_workers snapshots are in flight at once, and sheets over
+        SNAPSHOT_MAX_CELLS are not snapshotted: their file is loaded again in
+        the main process and copied from the worksheet.
+        """
+        if self.max_workers <= 1 or len(excel_files) <= 1:
+            for excel_file in excel_files:
+                wb_in = load_workbook(excel_file, data_only=True)
+                yield excel_file, [(ws.title, ws) for ws in wb_in.worksheets]
+            return
+
+        with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+            def submit(excel_file: Path):
+                return excel_file, executor.submit(
+                    _snapshot_workbook, excel_file, self.all_sheets
                 )
-                continue
-            used_names.add(sheet_name)
 
-            src_sheet = wb_in.worksheets[0]
-            target_sheet = wb_out.create_sheet(title=sheet_name)
-            copy_sheet(src_sheet, target_sheet)
-            success_count += 1
-        wb_out.save(self.output_file)
+            remaining = iter(excel_files)
+            pending = deque(map(submit, islice(remaining, self.max_workers)))
+            while pending:
+                excel_file, future = pending.popleft()
+                snapshots = future.result()
+                next_file = next(remaining, None)
+                if next_file is not None:
+                    pending.append(submit(next_file))
+
+                if all(snap is not None for snap in snapshots):
+                    yield excel_file, [(snap["title"], snap) for snap in snapshots]
+                    continue
+                self.logger.info(
+                    f"sheet too large to snapshot, copying in-process: {excel_file}"
+                )
+                wb_in = load_workbook(excel_file, data_only=True)
+                yield excel_file, [
+                    (ws.title, ws) if snap is None else (snap["title"], snap)
+                    for ws, snap in zip(wb_in.worksheets, snapshots)
+                ]
+
+    def _merge_to_sink(self, sink: MergeSink) -> int:
+        """Stream the first (or every) sheet of each file into sink, row by row."""
+        excel_files = find_all_excel_files(self.input_dir, self.file_filter_strategy)
+        used_names = set()
+
+        success_count = 0
+        row_count = 0
+        sink.open(self.output_file)
+        try:
+            for excel_file in excel_files:
+                wb_in = load_workbook(excel_file, read_only=True, data_only=True)
+                try:
+                    if len(wb_in.worksheets) == 0:
+                        self.logger.warning(f"excel file {excel_file} has no sheets")
+                        continue
+
+                    base_name = self.sheet_naming_strategy.generate_name(excel_file)
+                    sheets = wb_in.worksheets if self.all_sheets else wb_in.worksheets[:1]
+                    copied = False
+                    for src_sheet in sheets:
+                        if self.all_sheets:
+                            sheet_name = safe_sheet_title(f"{base_name}_{src_sheet.title}")
+                        else:
+                            sheet_name = base_name
+                        if sheet_name in used_names:
+                            self.logger.error(
+                                f"sheet name {sheet_name} already exists, file path: {excel_file}"
+                            )
+                            continue
+                        used_names.add(sheet_name)
+
+                        rows = src_sheet.iter_rows(values_only=True)
+                        if self.deduplicator is not None:
+                            rows = self.deduplicator.filter_rows(rows)
+                        row_count += sink.write_sheet(sheet_name, rows)
+                        copied = True
+                    if copied:
+                        success_count += 1
+                finally:
+                    wb_in.close()
+        finally:
+            sink.close()
+
+        self.logger.info(f"wrote {row_count} rows from {success_count} files")
+        self._log_dedup()
         return success_count
+
+
+def _snapshot_workbook(excel_file: Path, all_sheets: bool) -> list[Optional[dict]]:
+    """Worker-process entry: load a source and snapshot its sheet(s);
+    None for sheets over SNAPSHOT_MAX_CELLS."""
+    wb_in = load_workbook(excel_file, data_only=True)
+    sheets = wb_in.worksheets if all_sheets else wb_in.worksheets[:1]
+    return [snapshot_sheet(ws) for ws in sheets]
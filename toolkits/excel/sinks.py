@@ -0,0 +1,306 @@
+"""
+合并结果输出目标
+
+供 ExcelMerger 在只需要数据、不需要 xlsx 样式时使用：
+逐行流式写出到 CSV、JSON Lines 或 SQLite，并附带来源列。
+"""
+
+from __future__ import annotations
+
+import csv
+import datetime
+import json
+import sqlite3
+from abc import ABC, abstractmethod
+from logging import Logger, getLogger
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+
+def to_plain_value(value: Any) -> Any:
+    """将单元格值转为 CSV/JSON/SQLite 均可直接写出的普通值"""
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, datetime.timedelta):
+        return value.total_seconds()
+    return value
+
+
+def normalize_header(header: Sequence[Any], reserved: Iterable[str] = ()) -> List[str]:
+    """
+    将表头行转为非空且不重复的列名
+
+    SQLite 列名不区分大小写，只有大小写不同的列名也视为重复；与 reserved
+    （如来源列）同名的列同样加上 _2、_3... 后缀，避免覆盖
+    """
+    names: List[str] = []
+    seen = {name.lower() for name in reserved}
+    for i, value in enumerate(header, start=1):
+        name = str(value).strip() if value is not None else ""
+        if not name:
+            name = f"col_{i}"
+        base, n = name, 1
+        while name.lower() in seen:
+            n += 1
+            name = f"{base}_{n}"
+        seen.add(name.lower())
+        names.append(name)
+    return names
+
+
+def _non_empty_rows(rows: Iterable[Sequence[Any]]):
+    for row in rows:
+        if any(value is not None for value in row):
+            yield row
+
+
+class MergeSink(ABC):
+    """
+    合并结果输出目标的基类。
+
+    ExcelMerger 依次调用 open()、对每个来源工作表调用 write_sheet()、最后调用 close()。
+    """
+
+    def __init__(
+        self,
+        header: bool = True,
+        source_column: str = "source",
+        logger: Optional[Logger] = None,
+    ):
+        """
+        Args:
+            header: 是否将每个工作表的第一行非空行视为表头
+            source_column: 来源列的列名，值为命名策略生成的名称
+            logger: 日志记录器
+        """
+        self.header = header
+        self.source_column = source_column
+        self.logger = logger or getLogger(__name__)
+
+    @abstractmethod
+    def open(self, output_file: Path) -> None:
+        """打开输出目标"""
+
+    @abstractmethod
+    def write_sheet(self, source_name: str, rows: Iterable[Sequence[Any]]) -> int:
+        """
+        写出一个工作表的所有行
+
+        Args:
+            source_name: 来源名称
+            rows: 行值迭代器（values_only 形式）
+
+        Returns:
+            写出的数据行数（不含表头）
+        """
+
+    @abstractmethod
+    def close(self) -> None:
+        """关闭输出目标"""
+
+    def _split_header(self, rows: Iterable[Sequence[Any]]):
+        """返回 (列名列表或 None, 数据行迭代器)"""
+        rows = _non_empty_rows(rows)
+        if not self.header:
+            return None, rows
+        first = next(rows, None)
+        if first is None:
+            return None, iter(())
+        return normalize_header(first, reserved=(self.source_column,)), rows
+
+
+class CsvSink(MergeSink):
+    """
+    输出为 CSV 文件。
+
+    表头取自第一个工作表，后续工作表的表头行会被跳过，数据按列位置写出，
+    因此要求各来源的列顺序一致。
+    """
+
+    def __init__(self, encoding: str = "utf-8-sig", **kwargs):
+        """
+        Args:
+            encoding: 文件编码，默认带 BOM 以便 Excel 正确识别中文
+        """
+        super().__init__(**kwargs)
+        self.encoding = encoding
+        self._file = None
+        self._writer = None
+        self._columns: Optional[List[str]] = None
+
+    def open(self, output_file: Path) -> None:
+        self._file = open(output_file, "w", encoding=self.encoding, newline="")
+        self._writer = csv.writer(self._file)
+        self._columns = None
+
+    def write_sheet(self, source_name: str, rows: Iterable[Sequence[Any]]) -> int:
+        columns, data_rows = self._split_header(rows)
+        if columns is not None:
+            if self._columns is None:
+                self._columns = columns
+                self._writer.writerow([self.source_column, *columns])
+            elif columns != self._columns:
+                self.logger.warning(f"{source_name} 的表头与第一个工作表不一致，按列位置写出")
+
+        count = 0
+        for row in data_rows:
+            self._writer.writerow([source_name, *map(to_plain_value, row)])
+            count += 1
+        return count
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            self._writer = None
+
+
+class JsonLinesSink(MergeSink):
+    """
+    输出为 JSON Lines 文件，每行一个 JSON 对象。
+
+    有表头时每行为 {来源列: 来源名称, 列名: 值, ...}，
+    无表头时为 {来源列: 来源名称, "values": [...]}。
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._file = None
+
+    def open(self, output_file: Path) -> None:
+        self._file = open(output_file, "w", encoding="utf-8")
+
+    def write_sheet(self, source_name: str, rows: Iterable[Sequence[Any]]) -> int:
+        columns, data_rows = self._split_header(rows)
+
+        count = 0
+        for row in data_rows:
+            record = {self.source_column: source_name}
+            if columns is None:
+                record["values"] = list(row)
+            else:
+                record.update(zip(columns, row))
+            self._file.write(
+                json.dumps(record, ensure_ascii=False, default=to_plain_value)
+            )
+            self._file.write("\n")
+            count += 1
+        return count
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class SqliteSink(MergeSink):
+    """
+    输出到 SQLite 数据库中的一张表。
+
+    有表头时按列名写入，后续工作表出现新列会自动添加；无表头时列名为 col_1、col_2...
+    来源列与 index_columns 中的列会在写入完成后建立索引。
+    """
+
+    def __init__(
+        self,
+        table: str = "merged",
+        index_columns: Optional[List[str]] = None,
+        batch_size: int = 1000,
+        **kwargs,
+    ):
+        """
+        Args:
+            table: 表名，已存在时会先删除
+            index_columns: 需要建立索引的列名
+            batch_size: 每批 executemany 写入的行数
+        """
+        super().__init__(**kwargs)
+        self.table = table
+        self.index_columns = index_columns or []
+        self.batch_size = batch_size
+        self._conn: Optional[sqlite3.Connection] = None
+        # {小写列名: 表中的列名}，SQLite 列名不区分大小写
+        self._columns: Dict[str, str] = {}
+
+    def open(self, output_file: Path) -> None:
+        self._conn = sqlite3.connect(str(output_file))
+        # WAL 下中途崩溃不会损坏数据库，NORMAL 同步只在检查点时 fsync
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(f"DROP TABLE IF EXISTS {quote_identifier(self.table)}")
+        self._conn.execute(
+            f"CREATE TABLE {quote_identifier(self.table)} "
+            f"({quote_identifier(self.source_column)})"
+        )
+        self._columns = {self.source_column.lower(): self.source_column}
+
+    def write_sheet(self, source_name: str, rows: Iterable[Sequence[Any]]) -> int:
+        columns, data_rows = self._split_header(rows)
+
+        width = len(columns) if columns is not None else 0
+        insert_sql = self._prepare_insert(columns) if columns is not None else None
+
+        count = 0
+        batch = []
+        for row in data_rows:
+            if columns is None and len(row) > width:
+                # 无表头时按出现的最大列数扩展列
+                if batch:
+                    self._conn.executemany(insert_sql, batch)
+                    batch.clear()
+                width = len(row)
+                insert_sql = self._prepare_insert(
+                    [f"col_{i}" for i in range(1, width + 1)]
+                )
+            values = [to_plain_value(v) for v in row[:width]]
+            values.extend([None] * (width - len(values)))
+            batch.append((source_name, *values))
+            if len(batch) >= self.batch_size:
+                self._conn.executemany(insert_sql, batch)
+                batch.clear()
+            count += 1
+
+        if batch:
+            self._conn.executemany(insert_sql, batch)
+        return count
+
+    def close(self) -> None:
+        if self._conn is None:
+            return
+        for column in [self.source_column, *self.index_columns]:
+            if column.lower() not in self._columns:
+                self.logger.warning(f"索引列不存在，已跳过: {column}")
+                continue
+            index_name = f"idx_{self.table}_{column}"
+            self._conn.execute(
+                f"CREATE INDEX IF NOT EXISTS {quote_identifier(index_name)} "
+                f"ON {quote_identifier(self.table)} ({quote_identifier(column)})"
+            )
+        self._conn.commit()
+        # 写入完成后切回默认日志模式，合并 WAL 文件，输出只剩一个数据库文件
+        self._conn.execute("PRAGMA journal_mode=DELETE")
+        self._conn.close()
+        self._conn = None
+
+    def _prepare_insert(self, sheet_columns: List[str]) -> str:
+        """确保列存在并返回插入语句（只有大小写不同的列名写入同一列）"""
+        for column in sheet_columns:
+            if column.lower() not in self._columns:
+                self._conn.execute(
+                    f"ALTER TABLE {quote_identifier(self.table)} "
+                    f"ADD COLUMN {quote_identifier(column)}"
+                )
+                self._columns[column.lower()] = column
+        names = ", ".join(
+            quote_identifier(c) for c in [self.source_column, *sheet_columns]
+        )
+        placeholders = ", ".join("?" * (len(sheet_columns) + 1))
+        return (
+            f"INSERT INTO {quote_identifier(self.table)} ({names}) "
+            f"VALUES ({placeholders})"
+        )
+
+
+def quote_identifier(identifier: str) -> str:
+    """SQLite 标识符转义"""
+    return '"' + identifier.replace('"', '""') + '"'
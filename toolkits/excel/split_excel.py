@@ -2,10 +2,19 @@ from __future__ import annotations
 
 from logging import Logger, getLogger
 from pathlib import Path
-from typing import Optional, Dict, List, Any
+from typing import Optional, List, Sequence, Tuple
 
-from openpyxl import load_workbook
+from openpyxl import Workbook, load_workbook
 from openpyxl.styles import Border, Side
+from openpyxl.utils import get_column_letter
+
+from toolkits.excel._utils import (
+    DEFAULT_SAVE_PROFILE,
+    column_index,
+    save_workbook,
+    validate_save_profile,
+)
+from toolkits.excel.group_by import AGGREGATES, GroupBy
 
 
 class ExcelSplitter:
@@ -30,7 +39,10 @@ class ExcelSplitter:
         input_file: Path | str,
         output_file: Optional[Path | str] = None,
         amount_col: int = 8,
+        save_profile: str = DEFAULT_SAVE_PROFILE,
     ) -> Path:
+        validate_save_profile(save_profile)
+
         input_path = Path(input_file)
         if output_file is None:
             output_path = input_path.with_name(
@@ -53,14 +65,14 @@ class ExcelSplitter:
                 f"工作表至少需要 {amount_col} 列（H列），当前只有 {ws.max_column} 列"
             )
 
-        groups: Dict[Any, List[int]] = {}
-        for row in range(2, ws.max_row + 1):
-            key = ws.cell(row=row, column=1).value
-            if key is None:
-                continue
-            groups.setdefault(key, []).append(row)
+        # 单次扫描完成分组与金额汇总
+        group_by = GroupBy([1], [("sum", amount_col)], collect_rows=True)
+        group_by.scan(ws.iter_rows(min_row=2, values_only=True), start_row=2)
+
+        for key in group_by.keys():
+            rows = group_by.rows[key]
+            total = group_by.result(key)[0]
 
-        for key, rows in groups.items():
             # 生成 sheet 名称（安全处理、最长31字符）
             sheet_name = str(key)[:31]
             for char in "\\/?*[]:":
@@ -85,17 +97,11 @@ class ExcelSplitter:
                     dst.protection = src.protection.copy()
                     dst.alignment = src.alignment.copy()
 
-            total = 0
             # 写入数据行，第一列为重新编号
             for i, old_row in enumerate(rows, start=2):
                 for col in range(1, max_col + 1):
                     src = ws.cell(old_row, col)
-                    if col == 1:
-                        val = i - 1
-                    else:
-                        val = src.value
-                        if col == amount_col and isinstance(val, (int, float)):
-                            total += val
+                    val = i - 1 if col == 1 else src.value
                     dst = new_ws.cell(i, col, value=val)
                     if src.has_style:
                         dst.font = src.font.copy()
@@ -137,6 +143,81 @@ class ExcelSplitter:
             wb.remove(wb[original_sheet_name])
 
         # 保存
-        wb.save(str(output_path))
+        save_workbook(wb, output_path, save_profile)
         self.logger.info(f"处理完成，输出文件: {output_path}")
         return output_path
+
+    def summarize(
+        self,
+        input_file: Path | str,
+        output_file: Optional[Path | str] = None,
+        key_cols: Sequence[str | int] = (1,),
+        aggregates: Sequence[Tuple[str, Optional[str | int]]] = (("sum", 8),),
+        sheet_name: Optional[str] = None,
+        save_profile: str = DEFAULT_SAVE_PROFILE,
+    ) -> Path:
+        """
+        汇总模式：只读流式扫描一次，按键列分组计算聚合，输出一张汇总表。
+        适用于几十万行的大表，不复制任何明细行与样式。
+
+        Args:
+            input_file: 输入文件路径
+            output_file: 输出文件路径，默认为原文件名加 `_summary` 后缀
+            key_cols: 分组键列标识列表，支持 'A' 或 1（从1开始）
+            aggregates: (聚合函数, 值列标识) 列表，聚合函数为
+                sum/count/min/max/distinct，count 的值列为 None 时统计行数
+            sheet_name: 工作表名，None 表示激活的工作表
+            save_profile: 保存配置 fast/balanced/small
+
+        Returns:
+            输出文件路径
+        """
+        validate_save_profile(save_profile)
+
+        input_path = Path(input_file)
+        if output_file is None:
+            output_path = input_path.with_name(f"{input_path.stem}_summary.xlsx")
+        else:
+            output_path = Path(output_file)
+
+        if not input_path.exists():
+            raise FileNotFoundError(f"输入文件不存在: {input_path}")
+
+        group_by = GroupBy(key_cols, aggregates)
+
+        wb = load_workbook(str(input_path), read_only=True, data_only=True)
+        try:
+            ws = wb[sheet_name] if sheet_name else wb.active
+            if ws is None:
+                raise ValueError("工作表不存在")
+
+            rows = ws.iter_rows(values_only=True)
+            header = next(rows, None) or ()
+            group_by.scan(rows, start_row=2)
+        finally:
+            wb.close()
+
+        def header_name(col: str | int) -> str:
+            idx = column_index(col) - 1
+            value = header[idx] if idx < len(header) else None
+            return str(value) if value is not None else get_column_letter(idx + 1)
+
+        out_wb = Workbook(write_only=True)
+        out_ws = out_wb.create_sheet(title="汇总")
+        titles: List[str] = [header_name(col) for col in key_cols]
+        for func, col in aggregates:
+            if col is None:
+                titles.append("行数")
+            else:
+                titles.append(f"{header_name(col)}{AGGREGATES[func]}")
+        out_ws.append(titles)
+
+        for key, values in group_by.results():
+            key_values = list(key) if len(key_cols) > 1 else [key]
+            out_ws.append(key_values + values)
+
+        save_workbook(out_wb, output_path, save_profile)
+        self.logger.info(
+            f"汇总完成，共 {len(group_by.keys())} 个分组，输出文件: {output_path}"
+        )
+        return output_path
@@ -0,0 +1,227 @@
+"""
+Excel 到 SQLite 的导入与索引查询
+
+将一个或多个工作簿以只读流式方式批量导入本地 SQLite 文件，并为指定列建立索引，
+之后的按键查找直接命中索引，无需重新解析 xlsx。
+
+用法:
+    python -m toolkits.excel.sqlite_index ingest ledger.db 台账/ 补充.xlsx --index 单号 客户
+    python -m toolkits.excel.sqlite_index query ledger.db 单号=A1024
+"""
+
+from __future__ import annotations
+
+import argparse
+import sqlite3
+import sys
+from contextlib import closing
+from logging import Logger, getLogger
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from openpyxl import load_workbook
+
+from toolkits.excel._utils import find_all_excel_files
+from toolkits.excel.sinks import SqliteSink, quote_identifier
+
+
+class ExcelSqliteIndex:
+    """Excel 数据的 SQLite 索引"""
+
+    def __init__(
+        self,
+        db_file: Path | str,
+        table: str = "data",
+        logger: Optional[Logger] = None,
+    ):
+        """
+        Args:
+            db_file: SQLite 文件路径
+            table: 表名
+            logger: 日志记录器
+        """
+        self.db_file = Path(db_file)
+        self.table = table
+        self.logger = logger or getLogger(__name__)
+
+    def ingest(
+        self,
+        sources: Iterable[Path | str],
+        index_columns: Optional[List[str]] = None,
+        sheet_name: Optional[str] = None,
+        header: bool = True,
+        batch_size: int = 5000,
+    ) -> int:
+        """
+        导入工作簿（重建整张表）
+
+        Args:
+            sources: 工作簿文件或目录（目录会递归查找 Excel 文件）
+            index_columns: 需要建立索引的列名（表头名称）
+            sheet_name: 工作表名，None 表示第一个工作表
+            header: 第一行非空行是否为表头，否则列名为 col_1、col_2...
+            batch_size: 每批 executemany 写入的行数
+
+        Returns:
+            导入的数据行数
+        """
+        excel_files: List[Path] = []
+        for source in sources:
+            path = Path(source)
+            if path.is_dir():
+                excel_files.extend(find_all_excel_files(path))
+            elif path.exists():
+                excel_files.append(path)
+            else:
+                raise FileNotFoundError(f"输入文件不存在: {path}")
+
+        sink = SqliteSink(
+            table=self.table,
+            index_columns=index_columns,
+            batch_size=batch_size,
+            header=header,
+            logger=self.logger,
+        )
+
+        row_count = 0
+        sink.open(self.db_file)
+        try:
+            for excel_file in excel_files:
+                wb = load_workbook(excel_file, read_only=True, data_only=True)
+                try:
+                    ws = wb[sheet_name] if sheet_name else wb.worksheets[0]
+                    count = sink.write_sheet(
+                        excel_file.name, ws.iter_rows(values_only=True)
+                    )
+                finally:
+                    wb.close()
+                row_count += count
+                self.logger.info(f"已导入 {excel_file.name}: {count} 行")
+        finally:
+            sink.close()
+
+        self.logger.info(
+            f"导入完成，共 {len(excel_files)} 个文件、{row_count} 行，数据库: {self.db_file}"
+        )
+        return row_count
+
+    def columns(self) -> List[str]:
+        """返回表的所有列名"""
+        with closing(self._connect()) as conn:
+            sql = f"PRAGMA table_info({quote_identifier(self.table)})"
+            return [row[1] for row in conn.execute(sql)]
+
+    def lookup(
+        self, conditions: Dict[str, Any], limit: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        按列值精确查找，多个条件为 AND 关系
+
+        列不声明类型，值按写入时的类型比较：文本 '1024' 与数字 1024 不相等，
+        不确定单元格存为文本还是数字时，传入列表同时匹配两种形式。
+
+        Args:
+            conditions: {列名: 值}，列名不区分大小写，值为列表或元组时匹配其中任一值
+            limit: 最多返回的行数
+
+        Returns:
+            匹配行列表，每行为 {列名: 值}
+        """
+        if not self.db_file.exists():
+            raise FileNotFoundError(f"数据库不存在: {self.db_file}")
+
+        # 与 SQLite 相同，列名不区分大小写，条件中的列名换成表中的写法
+        columns = {name.lower(): name for name in self.columns()}
+        unknown = [name for name in conditions if name.lower() not in columns]
+        if unknown:
+            raise ValueError(f"列不存在: {', '.join(unknown)}")
+
+        # 用 = / IN 比较，查询仍可命中索引
+        clauses = []
+        params: List[Any] = []
+        for name, value in conditions.items():
+            name = columns[name.lower()]
+            if isinstance(value, (list, tuple)):
+                placeholders = ", ".join("?" * len(value))
+                clauses.append(f"{quote_identifier(name)} IN ({placeholders})")
+                params.extend(value)
+            else:
+                clauses.append(f"{quote_identifier(name)} = ?")
+                params.append(value)
+
+        sql = f"SELECT * FROM {quote_identifier(self.table)}"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        if limit is not None:
+            sql += f" LIMIT {int(limit)}"
+
+        with closing(self._connect()) as conn:
+            conn.row_factory = sqlite3.Row
+            return [dict(row) for row in conn.execute(sql, params)]
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(str(self.db_file))
+
+
+def _parse_value(text: str) -> List[Any]:
+    """
+    命令行中的值：文本本身，能转为数字时再加上数字形式
+
+    同一列中的单元格可能存为文本也可能存为数字，两种形式都匹配
+    """
+    values: List[Any] = [text]
+    for convert in (int, float):
+        try:
+            values.append(convert(text))
+            break
+        except ValueError:
+            pass
+    return values
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Excel 到 SQLite 的导入与查询")
+    parser.add_argument("--table", default="data", help="表名")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    ingest = subparsers.add_parser("ingest", help="导入工作簿")
+    ingest.add_argument("db", type=Path, help="SQLite 文件")
+    ingest.add_argument("sources", nargs="+", type=Path, help="工作簿文件或目录")
+    ingest.add_argument("--index", nargs="*", default=[], help="需要建立索引的列名")
+    ingest.add_argument("--sheet", help="工作表名")
+    ingest.add_argument("--no-header", action="store_true", help="第一行不是表头")
+
+    query = subparsers.add_parser("query", help="按列值查找")
+    query.add_argument("db", type=Path, help="SQLite 文件")
+    query.add_argument("conditions", nargs="*", help="列名=值")
+    query.add_argument("--limit", type=int, help="最多返回的行数")
+
+    args = parser.parse_args(argv)
+    index = ExcelSqliteIndex(args.db, table=args.table)
+
+    if args.command == "ingest":
+        count = index.ingest(
+            args.sources,
+            index_columns=args.index,
+            sheet_name=args.sheet,
+            header=not args.no_header,
+        )
+        print(f"已导入 {count} 行")
+        return 0
+
+    conditions = {}
+    for condition in args.conditions:
+        name, sep, value = condition.partition("=")
+        if not sep:
+            parser.error(f"条件格式应为 列名=值: {condition}")
+        conditions[name] = _parse_value(value)
+
+    rows = index.lookup(conditions, limit=args.limit)
+    for row in rows:
+        print(row)
+    print(f"共 {len(rows)} 行")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
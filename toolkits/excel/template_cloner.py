@@ -0,0 +1,415 @@
+"""
+模板克隆
+
+从一个 xlsx 模板批量生成只有少数单元格不同的工作簿。
+
+模板包只读取一次：未改动的 zip 成员以原始压缩字节原样复制，
+只有目标工作表的 XML 会按目标单元格切分为片段，每次输出时拼接新单元格后重新压缩，
+避免为每个输出执行一次完整的 openpyxl 加载/保存。
+"""
+
+from __future__ import annotations
+
+import datetime
+import re
+import struct
+import zlib
+from logging import Logger, getLogger
+from pathlib import Path, PurePosixPath
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from xml.etree import ElementTree
+from xml.sax.saxutils import escape
+from zipfile import ZIP_DEFLATED, ZIP_STORED, ZipFile
+
+from openpyxl.utils import column_index_from_string
+from openpyxl.utils.cell import coordinate_from_string
+from openpyxl.utils.datetime import to_excel
+
+from toolkits.excel._utils import DEFAULT_SAVE_PROFILE, SAVE_PROFILES, validate_save_profile
+
+_NS_MAIN = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+_NS_REL = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+_NS_PKG_REL = "http://schemas.openxmlformats.org/package/2006/relationships"
+
+_CALC_CHAIN = "xl/calcChain.xml"
+_ATTR_RE = re.compile(r'([\w:]+)="([^"]*)"')
+
+
+class _Member:
+    """zip 成员：名称、时间、压缩方式、CRC、大小与（已压缩的）原始字节"""
+
+    __slots__ = ("name", "date_time", "method", "crc", "file_size", "raw")
+
+    def __init__(self, name, date_time, method, crc, file_size, raw):
+        self.name = name
+        self.date_time = date_time
+        self.method = method
+        self.crc = crc
+        self.file_size = file_size
+        self.raw = raw
+
+    @classmethod
+    def compress(cls, name, date_time, data: bytes, level: int) -> "_Member":
+        compressor = zlib.compressobj(level, zlib.DEFLATED, -15)
+        raw = compressor.compress(data) + compressor.flush()
+        return cls(name, date_time, ZIP_DEFLATED, zlib.crc32(data), len(data), raw)
+
+
+def _dos_time(date_time) -> Tuple[int, int]:
+    year, month, day, hour, minute, second = date_time
+    dos_date = (max(year, 1980) - 1980) << 9 | month << 5 | day
+    dos_time = hour << 11 | minute << 5 | second // 2
+    return dos_time, dos_date
+
+
+def _write_zip(output_file: Path, members: Iterable[_Member]) -> None:
+    """以已压缩的成员字节写出 zip 包（不再重新压缩）"""
+    central = []
+    with open(output_file, "wb") as f:
+        for m in members:
+            name = m.name.encode("utf-8")
+            flags = 0x800 if not m.name.isascii() else 0
+            dos_time, dos_date = _dos_time(m.date_time)
+            offset = f.tell()
+            if offset > 0xFFFFFFFF or len(m.raw) > 0xFFFFFFFF:
+                raise ValueError("输出超过 4GB，不支持模板克隆")
+            common = struct.pack(
+                "<HHHHHIII",
+                20,
+                flags,
+                m.method,
+                dos_time,
+                dos_date,
+                m.crc,
+                len(m.raw),
+                m.file_size,
+            )
+            f.write(b"PK\x03\x04" + common + struct.pack("<HH", len(name), 0) + name)
+            f.write(m.raw)
+            central.append(
+                b"PK\x01\x02"
+                + struct.pack("<H", 20)
+                + common
+                + struct.pack("<HHHHHII", len(name), 0, 0, 0, 0, 0, offset)
+                + name
+            )
+
+        cd_offset = f.tell()
+        cd = b"".join(central)
+        f.write(cd)
+        f.write(
+            b"PK\x05\x06"
+            + struct.pack("<HHHHIIH", 0, 0, len(central), len(central), len(cd), cd_offset, 0)
+        )
+
+
+def _cell_ref(coordinate: str) -> Tuple[int, int, str]:
+    """返回 (行号, 列号, 规范化坐标)"""
+    col_letter, row = coordinate_from_string(coordinate.upper().replace("$", ""))
+    return row, column_index_from_string(col_letter), f"{col_letter}{row}"
+
+
+def _cell_pattern(coordinate: str) -> re.Pattern:
+    return re.compile(
+        rf'<c\b([^>]*?)\br="{coordinate}"([^>]*?)(?:/>|>.*?</c>)', re.DOTALL
+    )
+
+
+def _row_pattern(row: int) -> re.Pattern:
+    return re.compile(rf'<row\b[^>]*?\br="{row}"[^>]*?(?:/>|>.*?</row>)', re.DOTALL)
+
+
+class TemplateCloner:
+    """
+    基于 XML 片段拼接的模板克隆引擎。
+
+    用法:
+        cloner = TemplateCloner("模板.xlsx", ["B2", "D5"])
+        cloner.render("张三.xlsx", {"B2": "张三", "D5": 1200})
+        cloner.render("李四.xlsx", {"B2": "李四", "D5": 980})
+
+    目标单元格原有的样式（s 属性）会保留；字符串写为内联字符串，以 "=" 开头的字符串写为公式，
+    日期时间转为 Excel 序列值（需要模板单元格已设置日期格式）。
+    模板中的 calcChain 会被移除并设置打开时重新计算，保证依赖目标单元格的公式结果正确。
+    """
+
+    def __init__(
+        self,
+        template_file: Path | str,
+        cells: List[str],
+        sheet_name: Optional[str] = None,
+        save_profile: str = DEFAULT_SAVE_PROFILE,
+        logger: Optional[Logger] = None,
+    ):
+        """
+        Args:
+            template_file: 模板文件路径
+            cells: 目标单元格坐标列表，如 ["B2", "D5"]
+            sheet_name: 工作表名，None 表示第一个工作表
+            save_profile: 保存配置，控制重新生成的工作表 XML 的压缩级别
+            logger: 日志记录器
+        """
+        self.logger = logger or getLogger(__name__)
+        self.template_file = Path(template_file)
+        if not self.template_file.exists():
+            raise FileNotFoundError(f"模板文件不存在: {self.template_file}")
+        if not cells:
+            raise ValueError("目标单元格不能为空")
+
+        _, self._compresslevel = SAVE_PROFILES[validate_save_profile(save_profile)]
+
+        with ZipFile(self.template_file) as zf, open(self.template_file, "rb") as f:
+            self.sheet_part = self._resolve_sheet_part(zf, sheet_name)
+            static_patches = self._static_patches(zf)
+
+            self._members: List[Optional[_Member]] = []
+            self._sheet_info = None
+            for info in zf.infolist():
+                if info.filename == self.sheet_part:
+                    self._sheet_info = info
+                    self._members.append(None)  # 占位：每次输出时生成
+                elif info.filename == _CALC_CHAIN:
+                    continue
+                elif info.filename in static_patches:
+                    self._members.append(
+                        _Member.compress(
+                            info.filename,
+                            info.date_time,
+                            static_patches[info.filename],
+                            self._compresslevel,
+                        )
+                    )
+                else:
+                    self._members.append(self._read_raw(f, zf, info))
+
+            sheet_xml = zf.read(self.sheet_part).decode("utf-8")
+
+        self.cells = [_cell_ref(c)[2] for c in cells]
+        self._segments, self._cell_attrs = self._split_sheet(sheet_xml, cells)
+        self.logger.info(
+            f"已加载模板 {self.template_file.name}，工作表 {self.sheet_part}，"
+            f"目标单元格 {len(self.cells)} 个"
+        )
+
+    def render(self, output_file: Path | str, values: Dict[str, Any]) -> Path:
+        """
+        生成一个输出文件
+
+        Args:
+            output_file: 输出文件路径
+            values: {单元格坐标: 值}，未提供的目标单元格保持为空
+
+        Returns:
+            输出文件路径
+        """
+        output_path = Path(output_file)
+        normalized = {_cell_ref(k)[2]: v for k, v in values.items()}
+        unknown = set(normalized) - set(self.cells)
+        if unknown:
+            raise ValueError(f"未声明的目标单元格: {', '.join(sorted(unknown))}")
+
+        parts = [self._segments[0]]
+        for i, coordinate in enumerate(self.cells):
+            parts.append(
+                self._render_cell(
+                    coordinate, self._cell_attrs[i], normalized.get(coordinate)
+                )
+            )
+            parts.append(self._segments[i + 1])
+        sheet = _Member.compress(
+            self.sheet_part,
+            self._sheet_info.date_time,
+            "".join(parts).encode("utf-8"),
+            self._compresslevel,
+        )
+
+        _write_zip(output_path, (m if m is not None else sheet for m in self._members))
+        return output_path
+
+    def render_many(
+        self, jobs: Iterable[Tuple[Path | str, Dict[str, Any]]]
+    ) -> List[Path]:
+        """
+        批量生成输出文件
+
+        Args:
+            jobs: (输出文件路径, {单元格坐标: 值}) 的可迭代对象
+
+        Returns:
+            输出文件路径列表
+        """
+        outputs = [self.render(output_file, values) for output_file, values in jobs]
+        self.logger.info(f"已根据模板生成 {len(outputs)} 个文件")
+        return outputs
+
+    def _resolve_sheet_part(self, zf: ZipFile, sheet_name: Optional[str]) -> str:
+        """根据工作表名找到对应的工作表 XML 路径"""
+        workbook = ElementTree.fromstring(zf.read("xl/workbook.xml"))
+        sheets = workbook.findall(f"{{{_NS_MAIN}}}sheets/{{{_NS_MAIN}}}sheet")
+        if not sheets:
+            raise ValueError("模板中没有工作表")
+
+        if sheet_name is None:
+            sheet = sheets[0]
+        else:
+            matched = [s for s in sheets if s.get("name") == sheet_name]
+            if not matched:
+                raise ValueError(f"工作表 {sheet_name} 不存在")
+            sheet = matched[0]
+
+        rel_id = sheet.get(f"{{{_NS_REL}}}id")
+        rels = ElementTree.fromstring(zf.read("xl/_rels/workbook.xml.rels"))
+        for rel in rels.findall(f"{{{_NS_PKG_REL}}}Relationship"):
+            if rel.get("Id") == rel_id:
+                target = rel.get("Target")
+                if target.startswith("/"):
+                    return target.lstrip("/")
+                return str(PurePosixPath("xl") / target)
+        raise ValueError(f"无法找到工作表 {sheet.get('name')} 的数据")
+
+    def _static_patches(self, zf: ZipFile) -> Dict[str, bytes]:
+        """移除 calcChain 并设置打开时重新计算（与输出无关，只处理一次）"""
+        patches = {}
+        names = set(zf.namelist())
+
+        workbook = zf.read("xl/workbook.xml").decode("utf-8")
+        if re.search(r"<calcPr\b", workbook):
+            if "fullCalcOnLoad=" in workbook:
+                workbook = re.sub(
+                    r'(<calcPr\b[^>]*?)fullCalcOnLoad="[^"]*"',
+                    r'\1fullCalcOnLoad="1"',
+                    workbook,
+                )
+            else:
+                workbook = re.sub(r"<calcPr\b", '<calcPr fullCalcOnLoad="1"', workbook)
+        else:
+            calc_pr = '<calcPr fullCalcOnLoad="1"/>'
+            for anchor in (
+                r"</definedNames>|<definedNames\s*/>",
+                r"</externalReferences>",
+                r"</functionGroups>|<functionGroups\s*/>",
+                r"</sheets>",
+            ):
+                match = re.search(anchor, workbook)
+                if match:
+                    workbook = (
+                        workbook[: match.end()] + calc_pr + workbook[match.end() :]
+                    )
+                    break
+        patches["xl/workbook.xml"] = workbook.encode("utf-8")
+
+        if _CALC_CHAIN in names:
+            content_types = zf.read("[Content_Types].xml").decode("utf-8")
+            patches["[Content_Types].xml"] = re.sub(
+                r'<Override\b[^>]*PartName="/xl/calcChain\.xml"[^>]*/>', "", content_types
+            ).encode("utf-8")
+            rels = zf.read("xl/_rels/workbook.xml.rels").decode("utf-8")
+            patches["xl/_rels/workbook.xml.rels"] = re.sub(
+                r'<Relationship\b[^>]*Target="[^"]*calcChain\.xml"[^>]*/>', "", rels
+            ).encode("utf-8")
+
+        return patches
+
+    def _read_raw(self, f, zf: ZipFile, info) -> _Member:
+        """读取成员的原始压缩字节"""
+        if info.flag_bits & 0x1 or info.compress_type not in (ZIP_STORED, ZIP_DEFLATED):
+            # 加密或其他压缩方式：解压后重新压缩
+            return _Member.compress(
+                info.filename, info.date_time, zf.read(info), self._compresslevel
+            )
+        f.seek(info.header_offset)
+        header = f.read(30)
+        name_len, extra_len = struct.unpack("<HH", header[26:30])
+        f.seek(info.header_offset + 30 + name_len + extra_len)
+        raw = f.read(info.compress_size)
+        return _Member(
+            info.filename,
+            info.date_time,
+            info.compress_type,
+            info.CRC,
+            info.file_size,
+            raw,
+        )
+
+    def _split_sheet(
+        self, xml: str, cells: List[str]
+    ) -> Tuple[List[str], List[Dict[str, str]]]:
+        """将工作表 XML 按目标单元格切分为片段，缺失的单元格会先插入"""
+        refs = sorted((_cell_ref(c) for c in cells), key=lambda r: (r[0], r[1]))
+        if len({r[2] for r in refs}) != len(refs):
+            raise ValueError("目标单元格重复")
+
+        for row, col, coordinate in refs:
+            if not _cell_pattern(coordinate).search(xml):
+                xml = self._insert_cell(xml, row, col, coordinate)
+
+        segments = []
+        attrs = []
+        spans = {}
+        for _, _, coordinate in refs:
+            match = _cell_pattern(coordinate).search(xml)
+            cell_attrs = dict(_ATTR_RE.findall(match.group(1) + match.group(2)))
+            cell_attrs.pop("r", None)
+            cell_attrs.pop("t", None)
+            spans[coordinate] = (match.start(), match.end(), cell_attrs)
+
+        # 按 self.cells 的顺序输出片段
+        ordered = sorted(self.cells, key=lambda c: spans[c][0])
+        self.cells = ordered
+        pos = 0
+        for coordinate in ordered:
+            start, end, cell_attrs = spans[coordinate]
+            segments.append(xml[pos:start])
+            attrs.append(cell_attrs)
+            pos = end
+        segments.append(xml[pos:])
+        return segments, attrs
+
+    def _insert_cell(self, xml: str, row: int, col: int, coordinate: str) -> str:
+        """在工作表 XML 中按行列顺序插入一个空单元格"""
+        new_cell = f'<c r="{coordinate}"/>'
+        row_match = _row_pattern(row).search(xml)
+
+        if row_match is None:
+            new_row = f'<row r="{row}">{new_cell}</row>'
+            if re.search(r"<sheetData\s*/>", xml):
+                return re.sub(r"<sheetData\s*/>", f"<sheetData>{new_row}</sheetData>", xml, count=1)
+            data_start = xml.index("<sheetData")
+            data_end = xml.index("</sheetData>")
+            for other in re.finditer(r'<row\b[^>]*?\br="(\d+)"', xml[data_start:data_end]):
+                if int(other.group(1)) > row:
+                    pos = data_start + other.start()
+                    return xml[:pos] + new_row + xml[pos:]
+            return xml[:data_end] + new_row + xml[data_end:]
+
+        row_xml = row_match.group(0)
+        if row_xml.endswith("/>") and not row_xml.endswith("</row>"):
+            new_row_xml = row_xml[:-2].rstrip() + f">{new_cell}</row>"
+        else:
+            insert_at = len(row_xml) - len("</row>")
+            for other in re.finditer(r'<c\b[^>]*?\br="([A-Z]+)\d+"', row_xml):
+                if column_index_from_string(other.group(1)) > col:
+                    insert_at = other.start()
+                    break
+            new_row_xml = row_xml[:insert_at] + new_cell + row_xml[insert_at:]
+        return xml[: row_match.start()] + new_row_xml + xml[row_match.end() :]
+
+    def _render_cell(self, coordinate: str, attrs: Dict[str, str], value: Any) -> str:
+        """生成单元格 XML"""
+        attr_text = "".join(f' {k}="{v}"' for k, v in attrs.items())
+        head = f'<c r="{coordinate}"{attr_text}'
+
+        if value is None:
+            return head + "/>"
+        if isinstance(value, bool):
+            return f'{head} t="b"><v>{int(value)}</v></c>'
+        if isinstance(value, (int, float)):
+            return f"{head}><v>{value!r}</v></c>"
+        if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+            return f"{head}><v>{to_excel(value)!r}</v></c>"
+        text = str(value)
+        if text.startswith("=") and len(text) > 1:
+            return f"{head}><f>{escape(text[1:])}</f></c>"
+        return (
+            f'{head} t="inlineStr"><is><t xml:space="preserve">{escape(text)}</t></is></c>'
+        )
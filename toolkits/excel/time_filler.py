@@ -9,6 +9,7 @@ from typing import Optional
 from openpyxl import load_workbook
 from openpyxl.utils import get_column_letter
 
+from ._utils import DEFAULT_SAVE_PROFILE, save_workbook, validate_save_profile
 from ..time import generate_start_end_time
 from ..utils import NameGenerator, anonymize_names
 
@@ -40,6 +41,7 @@ class ExcelTimeFiller:
         use_anonymize: bool = False,  # 可选：是否对人名进行脱敏处理
         random_row_adjustment: tuple[int, int] = (0, 0),  # 随机行数调整范围
         output_file: Optional[Path | str] = None,
+        save_profile: str = DEFAULT_SAVE_PROFILE,  # 保存配置：fast/balanced/small
     ) -> Path:
         """
         在保留 Excel 原有格式的前提下，填充开始时间、结束时间两列。
@@ -60,6 +62,7 @@ class ExcelTimeFiller:
             use_anonymize: 可选，是否对人名进行脱敏处理（2字保留首字，3字+保留首尾）
             random_row_adjustment: 随机行数调整范围 (min, max)，负数表示删除行，正数表示增加行
             output_file: 输出文件路径，None 表示覆盖原文件
+            save_profile: 保存配置，"fast" 保存最快、"balanced" 默认、"small" 文件最小
 
         Returns:
             输出文件路径
@@ -73,6 +76,8 @@ class ExcelTimeFiller:
         if start_time_col is None or end_time_col is None:
             raise ValueError("开始时间、结束时间列不能为空")
 
+        validate_save_profile(save_profile)
+
         # 解析时间范围
         start_time_range_start = datetime.fromisoformat(start_time_range_start_str)
         start_time_range_end = datetime.fromisoformat(start_time_range_end_str)
@@ -151,7 +156,7 @@ class ExcelTimeFiller:
         )
 
         # 保存文件
-        wb.save(str(output_path))
+        save_workbook(wb, output_path, save_profile)
 
         filled_cols = []
         if dur_col is not None:
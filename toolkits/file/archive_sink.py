@@ -0,0 +1,203 @@
+"""
+压缩包输出
+
+提取结果直接写入 zip 或 tar 压缩包，不先复制到输出目录再打包。
+压缩包先写入同目录下的临时文件，完成后原子重命名；中断时不会留下不完整的压缩包。
+"""
+
+from __future__ import annotations
+
+import os
+import shutil
+import stat
+import tarfile
+import time
+import zipfile
+from pathlib import Path
+from typing import Optional
+
+from toolkits.file.archive_source import ArchiveMemberPath
+from toolkits.file.copy_engine import remove_path, temp_path_for
+
+# 压缩包格式及其中文名称
+ARCHIVE_FORMATS = {
+    "zip": "zip 压缩包",
+    "tar": "tar 归档",
+}
+
+# 压缩方式及其中文名称；"store" 只存储不压缩，适合图片、视频等已压缩的文件
+ARCHIVE_COMPRESSIONS = {
+    "store": "不压缩（仅存储）",
+    "deflate": "deflate / gzip",
+    "bzip2": "bzip2",
+    "lzma": "lzma / xz",
+}
+
+_ZIP_COMPRESSIONS = {
+    "store": zipfile.ZIP_STORED,
+    "deflate": zipfile.ZIP_DEFLATED,
+    "bzip2": zipfile.ZIP_BZIP2,
+    "lzma": zipfile.ZIP_LZMA,
+}
+
+# tar 的压缩方式对应 tarfile 的模式后缀与文件扩展名
+_TAR_COMPRESSIONS = {
+    "store": ("", ".tar"),
+    "deflate": ("gz", ".tar.gz"),
+    "bzip2": ("bz2", ".tar.bz2"),
+    "lzma": ("xz", ".tar.xz"),
+}
+
+# 流式写入成员时每次读取的字节数
+_STREAM_CHUNK = 1024 * 1024
+
+
+def archive_suffix(archive_format: str, compression: str) -> str:
+    """压缩包的文件扩展名"""
+    if archive_format == "zip":
+        return ".zip"
+    return _TAR_COMPRESSIONS[compression][1]
+
+
+def _raise(error: OSError) -> None:
+    """os.walk 的 onerror：无法读取的目录使写入失败，而不是被跳过"""
+    raise error
+
+
+def _zip_date_time(mtime: float) -> tuple:
+    """zip 只能记录 1980 年之后的时间"""
+    return max(time.localtime(mtime)[:6], (1980, 1, 1, 0, 0, 0))
+
+
+class ArchiveSink:
+    """压缩包写入器，文件按加入顺序依次写入"""
+
+    def __init__(
+        self,
+        archive_path: Path,
+        archive_format: str = "zip",
+        compression: str = "deflate",
+        compress_level: Optional[int] = None,
+    ):
+        """
+        Args:
+            archive_path: 压缩包路径
+            archive_format: 压缩包格式，见 ARCHIVE_FORMATS
+            compression: 压缩方式，见 ARCHIVE_COMPRESSIONS
+            compress_level: 压缩级别，None 表示默认级别（store 时忽略）
+        """
+        if archive_format not in ARCHIVE_FORMATS:
+            raise ValueError(
+                f"未知的压缩包格式: {archive_format}，可选值: {', '.join(ARCHIVE_FORMATS)}"
+            )
+        if compression not in ARCHIVE_COMPRESSIONS:
+            raise ValueError(
+                f"未知的压缩方式: {compression}，可选值: {', '.join(ARCHIVE_COMPRESSIONS)}"
+            )
+        self.path = archive_path
+        self.archive_format = archive_format
+        self.compression = compression
+        self.compress_level = compress_level
+        self._tmp: Optional[Path] = None
+        self._zip: Optional[zipfile.ZipFile] = None
+        self._tar: Optional[tarfile.TarFile] = None
+        # add() 失败过时为 True，压缩包不再保留
+        self.failed = False
+
+    def open(self) -> None:
+        """创建临时压缩包准备写入"""
+        self._tmp = temp_path_for(self.path)
+        level = None if self.compression == "store" else self.compress_level
+        if self.archive_format == "zip":
+            self._zip = zipfile.ZipFile(
+                self._tmp,
+                "w",
+                compression=_ZIP_COMPRESSIONS[self.compression],
+                compresslevel=level,
+                strict_timestamps=False,
+            )
+        else:
+            mode, _ = _TAR_COMPRESSIONS[self.compression]
+            kwargs = {}
+            if level is not None:
+                kwargs["preset" if mode == "xz" else "compresslevel"] = level
+            self._tar = tarfile.open(
+                self._tmp, f"w:{mode}", dereference=True, **kwargs
+            )
+
+    def add(self, src: Path, arcname: str) -> None:
+        """
+        写入一个文件、目录（递归写入）或压缩包成员
+
+        与复制到目录时相同，符号链接按其指向的内容写入（指向目录的链接递归写入）。
+        写入失败时压缩包中可能已有不完整的成员，此后不再接受写入，close() 时也不保留。
+
+        Args:
+            src: 源路径
+            arcname: 在压缩包中的路径（"/" 分隔）
+        """
+        if self.failed:
+            raise RuntimeError(f"压缩包已放弃: {self.path}")
+        try:
+            if isinstance(src, ArchiveMemberPath):
+                self._add_member(src, arcname)
+            elif src.is_dir():
+                for dirpath, _, filenames in os.walk(
+                    src, onerror=_raise, followlinks=True
+                ):
+                    relative = Path(dirpath).relative_to(src).as_posix()
+                    prefix = arcname if relative == "." else f"{arcname}/{relative}"
+                    self._add_path(dirpath, prefix)
+                    for name in filenames:
+                        self._add_path(os.path.join(dirpath, name), f"{prefix}/{name}")
+            else:
+                self._add_path(src, arcname)
+        except BaseException:
+            self.failed = True
+            raise
+
+    def close(self, commit: bool = True) -> None:
+        """
+        完成写入
+
+        Args:
+            commit: 是否保留压缩包（重命名为目标路径）；False 或写入失败过时删除临时文件
+        """
+        try:
+            if self._zip is not None:
+                self._zip.close()
+            if self._tar is not None:
+                self._tar.close()
+            if commit and not self.failed and self._tmp is not None:
+                os.replace(self._tmp, self.path)
+                self._tmp = None
+        finally:
+            self._zip = self._tar = None
+            if self._tmp is not None:
+                remove_path(self._tmp)
+                self._tmp = None
+
+    def _add_path(self, path: str | Path, arcname: str) -> None:
+        """写入一个文件或目录条目（不递归）"""
+        if self._zip is not None:
+            self._zip.write(path, arcname)
+        else:
+            self._tar.add(path, arcname, recursive=False)
+
+    def _add_member(self, member: ArchiveMemberPath, arcname: str) -> None:
+        """将其他压缩包中的成员直接转写到本压缩包"""
+        with member.open_member() as fsrc:
+            if self._zip is not None:
+                info = zipfile.ZipInfo(arcname, _zip_date_time(member.member_mtime))
+                info.compress_type = self._zip.compression
+                info.compress_level = self._zip.compresslevel
+                info.external_attr = (stat.S_IFREG | 0o644) << 16
+                info.file_size = member.member_size
+                with self._zip.open(info, "w") as fdst:
+                    shutil.copyfileobj(fsrc, fdst, _STREAM_CHUNK)
+            else:
+                info = tarfile.TarInfo(arcname)
+                info.size = member.member_size
+                info.mtime = member.member_mtime
+                info.mode = 0o644
+                self._tar.addfile(info, fsrc)
@@ -0,0 +1,191 @@
+"""
+压缩包作为提取源
+
+zip / tar（含 .tar.gz、.tar.bz2、.tar.xz）视为虚拟目录：成员以
+"<压缩包路径>/<成员路径>" 形式的 ArchiveMemberPath 出现，文件过滤策略与命名、
+组织方式按普通路径处理，成员数据直接从压缩包流式写出，无需先解压整个压缩包。
+"""
+
+from __future__ import annotations
+
+import os
+import stat
+import tarfile
+import time
+import zipfile
+from pathlib import Path, PurePosixPath
+from typing import BinaryIO, Iterator, List, Optional, Union
+
+# 作为虚拟目录读取的压缩包扩展名
+ARCHIVE_SUFFIXES = (
+    ".zip",
+    ".tar",
+    ".tar.gz",
+    ".tgz",
+    ".tar.bz2",
+    ".tbz2",
+    ".tar.xz",
+    ".txz",
+)
+
+# 读取损坏或不支持的压缩包时可能出现的异常
+ARCHIVE_ERRORS = (OSError, EOFError, zipfile.BadZipFile, tarfile.TarError)
+
+Member = Union[zipfile.ZipInfo, tarfile.TarInfo]
+
+
+def is_archive_name(name: str) -> bool:
+    """文件名是否为支持的压缩包"""
+    return name.lower().endswith(ARCHIVE_SUFFIXES)
+
+
+def _member_parts(name: str) -> List[str]:
+    """成员路径的各级名称，去掉根、"." 与 ".."，防止写出到输出目录之外"""
+    return [
+        part
+        for part in PurePosixPath(name.replace("\\", "/")).parts
+        if part not in ("/", ".", "..")
+    ]
+
+
+def _zip_member_name(info: zipfile.ZipInfo) -> str:
+    """
+    zip 成员名
+
+    未设置 UTF-8 标志的成员名被 zipfile 按 cp437 解码，而中文系统打包的 zip
+    实际多为 UTF-8 或 GBK，依次尝试还原
+    """
+    if info.flag_bits & 0x800:
+        return info.filename
+    raw = info.filename.encode("cp437", errors="replace")
+    for encoding in ("utf-8", "gbk"):
+        try:
+            return raw.decode(encoding)
+        except UnicodeDecodeError:
+            continue
+    return info.filename
+
+
+class ArchiveMemberPath(type(Path())):
+    """
+    压缩包成员的虚拟路径
+
+    stat() / exists() / is_file() / is_dir() 返回成员自身的信息，按大小过滤等
+    策略无需修改即可使用；由它派生的路径（parent、relative_to 等）是普通路径。
+    """
+
+    def __init__(
+        self,
+        *args,
+        archive: Optional["ArchiveReader"] = None,
+        member: Optional[Member] = None,
+        size: int = 0,
+        mtime: float = 0.0,
+    ):
+        super().__init__(*args)
+        self.archive = archive
+        self.member = member
+        self.member_size = size
+        self.member_mtime = mtime
+
+    def with_segments(self, *pathsegments) -> Path:
+        return Path(*pathsegments)
+
+    def stat(self, *, follow_symlinks: bool = True) -> os.stat_result:
+        mtime_ns = int(self.member_mtime * 1_000_000_000)
+        times = (self.member_mtime,) * 3
+        return os.stat_result(
+            (stat.S_IFREG | 0o644, 0, 0, 1, 0, 0, self.member_size) + times,
+            {"st_atime_ns": mtime_ns, "st_mtime_ns": mtime_ns, "st_ctime_ns": mtime_ns},
+        )
+
+    def exists(self, *, follow_symlinks: bool = True) -> bool:
+        return True
+
+    def is_file(self, *, follow_symlinks: bool = True) -> bool:
+        return True
+
+    def is_dir(self, *, follow_symlinks: bool = True) -> bool:
+        return False
+
+    def is_symlink(self) -> bool:
+        return False
+
+    def open_member(self) -> BinaryIO:
+        """打开成员的数据流"""
+        return self.archive.open_member(self.member)
+
+
+class ArchiveReader:
+    """
+    压缩包读取器
+
+    zip 可以随机读取成员，允许多个线程同时读取；tar（尤其是压缩的 tar）只能
+    按顺序高效读取，sequential 为 True，成员应在遍历的同时依次读取。
+    """
+
+    def __init__(self, archive_path: Path):
+        """
+        Args:
+            archive_path: 压缩包路径
+
+        Raises:
+            ARCHIVE_ERRORS 中的异常：压缩包无法打开
+        """
+        self.path = archive_path
+        self._zip: Optional[zipfile.ZipFile] = None
+        self._tar: Optional[tarfile.TarFile] = None
+        if archive_path.name.lower().endswith(".zip"):
+            self._zip = zipfile.ZipFile(archive_path)
+        else:
+            self._tar = tarfile.open(archive_path, "r:*")
+        self.sequential = self._tar is not None
+
+    def __enter__(self) -> "ArchiveReader":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self._zip is not None:
+            self._zip.close()
+        if self._tar is not None:
+            self._tar.close()
+
+    def members(self) -> Iterator[ArchiveMemberPath]:
+        """按压缩包内的顺序产出普通文件成员（跳过目录、链接与设备文件）"""
+        if self._zip is not None:
+            for info in self._zip.infolist():
+                if info.is_dir():
+                    continue
+                mtime = time.mktime(info.date_time + (0, 0, -1))
+                member = self._member_path(
+                    _zip_member_name(info), info, info.file_size, mtime
+                )
+                if member is not None:
+                    yield member
+        else:
+            # 直接迭代 TarFile，边读头部边产出，不预先扫描整个压缩包
+            for info in self._tar:
+                if not info.isfile():
+                    continue
+                member = self._member_path(info.name, info, info.size, info.mtime)
+                if member is not None:
+                    yield member
+
+    def open_member(self, member: Member) -> BinaryIO:
+        """打开成员的数据流"""
+        if self._zip is not None:
+            return self._zip.open(member)
+        return self._tar.extractfile(member)
+
+    def _member_path(
+        self, name: str, member: Member, size: int, mtime: float
+    ) -> Optional[ArchiveMemberPath]:
+        parts = _member_parts(name)
+        if not parts:
+            return None
+        return ArchiveMemberPath(
+            self.path, *parts, archive=self, member=member, size=size, mtime=mtime
+        )
@@ -0,0 +1,556 @@
+"""
+文件复制引擎
+
+- 线程池并行复制，多个请求同时在途，磁盘/网络文件系统的吞吐更高；
+  目录树展开为单个文件的任务，与其他任务共用同一个线程池
+- 目标目录创建结果缓存，每个目录在一次运行中只 mkdir 一次
+- 复制数据使用 shutil.copyfile（支持时由内核直接复制，数据不经过用户态缓冲）
+- 可选链接方式（硬链接 / reflink / 符号链接），同一文件系统内不复制数据
+- prefetch：后台线程 + 有界队列，让扫描与复制流水线式重叠
+- 先写入同目录下的临时文件再原子重命名，中断时不会留下看似完整的半成品
+- 可选校验和：复制时每个源文件只读取一次，数据经可重用的大缓冲区同时写入目标
+  并送入哈希
+- 源可以是压缩包成员（ArchiveMemberPath），数据从压缩包流式写出
+"""
+
+from __future__ import annotations
+
+import errno
+import hashlib
+import os
+import queue
+import re
+import secrets
+import shutil
+import sys
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from functools import partial
+from pathlib import Path
+from typing import (
+    BinaryIO,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    Optional,
+    Tuple,
+    TypeVar,
+)
+
+from toolkits.file.archive_source import ArchiveMemberPath
+
+# 链接方式及其中文名称
+LINK_MODES = {
+    "copy": "复制",
+    "hardlink": "硬链接",
+    "reflink": "reflink（写时复制）",
+    "symlink": "符号链接",
+}
+
+# Linux FICLONE ioctl：让目标文件与源文件共享数据块（btrfs/XFS 等支持）
+_FICLONE = 0x40049409
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+# 这些错误表示硬链接/reflink 在当前文件系统上不可用，回退到复制
+_LINK_FALLBACK_ERRNOS = {
+    errno.EXDEV,
+    errno.EPERM,
+    errno.EMLINK,
+    errno.EINVAL,
+    errno.ENOTTY,
+    errno.ENOTSUP,
+    errno.EOPNOTSUPP,
+}
+
+# 支持的校验和算法（hashlib 名称）
+CHECKSUM_ALGORITHMS = ("blake2b", "sha256", "sha512", "sha1", "md5")
+
+# 校验复制的缓冲区大小，每个线程一个，重复使用
+CHECKSUM_BUFFER_SIZE = 4 * 1024 * 1024
+
+# 完成回调: (源路径, 目标路径, 异常或 None, {目标文件路径: 校验和})
+DoneCallback = Callable[
+    [Path, Path, Optional[BaseException], Dict[Path, str]], None
+]
+
+# 复制过程中的临时文件：".<目标文件名>.<随机串>.extracting"
+TEMP_SUFFIX = ".extracting"
+_TEMP_NAME = re.compile(r"^\..+\.[0-9a-f]{8}" + re.escape(TEMP_SUFFIX) + "$")
+
+T = TypeVar("T")
+
+_END = object()
+
+
+def copy_file(src: Path, dst: Path) -> None:
+    """复制文件内容与元数据（与 shutil.copy2 相同）"""
+    shutil.copyfile(src, dst)
+    shutil.copystat(src, dst)
+
+
+_buffers = threading.local()
+
+
+def _checksum_buffer() -> bytearray:
+    buffer = getattr(_buffers, "buffer", None)
+    if buffer is None:
+        buffer = _buffers.buffer = bytearray(CHECKSUM_BUFFER_SIZE)
+    return buffer
+
+
+def copy_file_with_checksum(
+    src: Path | str, dst: Path | str, algorithm: str = "sha256"
+) -> str:
+    """
+    复制文件内容与元数据，同时计算源数据的校验和（只读取一次）
+
+    Returns:
+        十六进制校验和
+    """
+    with open(src, "rb", buffering=0) as fsrc:
+        digest = copy_stream(fsrc, dst, algorithm)
+    shutil.copystat(src, dst)
+    return digest
+
+
+def copy_stream(
+    fsrc: BinaryIO, dst: Path | str, algorithm: Optional[str] = None
+) -> Optional[str]:
+    """
+    将数据流写入 dst，可同时计算校验和
+
+    Returns:
+        十六进制校验和，algorithm 为 None 时为 None
+    """
+    hasher = hashlib.new(algorithm) if algorithm is not None else None
+    buffer = _checksum_buffer()
+    with memoryview(buffer) as view, open(dst, "wb", buffering=0) as fdst:
+        while size := fsrc.readinto(buffer):
+            chunk = view[:size]
+            if hasher is not None:
+                hasher.update(chunk)
+            while chunk:
+                chunk = chunk[fdst.write(chunk):]
+    return hasher.hexdigest() if hasher is not None else None
+
+
+def copy_member(
+    member: ArchiveMemberPath, dst: Path | str, algorithm: Optional[str] = None
+) -> Optional[str]:
+    """
+    将压缩包成员写入 dst 并设置修改时间，可同时计算校验和
+
+    Returns:
+        十六进制校验和，algorithm 为 None 时为 None
+    """
+    with member.open_member() as fsrc:
+        digest = copy_stream(fsrc, dst, algorithm)
+    os.utime(dst, (member.member_mtime, member.member_mtime))
+    return digest
+
+
+def file_checksum(path: Path | str, algorithm: str = "sha256") -> str:
+    """计算文件的校验和"""
+    hasher = hashlib.new(algorithm)
+    buffer = _checksum_buffer()
+    with memoryview(buffer) as view, open(path, "rb", buffering=0) as f:
+        while size := f.readinto(buffer):
+            hasher.update(view[:size])
+    return hasher.hexdigest()
+
+
+def reflink_file(src: Path | str, dst: Path | str) -> bool:
+    """
+    通过 FICLONE ioctl 创建 reflink（只复制元数据，数据块写时复制）
+
+    Returns:
+        是否成功；False 表示平台或文件系统不支持
+    """
+    if fcntl is None or not sys.platform.startswith("linux"):
+        return False
+    with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+        try:
+            fcntl.ioctl(fdst.fileno(), _FICLONE, fsrc.fileno())
+        except OSError as e:
+            if e.errno in _LINK_FALLBACK_ERRNOS:
+                return False
+            raise
+    return True
+
+
+def temp_path_for(dst: Path) -> Path:
+    """目标路径对应的临时路径（同一目录，保证可以原子重命名）"""
+    return dst.with_name(f".{dst.name}.{secrets.token_hex(4)}{TEMP_SUFFIX}")
+
+
+def is_temp_name(name: str) -> bool:
+    """是否为中断的复制留下的临时文件/目录名"""
+    return bool(_TEMP_NAME.match(name))
+
+
+def replace_path(tmp: Path, dst: Path) -> None:
+    """
+    用已写完的临时文件/目录替换目标
+
+    文件直接 os.replace，替换是原子的；目标是目录（或新内容是目录而目标已存在）时
+    无法原子替换，先把旧目标改名为临时路径，新内容就位后再删除旧目标，
+    新内容改名失败时把旧目标移回原处。
+    """
+    dst_is_dir = os.path.isdir(dst) and not os.path.islink(dst)
+    if not dst_is_dir and not (os.path.isdir(tmp) and os.path.lexists(dst)):
+        os.replace(tmp, dst)
+        return
+
+    old = temp_path_for(dst)
+    os.rename(dst, old)
+    try:
+        os.rename(tmp, dst)
+    except BaseException:
+        os.rename(old, dst)
+        raise
+    remove_path(old)
+
+
+def remove_path(path: Path | str) -> None:
+    """删除文件、符号链接或目录树（不存在时忽略）"""
+    if os.path.isdir(path) and not os.path.islink(path):
+        shutil.rmtree(path, ignore_errors=True)
+    else:
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+
+
+def prefetch(iterable: Iterable[T], maxsize: int = 1024) -> Iterator[T]:
+    """
+    在后台线程中迭代 iterable，经有界队列按原顺序产出元素
+
+    用于让目录遍历（生产者）与复制（消费者）重叠进行；队列满时生产者等待，
+    内存占用与目录树大小无关。生产者抛出的异常在消费端重新抛出。
+    """
+    items: queue.Queue = queue.Queue(maxsize)
+    stop = threading.Event()
+    errors: list[BaseException] = []
+
+    def put(item) -> bool:
+        while not stop.is_set():
+            try:
+                items.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce() -> None:
+        try:
+            for item in iterable:
+                if not put(item):
+                    return
+        except BaseException as e:
+            errors.append(e)
+        put(_END)
+
+    producer = threading.Thread(target=produce, name="prefetch", daemon=True)
+    producer.start()
+    try:
+        while True:
+            item = items.get()
+            if item is _END:
+                break
+            yield item
+        if errors:
+            raise errors[0]
+    finally:
+        # 消费端提前结束时通知生产者退出
+        stop.set()
+
+
+class DirectoryCache:
+    """线程安全的目录创建缓存"""
+
+    def __init__(self):
+        self._created: set[Path] = set()
+        self._lock = threading.Lock()
+
+    def ensure(self, directory: Path) -> None:
+        """确保目录存在，同一目录只创建一次"""
+        if directory in self._created:
+            return
+        with self._lock:
+            if directory in self._created:
+                return
+            directory.mkdir(parents=True, exist_ok=True)
+            self._created.add(directory)
+
+
+class _TreeCopy:
+    """
+    并行复制中的一个目录树
+
+    目录结构在临时路径下预先创建，文件作为独立任务提交到线程池；
+    所有文件完成后设置目录元数据并原子重命名为目标路径，任一文件失败则整体失败。
+    只在调用 run 的线程中访问，无需加锁。
+    """
+
+    def __init__(self, src: Path, dst: Path, on_done: DoneCallback):
+        self.src = src
+        self.dst = dst
+        self.tmp = temp_path_for(dst)
+        self.on_done = on_done
+        self.dirs: list[Tuple[str, Path]] = []
+        self.checksums: Dict[Path, str] = {}
+        self.error: Optional[BaseException] = None
+        self.remaining = 0
+        self.walking = True
+
+    def files(self) -> Iterator[Tuple[str, Path]]:
+        """创建临时目录结构，产出 (源文件, 临时目标文件)"""
+        def on_error(error: OSError) -> None:
+            self.error = self.error or error
+
+        try:
+            # 与 shutil.copytree 相同，跟随指向目录的符号链接
+            walk = os.walk(self.src, onerror=on_error, followlinks=True)
+            for dirpath, _, filenames in walk:
+                tmp_dir = self.tmp / os.path.relpath(dirpath, self.src)
+                tmp_dir.mkdir()
+                self.dirs.append((dirpath, tmp_dir))
+                for name in filenames:
+                    yield os.path.join(dirpath, name), tmp_dir / name
+        except OSError as e:
+            on_error(e)
+
+    def file_done(self, tmp_file: Path, future: Future) -> None:
+        self.remaining -= 1
+        error = future.exception()
+        if error is not None:
+            self.error = self.error or error
+        else:
+            digest = future.result()
+            if digest is not None:
+                self.checksums[self.dst / tmp_file.relative_to(self.tmp)] = digest
+        self.finish()
+
+    def finish(self) -> None:
+        """遍历结束且所有文件完成后提交结果"""
+        if self.walking or self.remaining:
+            return
+        if self.error is None:
+            try:
+                # 与 shutil.copytree 相同，子目录先于父目录设置元数据
+                for src_dir, tmp_dir in reversed(self.dirs):
+                    shutil.copystat(src_dir, tmp_dir)
+                replace_path(self.tmp, self.dst)
+            except OSError as e:
+                self.error = e
+        if self.error is not None:
+            remove_path(self.tmp)
+            self.on_done(self.src, self.dst, self.error, {})
+        else:
+            self.on_done(self.src, self.dst, None, self.checksums)
+
+
+class CopyEngine:
+    """并行复制引擎"""
+
+    def __init__(
+        self,
+        max_workers: int = 1,
+        link_mode: str = "copy",
+        checksum: Optional[str] = None,
+    ):
+        """
+        Args:
+            max_workers: 复制线程数，1 表示在调用线程中顺序复制
+            link_mode: 链接方式，见 LINK_MODES
+                - "copy": 复制数据
+                - "hardlink": 硬链接，目标与源是同一个文件（修改任一方都会影响另一方）
+                - "reflink": 共享数据块，修改时才复制，互不影响
+                - "symlink": 指向源文件/目录绝对路径的符号链接
+                硬链接与 reflink 不可用时（跨文件系统等）自动回退为复制
+            checksum: 校验和算法，见 CHECKSUM_ALGORITHMS，None 表示不计算；
+                复制时在读取数据的同时计算，链接方式下读取一次源文件计算
+        """
+        if link_mode not in LINK_MODES:
+            raise ValueError(
+                f"未知的链接方式: {link_mode}，可选值: {', '.join(LINK_MODES)}"
+            )
+        if checksum is not None and checksum not in CHECKSUM_ALGORITHMS:
+            raise ValueError(
+                f"不支持的校验和算法: {checksum}，可选值: {', '.join(CHECKSUM_ALGORITHMS)}"
+            )
+        self.max_workers = max(1, max_workers)
+        self.link_mode = link_mode
+        self.checksum = checksum
+        self.dirs = DirectoryCache()
+
+        # 链接不可用而回退为复制的文件数
+        self.fallback_count = 0
+        self._fallback_lock = threading.Lock()
+
+    def copy(self, src: Path, dst: Path) -> Dict[Path, str]:
+        """
+        复制一个文件、目录（递归复制）或压缩包成员，自动创建目标的父目录
+
+        内容先写入临时路径，完成后替换目标路径（见 replace_path），已有的目标
+        在此之前保持不变；失败时删除临时路径。
+
+        Returns:
+            {目标文件路径: 校验和}，不计算校验和时为空
+        """
+        self.dirs.ensure(dst.parent)
+        checksums: Dict[Path, str] = {}
+        # 压缩包成员没有可以链接的源文件，总是写出数据
+        is_member = isinstance(src, ArchiveMemberPath)
+        if self.link_mode == "symlink" and not is_member:
+            tmp = temp_path_for(dst)
+            os.symlink(os.path.abspath(src), tmp, target_is_directory=src.is_dir())
+            try:
+                replace_path(tmp, dst)
+            except BaseException:
+                remove_path(tmp)
+                raise
+            if self.checksum is not None:
+                if src.is_dir():
+                    for dirpath, _, filenames in os.walk(src):
+                        for name in filenames:
+                            path = Path(dirpath, name)
+                            checksums[dst / path.relative_to(src)] = file_checksum(
+                                path, self.checksum
+                            )
+                else:
+                    checksums[dst] = file_checksum(src, self.checksum)
+            return checksums
+
+        tmp = temp_path_for(dst)
+        try:
+            if is_member:
+                digest = copy_member(src, tmp, self.checksum)
+                if digest is not None:
+                    checksums[dst] = digest
+            elif src.is_dir():
+
+                def copy_function(file_src: str, file_dst: str) -> None:
+                    digest = self.copy_file(file_src, file_dst)
+                    if digest is not None:
+                        checksums[dst / Path(file_dst).relative_to(tmp)] = digest
+
+                shutil.copytree(src, tmp, copy_function=copy_function)
+            else:
+                digest = self.copy_file(src, tmp)
+                if digest is not None:
+                    checksums[dst] = digest
+            replace_path(tmp, dst)
+        except BaseException:
+            remove_path(tmp)
+            raise
+        return checksums
+
+    def copy_file(self, src: Path | str, dst: Path | str) -> Optional[str]:
+        """
+        按链接方式复制单个文件
+
+        Returns:
+            源文件的校验和，不计算校验和时为 None
+        """
+        if self.link_mode == "hardlink":
+            try:
+                os.link(src, dst)
+                return self._source_checksum(src)
+            except OSError as e:
+                if e.errno not in _LINK_FALLBACK_ERRNOS:
+                    raise
+        elif self.link_mode == "reflink":
+            if reflink_file(src, dst):
+                shutil.copystat(src, dst)
+                return self._source_checksum(src)
+        elif self.link_mode == "symlink":
+            os.symlink(os.path.abspath(src), dst)
+            return self._source_checksum(src)
+
+        if self.link_mode != "copy":
+            with self._fallback_lock:
+                self.fallback_count += 1
+        if self.checksum is not None:
+            return copy_file_with_checksum(src, dst, self.checksum)
+        copy_file(src, dst)
+        return None
+
+    def _source_checksum(self, src: Path | str) -> Optional[str]:
+        if self.checksum is None:
+            return None
+        return file_checksum(src, self.checksum)
+
+    def run(
+        self, jobs: Iterable[Tuple[Path, Path]], on_done: DoneCallback
+    ) -> None:
+        """
+        执行复制任务
+
+        jobs 按需惰性读取，同时在途的任务数有上限；on_done 总是在调用线程中执行，
+        因此回调里更新计数无需加锁。并行时目录展开为逐个文件的任务，
+        大目录树也能用满所有线程。
+
+        Args:
+            jobs: (源路径, 目标路径) 迭代器
+            on_done: 每个任务完成后的回调
+        """
+        if self.max_workers == 1:
+            for src, dst in jobs:
+                on_done(src, dst, *self._try_copy(src, dst))
+            return
+
+        max_pending = self.max_workers * 4
+        # {任务: 完成处理函数}
+        pending: Dict[Future, Callable[[Future], None]] = {}
+
+        def drain(limit: int) -> None:
+            while len(pending) > limit:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    pending.pop(future)(future)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for src, dst in jobs:
+                if self._is_tree(src):
+                    self.dirs.ensure(dst.parent)
+                    tree = _TreeCopy(src, dst, on_done)
+                    for file_src, tmp_file in tree.files():
+                        future = executor.submit(self.copy_file, file_src, tmp_file)
+                        tree.remaining += 1
+                        pending[future] = partial(tree.file_done, tmp_file)
+                        drain(max_pending - 1)
+                    tree.walking = False
+                    tree.finish()
+                else:
+                    future = executor.submit(self.copy, src, dst)
+                    pending[future] = partial(self._job_done, src, dst, on_done)
+                    drain(max_pending - 1)
+            drain(0)
+
+    def _is_tree(self, src: Path) -> bool:
+        """是否展开为逐个文件复制的目录（符号链接方式直接链接整个目录）"""
+        return (
+            self.link_mode != "symlink"
+            and not isinstance(src, ArchiveMemberPath)
+            and src.is_dir()
+        )
+
+    def _try_copy(
+        self, src: Path, dst: Path
+    ) -> Tuple[Optional[BaseException], Dict[Path, str]]:
+        try:
+            return None, self.copy(src, dst)
+        except Exception as e:
+            return e, {}
+
+    @staticmethod
+    def _job_done(src: Path, dst: Path, on_done: DoneCallback, future: Future) -> None:
+        error = future.exception()
+        on_done(src, dst, error, {} if error is not None else future.result())
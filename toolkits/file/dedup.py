@@ -0,0 +1,97 @@
+"""
+按内容查找重复文件
+
+逐级缩小比较范围，绝大多数文件不需要读取内容：
+1. 按文件大小分组，大小唯一的文件必然不重复
+2. 大小相同的文件计算开头一块数据的哈希（部分哈希）
+3. 部分哈希仍相同的文件计算完整哈希
+哈希在线程池中并行计算。
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, Hashable, Iterable, List
+
+from toolkits.utils.hashing import hash_file
+
+# 部分哈希读取的字节数
+PARTIAL_HASH_SIZE = 64 * 1024
+
+
+def partial_hash(file_path: Path | str, size: int = PARTIAL_HASH_SIZE) -> str:
+    """计算文件开头 size 字节的哈希"""
+    with open(file_path, "rb") as f:
+        return hashlib.blake2b(f.read(size), digest_size=20).hexdigest()
+
+
+def find_duplicates(
+    paths: Iterable[Path],
+    max_workers: int = 1,
+    partial_size: int = PARTIAL_HASH_SIZE,
+) -> Dict[Path, Path]:
+    """
+    查找内容重复的文件
+
+    Args:
+        paths: 文件路径，顺序决定哪一个作为"原件"（每组中第一个出现的）
+        max_workers: 计算哈希的线程数
+        partial_size: 部分哈希读取的字节数
+
+    Returns:
+        {重复文件: 原件}，原件与内容唯一的文件不在其中
+    """
+    by_size: Dict[int, List[Path]] = defaultdict(list)
+    for path in paths:
+        try:
+            by_size[os.stat(path).st_size].append(path)
+        except OSError:
+            # 无法读取的文件视为内容唯一，由复制流程报告错误
+            continue
+
+    # 文件不超过 partial_size 时部分哈希即完整哈希，无需再读一次
+    small = [g for size, g in by_size.items() if len(g) > 1 and size <= partial_size]
+    large = [g for size, g in by_size.items() if len(g) > 1 and size > partial_size]
+
+    def head_hash(path: Path) -> str:
+        return partial_hash(path, partial_size)
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        groups = _split_groups(small, head_hash, executor)
+        candidates = _split_groups(large, head_hash, executor)
+        groups += _split_groups(candidates, hash_file, executor)
+
+    duplicates: Dict[Path, Path] = {}
+    for group in groups:
+        for path in group[1:]:
+            duplicates[path] = group[0]
+    return duplicates
+
+
+def _split_groups(
+    groups: List[List[Path]],
+    key_func: Callable[[Path], Hashable],
+    executor: ThreadPoolExecutor,
+) -> List[List[Path]]:
+    """按 key_func 细分每一组（保持组内顺序），只返回仍有多个成员的组"""
+    def safe_key(path: Path) -> Hashable:
+        try:
+            return key_func(path)
+        except OSError:
+            # 无法读取的文件自成一组
+            return path
+
+    paths = [path for group in groups for path in group]
+    keys = iter(executor.map(safe_key, paths))
+
+    result = []
+    for group in groups:
+        sub_groups: Dict[Hashable, List[Path]] = defaultdict(list)
+        for path in group:
+            sub_groups[next(keys)].append(path)
+        result.extend(sub for sub in sub_groups.values() if len(sub) > 1)
+    return result
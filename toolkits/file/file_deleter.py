@@ -3,23 +3,179 @@
 支持多种匹配模式删除文件，删除前需要确认
 """
 
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import List, Optional, Callable, Tuple
+from typing import Dict, Iterable, Iterator, List, Optional, Callable, Tuple
+import os
 import re
 import logging
 
+from toolkits.file.staging import StagingArea, is_staging_name
+
+_MB = 1024 * 1024
+
+# 扫描时每处理这么多个条目调用一次进度回调
+_PROGRESS_EVERY = 1024
+
+# 每个删除任务最多包含的文件数，同一目录下的大量文件拆成多个任务并行删除
+_DELETE_BATCH = 512
+
+# 是否支持相对目录文件描述符删除（Windows 不支持）
+_UNLINK_DIR_FD = os.unlink in os.supports_dir_fd
+
+
+def _unlink_batch(parent: str, names: List[str]) -> Tuple[int, List[str]]:
+    """
+    删除同一目录下的一批文件
+
+    打开一次目录，相对目录文件描述符 unlink，内核不必为每个文件重新解析完整路径。
+
+    Returns:
+        (成功删除的文件数, 错误信息列表)
+    """
+    dir_fd = None
+    if _UNLINK_DIR_FD:
+        try:
+            dir_fd = os.open(parent, os.O_RDONLY | getattr(os, "O_DIRECTORY", 0))
+        except OSError:
+            # 目录无法打开时逐个按完整路径删除，由 unlink 报告具体错误
+            dir_fd = None
+
+    deleted = 0
+    errors = []
+    try:
+        for name in names:
+            try:
+                if dir_fd is not None:
+                    os.unlink(name, dir_fd=dir_fd)
+                else:
+                    os.unlink(os.path.join(parent, name))
+                deleted += 1
+            except OSError as e:
+                errors.append(f"删除文件 {os.path.join(parent, name)} 失败: {str(e)}")
+    finally:
+        if dir_fd is not None:
+            os.close(dir_fd)
+    return deleted, errors
+
+
+def _is_within(path: str, root: str) -> bool:
+    """path 是否位于 root 之内（不含 root 本身）"""
+    return path != root and os.path.commonpath([path, root]) == root
+
+
+class FileMatcher:
+    """
+    预先编译的匹配条件
+
+    匹配模式、匹配文本与大小范围在创建时一次性解析（正则表达式编译、扩展名集合、
+    转为小写的关键字），之后对每个文件只做字符串比较；
+    先比较文件名，文件名匹配且设置了大小范围时才读取文件大小。
+    """
+
+    def __init__(
+        self,
+        match_mode: str,
+        pattern: str,
+        min_size: Optional[float] = None,
+        max_size: Optional[float] = None,
+    ):
+        """
+        Args:
+            match_mode: 匹配模式
+            pattern: 匹配文本（关键字/前缀/后缀/扩展名/正则表达式）
+            min_size: 最小文件大小（MB）
+            max_size: 最大文件大小（MB）
+
+        Raises:
+            ValueError: 未知的匹配模式或无效的正则表达式
+        """
+        self.match_mode = match_mode
+        self.pattern = pattern
+        self.min_bytes = min_size * _MB if min_size is not None else None
+        self.max_bytes = max_size * _MB if max_size is not None else None
+        self.needs_size = min_size is not None or max_size is not None
+        # 文件名判断函数 (文件名) -> 是否匹配
+        self.match_name: Callable[[str], bool] = self._compile_name_test()
+
+    def _compile_name_test(self) -> Callable[[str], bool]:
+        pattern = self.pattern
+        if self.match_mode == "关键字匹配":
+            needle = pattern.casefold()
+            return lambda name: needle in name.casefold()
+
+        if self.match_mode == "前缀匹配":
+            needle = pattern.casefold()
+            return lambda name: name.casefold().startswith(needle)
+
+        if self.match_mode == "后缀匹配":
+            needle = pattern.casefold()
+            # 以点开头时从完整文件名匹配，否则从文件名（不含扩展名）匹配
+            if pattern.startswith("."):
+                return lambda name: name.casefold().endswith(needle)
+            return lambda name: os.path.splitext(name)[0].casefold().endswith(needle)
+
+        if self.match_mode == "扩展名匹配":
+            extensions = frozenset(
+                ext if ext.startswith(".") else "." + ext
+                for ext in (part.strip().casefold() for part in pattern.split(","))
+                if ext
+            )
+            return lambda name: os.path.splitext(name)[1].casefold() in extensions
+
+        if self.match_mode == "正则表达式匹配":
+            try:
+                regex = re.compile(pattern)
+            except re.error as e:
+                raise ValueError(f"无效的正则表达式 '{pattern}': {e}") from e
+            search = regex.search
+            return lambda name: search(name) is not None
+
+        raise ValueError(f"未知的匹配模式: {self.match_mode}")
+
+    def match_size(self, size: int) -> bool:
+        """文件大小（字节）是否在范围内"""
+        if self.min_bytes is not None and size < self.min_bytes:
+            return False
+        if self.max_bytes is not None and size > self.max_bytes:
+            return False
+        return True
+
+    def matches(self, entry) -> bool:
+        """
+        检查文件是否匹配
+
+        Args:
+            entry: os.DirEntry 或 Path（需要 name 属性与 stat() 方法）
+
+        Raises:
+            OSError: 需要文件大小但无法读取
+        """
+        if not self.match_name(entry.name):
+            return False
+        if self.needs_size:
+            return self.match_size(entry.stat().st_size)
+        return True
+
 
 class FileDeleter:
     """文件删除器，支持多种匹配模式"""
 
-    def __init__(self, logger: Optional[logging.Logger] = None):
+    def __init__(
+        self,
+        logger: Optional[logging.Logger] = None,
+        staging: Optional[StagingArea] = None,
+    ):
         """
         初始化文件删除器
 
         Args:
             logger: 日志记录器
+            staging: 暂存删除使用的暂存区，None 表示首次暂存删除时按默认设置创建
         """
         self.logger = logger or logging.getLogger(__name__)
+        self.staging = staging
         self.match_modes = [
             "关键字匹配",
             "前缀匹配",
@@ -48,7 +204,8 @@ class FileDeleter:
             min_size: 最小文件大小（MB）
             max_size: 最大文件大小（MB）
             recursive: 是否递归搜索子目录
-            progress_callback: 进度回调函数 (current, total)
+            progress_callback: 进度回调函数 (已扫描文件数, 已匹配文件数)，
+                边扫描边回调，总数事先未知
 
         Returns:
             (匹配的文件列表, 错误信息列表)
@@ -60,139 +217,124 @@ class FileDeleter:
         if not root_path.is_dir():
             raise ValueError(f"路径不是目录: {root_dir}")
 
-        matched_files = []
-        errors = []
-
-        # 获取所有文件
-        if recursive:
-            all_files = list(root_path.rglob("*"))
-        else:
-            all_files = list(root_path.glob("*"))
-
-        # 过滤出文件（排除目录）
-        all_files = [f for f in all_files if f.is_file()]
+        # 匹配条件只解析一次
+        matcher = FileMatcher(match_mode, pattern, min_size, max_size)
 
-        total = len(all_files)
-
-        self.logger.info(f"开始扫描，共找到 {total} 个文件")
-
-        for idx, file_path in enumerate(all_files):
-            try:
-                # 进度回调
-                if progress_callback:
-                    progress_callback(idx + 1, total)
+        errors = []
+        counts = {"scanned": 0, "matched": 0}
+        self.logger.info(f"开始扫描: {root_path}")
 
-                # 检查文件是否匹配
-                if self._matches(file_path, match_mode, pattern, min_size, max_size):
-                    matched_files.append(file_path)
-                    self.logger.debug(f"匹配文件: {file_path}")
+        matched_files = []
+        for file_path in self.iter_matches(
+            root_path, matcher, recursive, counts, errors, progress_callback
+        ):
+            matched_files.append(file_path)
+            self.logger.debug(f"匹配文件: {file_path}")
 
-            except Exception as e:
-                error_msg = f"处理文件 {file_path} 时出错: {str(e)}"
-                errors.append(error_msg)
-                self.logger.error(error_msg)
+        if progress_callback:
+            progress_callback(counts["scanned"], counts["matched"])
 
-        self.logger.info(f"扫描完成，共找到 {len(matched_files)} 个匹配文件")
+        self.logger.info(
+            f"扫描完成，共扫描 {counts['scanned']} 个文件，"
+            f"找到 {len(matched_files)} 个匹配文件"
+        )
 
         return matched_files, errors
 
-    def _matches(
+    def iter_matches(
         self,
-        file_path: Path,
-        match_mode: str,
-        pattern: str,
-        min_size: Optional[int],
-        max_size: Optional[int],
-    ) -> bool:
+        root_path: Path,
+        matcher: FileMatcher,
+        recursive: bool = True,
+        counts: Optional[Dict[str, int]] = None,
+        errors: Optional[List[str]] = None,
+        progress_callback: Optional[Callable[[int, int], None]] = None,
+    ) -> Iterator[Path]:
         """
-        检查文件是否匹配条件
+        边扫描边产出匹配的文件
 
-        Args:
-            file_path: 文件路径
-            match_mode: 匹配模式
-            pattern: 匹配模式
-            min_size: 最小文件大小（MB）
-            max_size: 最大文件大小（MB）
+        使用 os.scandir 遍历，先用 DirEntry 的文件名判断，文件名匹配后才确认是否为
+        文件、读取大小；DirEntry 缓存类型与 stat 结果，每个文件最多 stat 一次。
+        不进入指向目录的符号链接。
 
-        Returns:
-            是否匹配
+        Args:
+            root_path: 根目录
+            matcher: 预先编译的匹配条件
+            recursive: 是否递归搜索子目录
+            counts: 累计计数 {"scanned", "matched"}，在扫描过程中更新
+            errors: 错误信息列表，扫描中的错误追加到其中
+            progress_callback: 进度回调函数 (已扫描文件数, 已匹配文件数)
         """
-        # 大小检查（所有模式都支持）
-        if min_size is not None or max_size is not None:
+        if counts is None:
+            counts = {"scanned": 0, "matched": 0}
+        if errors is None:
+            errors = []
+
+        pending = [os.fspath(root_path)]
+        while pending:
+            directory = pending.pop()
             try:
-                file_size_mb = file_path.stat().st_size / (1024 * 1024)
-                if min_size is not None and file_size_mb < min_size:
-                    return False
-                if max_size is not None and file_size_mb > max_size:
-                    return False
-            except Exception as e:
-                self.logger.warning(f"无法获取文件大小 {file_path}: {e}")
-                return False
-
-        # 根据匹配模式检查
-        if match_mode == "关键字匹配":
-            return self._match_keyword(file_path, pattern)
-        elif match_mode == "前缀匹配":
-            return self._match_prefix(file_path, pattern)
-        elif match_mode == "后缀匹配":
-            return self._match_suffix(file_path, pattern)
-        elif match_mode == "扩展名匹配":
-            return self._match_extension(file_path, pattern)
-        elif match_mode == "正则表达式匹配":
-            return self._match_regex(file_path, pattern)
-        else:
-            self.logger.warning(f"未知的匹配模式: {match_mode}")
-            return False
-
-    def _match_keyword(self, file_path: Path, keyword: str) -> bool:
-        """关键字匹配"""
-        return keyword.lower() in file_path.name.lower()
-
-    def _match_prefix(self, file_path: Path, prefix: str) -> bool:
-        """前缀匹配"""
-        return file_path.name.lower().startswith(prefix.lower())
-
-    def _match_suffix(self, file_path: Path, suffix: str) -> bool:
-        """后缀匹配（不包含扩展名）"""
-        # 如果后缀以点开头，从完整文件名匹配
-        if suffix.startswith("."):
-            return file_path.name.lower().endswith(suffix.lower())
-        # 否则从文件名（不含扩展名）匹配
-        return file_path.stem.lower().endswith(suffix.lower())
-
-    def _match_extension(self, file_path: Path, extensions: str) -> bool:
-        """扩展名匹配"""
-        ext_list = [ext.strip().lower() for ext in extensions.split(",")]
-        file_ext = file_path.suffix.lower()
-
-        # 标准化扩展名（确保有点号）
-        for ext in ext_list:
-            if not ext.startswith("."):
-                ext = "." + ext
-            if file_ext == ext:
-                return True
-        return False
-
-    def _match_regex(self, file_path: Path, pattern: str) -> bool:
-        """正则表达式匹配"""
-        try:
-            regex = re.compile(pattern)
-            return bool(regex.search(file_path.name))
-        except re.error as e:
-            self.logger.error(f"无效的正则表达式 '{pattern}': {e}")
-            return False
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                # 暂存删除的文件不再参与匹配
+                                if recursive and not is_staging_name(entry.name):
+                                    pending.append(entry.path)
+                                continue
+
+                            counts["scanned"] += 1
+                            if (
+                                progress_callback
+                                and counts["scanned"] % _PROGRESS_EVERY == 0
+                            ):
+                                progress_callback(counts["scanned"], counts["matched"])
+
+                            if not matcher.match_name(entry.name) or not entry.is_file():
+                                continue
+                        except OSError as e:
+                            error_msg = f"处理文件 {entry.path} 时出错: {str(e)}"
+                            errors.append(error_msg)
+                            self.logger.error(error_msg)
+                            continue
+
+                        if matcher.needs_size:
+                            try:
+                                size = entry.stat().st_size
+                            except OSError as e:
+                                self.logger.warning(f"无法获取文件大小 {entry.path}: {e}")
+                                continue
+                            if not matcher.match_size(size):
+                                continue
+
+                        counts["matched"] += 1
+                        yield Path(entry.path)
+            except OSError as e:
+                error_msg = f"无法读取目录 {directory}: {str(e)}"
+                errors.append(error_msg)
+                self.logger.error(error_msg)
 
     def delete_files(
         self,
         files: List[Path],
         progress_callback: Optional[Callable[[int, int], None]] = None,
+        max_workers: int = 4,
+        remove_empty_dirs: bool = False,
+        root_dir: Optional[str] = None,
     ) -> Tuple[int, List[str]]:
         """
         删除文件列表
 
+        文件按所在目录分组，每组（大目录拆成多批）打开一次目录后相对目录删除，
+        各批在线程池中并行执行；日志按批记录，不逐个文件输出。
+
         Args:
             files: 要删除的文件列表
             progress_callback: 进度回调函数 (current, total)
+            max_workers: 并行删除的线程数
+            remove_empty_dirs: 删除完成后，自底向上删除因此变空的目录
+            root_dir: 删除空目录时的边界，只删除该目录之内的目录（不含其本身）；
+                None 时只删除被删文件的直接父目录
 
         Returns:
             (成功删除的文件数, 错误信息列表)
@@ -203,26 +345,113 @@ class FileDeleter:
         total = len(files)
         self.logger.info(f"开始删除 {total} 个文件")
 
-        for idx, file_path in enumerate(files):
-            try:
-                # 进度回调
-                if progress_callback:
-                    progress_callback(idx + 1, total)
+        by_parent: Dict[str, List[str]] = defaultdict(list)
+        for file_path in files:
+            parent, name = os.path.split(os.path.abspath(file_path))
+            by_parent[parent].append(name)
 
-                # 删除文件
-                file_path.unlink()
-                success_count += 1
-                self.logger.info(f"已删除: {file_path}")
+        batches = [
+            (parent, names[i : i + _DELETE_BATCH])
+            for parent, names in by_parent.items()
+            for i in range(0, len(names), _DELETE_BATCH)
+        ]
 
-            except Exception as e:
-                error_msg = f"删除文件 {file_path} 失败: {str(e)}"
-                errors.append(error_msg)
-                self.logger.error(error_msg)
+        done = 0
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            futures = {
+                executor.submit(_unlink_batch, parent, names): (parent, len(names))
+                for parent, names in batches
+            }
+            for future in as_completed(futures):
+                parent, batch_size = futures[future]
+                deleted, batch_errors = future.result()
+                success_count += deleted
+                errors.extend(batch_errors)
+                for error_msg in batch_errors:
+                    self.logger.error(error_msg)
+                if deleted:
+                    self.logger.info(f"已删除 {deleted} 个文件: {parent}")
+
+                done += batch_size
+                if progress_callback:
+                    progress_callback(done, total)
 
         self.logger.info(f"删除完成，成功删除 {success_count} 个文件，失败 {len(errors)} 个")
 
+        if remove_empty_dirs and by_parent:
+            removed = self._remove_empty_dirs(by_parent, root_dir)
+            self.logger.info(f"已删除 {removed} 个空目录")
+
         return success_count, errors
 
+    def stage_files(
+        self,
+        files: List[Path],
+        progress_callback: Optional[Callable[[int, int], None]] = None,
+        root_dir: Optional[str] = None,
+    ) -> Tuple[int, List[str]]:
+        """
+        暂存删除：将文件或目录移入所在文件系统的暂存区后立即返回
+
+        同一文件系统内只是改名，与文件大小、目录树规模无关；暂存区由后台线程
+        按保留时间与总大小上限清理，清理之前可以通过 self.staging 恢复。
+
+        Args:
+            files: 要删除的文件或目录列表
+            progress_callback: 进度回调函数 (current, total)
+            root_dir: 搜索的根目录，与文件在同一文件系统上时暂存区建在这里
+
+        Returns:
+            (成功移入暂存区的数量, 错误信息列表)
+        """
+        if self.staging is None:
+            self.staging = StagingArea(logger=self.logger)
+
+        self.logger.info(f"开始暂存删除 {len(files)} 个文件")
+        success_count, errors = self.staging.stage(files, root_dir, progress_callback)
+        self.logger.info(
+            f"暂存删除完成，已移入暂存区 {success_count} 个文件，失败 {len(errors)} 个"
+        )
+        return success_count, errors
+
+    def _remove_empty_dirs(
+        self, directories: Iterable[str], root_dir: Optional[str] = None
+    ) -> int:
+        """
+        自底向上删除空目录（一次遍历）
+
+        按深度从深到浅处理，目录删除成功后把父目录加入待检查集合，
+        因此每个目录只尝试一次 rmdir；非空或无法删除的目录保留。
+
+        Args:
+            directories: 可能变空的目录
+            root_dir: 边界目录，为 None 时不向上检查父目录
+
+        Returns:
+            删除的目录数
+        """
+        root = os.path.abspath(root_dir) if root_dir is not None else None
+        by_depth: Dict[int, set] = defaultdict(set)
+        for directory in directories:
+            directory = os.path.abspath(directory)
+            if root is None or _is_within(directory, root):
+                by_depth[directory.count(os.sep)].add(directory)
+
+        removed = 0
+        while by_depth:
+            depth = max(by_depth)
+            for directory in by_depth.pop(depth):
+                try:
+                    os.rmdir(directory)
+                except OSError:
+                    continue
+                removed += 1
+                self.logger.debug(f"已删除空目录: {directory}")
+                parent = os.path.dirname(directory)
+                if root is not None and _is_within(parent, root):
+                    by_depth[depth - 1].add(parent)
+        return removed
+
     def get_match_description(self, match_mode: str) -> str:
         """
         获取匹配模式的说明
@@ -1,11 +1,73 @@
+import os
 import shutil
+import stat
+import time
 from logging import Logger
 from pathlib import Path
-from typing import Optional, List
+from typing import Callable, Iterable, Iterator, Optional, List, Tuple
 from datetime import datetime
 from collections import defaultdict
 
+from toolkits.file.archive_source import (
+    ARCHIVE_ERRORS,
+    ArchiveMemberPath,
+    ArchiveReader,
+    is_archive_name,
+)
+from toolkits.file.archive_sink import (
+    ARCHIVE_COMPRESSIONS,
+    ARCHIVE_FORMATS,
+    ArchiveSink,
+    archive_suffix,
+)
+from toolkits.file.copy_engine import (
+    CHECKSUM_ALGORITHMS,
+    LINK_MODES,
+    CopyEngine,
+    is_temp_name,
+    prefetch,
+    remove_path,
+)
+from toolkits.file.dedup import find_duplicates
+from toolkits.file.manifest import (
+    ChecksumManifest,
+    ExtractJournal,
+    ExtractManifest,
+)
 from toolkits.utils.file_filter import FileFilterStrategy
+from toolkits.utils.hashing import hash_file
+
+# 进度回调的最小间隔（秒）
+_PROGRESS_INTERVAL = 0.2
+
+# 同步模式及其中文名称
+SYNC_MODES = {
+    "quick": "比较大小与修改时间",
+    "checksum": "比较内容哈希",
+}
+
+# 预演计划中的动作及其中文名称
+PLAN_ACTIONS = {
+    "copy": "提取",
+    "overwrite": "覆盖",
+    "update": "更新（已变化）",
+    "link": "链接到内容相同的文件",
+    "skip_exists": "跳过（已存在）",
+    "skip_done": "跳过（上次已完成）",
+    "skip_unchanged": "跳过（未变化）",
+    "skip_duplicate": "跳过（内容重复）",
+    "skip_planned": "跳过（与本次其他目标同名）",
+}
+
+# 内容去重模式及其中文名称
+DEDUP_MODES = {
+    "skip": "跳过内容重复的文件",
+    "link": "内容重复的文件硬链接到首个副本",
+}
+
+# 源文件与清单一致时，目标修改时间的比较容差：FAT/exFAT 与部分网络文件系统
+# 只有 2 秒精度，复制后目标的修改时间可能与源文件略有不同
+_MTIME_WINDOW_NS = 2_000_000_000
 
 
 class FileExtractor:
@@ -23,6 +85,16 @@ class FileExtractor:
         custom_prefix: str = "",
         custom_suffix: str = "",
         extract_target: str = "files",
+        max_workers: int = 1,
+        link_mode: str = "copy",
+        sync_mode: Optional[str] = None,
+        dedup_mode: Optional[str] = None,
+        resume: bool = False,
+        checksum: Optional[str] = None,
+        scan_archives: bool = False,
+        archive_format: Optional[str] = None,
+        archive_compression: str = "deflate",
+        compress_level: Optional[int] = None,
     ):
         """
         初始化文件提取器
@@ -48,6 +120,40 @@ class FileExtractor:
             extract_target: 提取目标类型
                 - "files": 提取文件
                 - "dirs": 提取文件夹
+            max_workers: 并行复制的线程数，1 表示顺序复制
+            link_mode: 输出方式
+                - "copy": 复制
+                - "hardlink": 硬链接（不占用额外空间，与源文件共用同一份数据）
+                - "reflink": 写时复制克隆（btrfs/XFS 等，不占用额外空间，互不影响）
+                - "symlink": 符号链接
+                硬链接与 reflink 不可用时自动回退为复制
+            sync_mode: 增量同步模式（仅对文件有效），None 表示不同步
+                - "quick": 目标已存在且大小、修改时间与源文件相同时跳过，否则更新
+                - "checksum": 大小相同时再比较内容哈希，相同则跳过
+                同步模式下已变化的文件总是被更新（忽略 overwrite）；比较结果记录在
+                输出目录的提取清单中，下次提取时未变化的文件无需重新计算哈希
+            dedup_mode: 内容去重模式（仅对文件有效），None 表示不去重
+                - "skip": 内容相同的文件只提取第一个，其余跳过
+                - "link": 其余文件照常命名，但硬链接到第一个文件的输出（不占空间）
+                去重需要先扫描完整个目录树再开始复制
+            resume: 断点续传。提取过程中在输出目录记录断点日志，中断后以相同参数
+                再次提取时，跳过日志中已完成（且目标大小一致）的目标；
+                全部成功后删除日志
+            checksum: 校验和算法（如 "sha256"、"blake2b"，见 CHECKSUM_ALGORITHMS），
+                None 表示不计算。复制时每个文件只读取一次，同时写入目标并计算校验和，
+                结果写入输出目录的校验和清单（可用 sha256sum -c / b2sum -c 核对）
+            scan_archives: 将 zip / tar(.gz/.bz2/.xz) 压缩包视为虚拟目录（仅对文件有效）。
+                压缩包本身不作为目标，过滤策略与扩展名作用于其中的成员，符合条件的成员
+                直接从压缩包流式写出，不解压整个压缩包；成员总是以复制方式写出。
+                压缩包在目录树中的普通文件之后处理
+            archive_format: 输出为压缩包（见 ARCHIVE_FORMATS），None 表示输出到目录。
+                压缩包路径为 output_dir 加上对应扩展名（已带扩展名时不再添加），
+                组织方式与命名模式决定成员在压缩包中的路径；文件直接写入压缩包，
+                不经过中间目录。压缩包已存在且不覆盖时报错。
+                输出为压缩包时不支持链接方式、同步、断点续传、重复内容硬链接与校验和清单
+            archive_compression: 压缩方式，见 ARCHIVE_COMPRESSIONS；
+                "store" 只存储不压缩，适合图片、视频等已压缩的文件
+            compress_level: 压缩级别，None 表示默认级别
         """
         self.logger = logger
         self.input_dir = input_dir
@@ -59,10 +165,33 @@ class FileExtractor:
         self.custom_prefix = custom_prefix
         self.custom_suffix = custom_suffix
         self.extract_target = extract_target
+        self.max_workers = max_workers
+        self.link_mode = link_mode
+        self.sync_mode = sync_mode
+        self.dedup_mode = dedup_mode
+        self.resume = resume
+        self.checksum = checksum
+        self.scan_archives = scan_archives
+        self.archive_format = archive_format
+        self.archive_compression = archive_compression
+        self.compress_level = compress_level
 
         # 用于序号模式的文件计数器
         self.file_counters = defaultdict(int)
 
+        # 单次提取的规划状态：输出目录快照 {路径: 是否为目录}、本次已分配的目标路径，
+        # 以及预演模式下的计划列表
+        self._existing = {}
+        self._planned = set()
+        self._dry_run = False
+        self._plan = []
+        self._sync_mode = None
+        self._journal = None
+        self._resumed = {}
+        self._checksums = None
+        self._archive_format = None
+        self._archive_path = None
+
     def find_all_files(
         self, input_dir: Path, extensions: Optional[List[str]] = None
     ) -> List[Path]:
@@ -76,40 +205,11 @@ class FileExtractor:
         Returns:
             符合条件的文件路径列表
         """
-        if not input_dir.exists():
-            self.logger.error(f"输入目录不存在: {input_dir}")
-            return []
-
-        if not input_dir.is_dir():
-            self.logger.error(f"输入路径不是目录: {input_dir}")
-            return []
-
-        # 查找所有文件
-        if extensions:
-            # 查找指定扩展名的文件
-            all_files = []
-            for ext in extensions:
-                if not ext.startswith("."):
-                    ext = "." + ext
-                all_files.extend(list(input_dir.rglob(f"*{ext}")))
-        else:
-            # 查找所有文件
-            all_files = list(input_dir.rglob("*"))
-            all_files = [f for f in all_files if f.is_file()]
-
-        # 应用过滤策略
-        filtered_files = []
-        for file_path in all_files:
-            if self.file_filter_strategy is None:
-                filtered_files.append(file_path)
-            elif self.file_filter_strategy.should_include(file_path):
-                filtered_files.append(file_path)
-
-        return filtered_files
+        return list(self.iter_targets(input_dir, "files", extensions))
 
     def find_all_directories(self, input_dir: Path) -> List[Path]:
         """
-        查找目录中所有符合条件的子目录
+        查找目录中所有符合条件的子目录（嵌套的匹配只保留最上层的目录）
 
         Args:
             input_dir: 要搜索的目录
@@ -117,114 +217,629 @@ class FileExtractor:
         Returns:
             符合条件的目录路径列表
         """
+        return list(self.iter_targets(input_dir, "dirs"))
+
+    def iter_targets(
+        self,
+        input_dir: Path,
+        extract_target: str = "files",
+        extensions: Optional[List[str]] = None,
+        exclude_output_dir: bool = False,
+        archives: Optional[List[Path]] = None,
+    ) -> Iterator[Path]:
+        """
+        边遍历边产出符合条件的文件或子目录
+
+        Args:
+            input_dir: 要搜索的目录
+            extract_target: "files" 或 "dirs"
+            extensions: 文件扩展名列表，None 表示所有文件（仅对 files 有效）
+            exclude_output_dir: 是否跳过输出目录（不进入其中遍历）、输出压缩包
+                及其写入中的临时文件
+            archives: 不为 None 时，遇到的压缩包不作为目标产出，而是追加到该列表
+                （仅对 files 有效）
+        """
         if not input_dir.exists():
             self.logger.error(f"输入目录不存在: {input_dir}")
-            return []
+            return
 
         if not input_dir.is_dir():
             self.logger.error(f"输入路径不是目录: {input_dir}")
-            return []
-
-        all_dirs = [p for p in input_dir.rglob("*") if p.is_dir()]
-
-        filtered_dirs = []
-        for dir_path in all_dirs:
-            if self.file_filter_strategy is None:
-                filtered_dirs.append(dir_path)
-            elif self.file_filter_strategy.should_include(dir_path):
-                filtered_dirs.append(dir_path)
+            return
+
+        suffixes = self._normalize_suffixes(extensions)
+        strategy = self.file_filter_strategy
+        real_output_dir = self.output_dir.resolve() if exclude_output_dir else None
+        real_archive_path = (
+            self._archive_path.resolve()
+            if exclude_output_dir and self._archive_path is not None
+            else None
+        )
+        for dirpath, dirnames, filenames in os.walk(input_dir):
+            parent = Path(dirpath)
+            if exclude_output_dir:
+                # 按解析符号链接后的路径判断；输出目录与输入目录相同（或输入目录位于
+                # 输出目录中）时，整个目录都不产出目标，避免把源文件当作已存在的目标删除
+                real_parent = parent.resolve()
+                if real_parent.is_relative_to(real_output_dir):
+                    dirnames[:] = []
+                    continue
+                dirnames[:] = [
+                    d
+                    for d in dirnames
+                    if not is_temp_name(d)
+                    and not (real_parent / d).resolve().is_relative_to(real_output_dir)
+                ]
+                # 输出压缩包位于输入目录中时，跳过它及写入中的临时文件
+                filenames = [f for f in filenames if not is_temp_name(f)]
+                if real_archive_path is not None and real_parent == real_archive_path.parent:
+                    filenames = [f for f in filenames if f != real_archive_path.name]
+
+            if archives is not None and extract_target == "files":
+                regular = []
+                for name in filenames:
+                    if is_archive_name(name):
+                        archives.append(parent / name)
+                    else:
+                        regular.append(name)
+                filenames = regular
 
-        return filtered_dirs
+            if extract_target == "dirs":
+                names = dirnames
+            elif suffixes is not None:
+                names = [f for f in filenames if os.path.normcase(f).endswith(suffixes)]
+            else:
+                names = filenames
+
+            matched = [
+                parent / name
+                for name in names
+                if strategy is None or strategy.should_include(parent / name)
+            ]
+            if extract_target == "dirs" and matched:
+                # 匹配的目录整体复制，不再进入其中查找：嵌套的匹配归并到最上层的目录，
+                # 避免同一内容被复制多次
+                matched_names = {path.name for path in matched}
+                dirnames[:] = [d for d in dirnames if d not in matched_names]
+            yield from matched
+
+    def iter_archive_members(
+        self, reader: ArchiveReader, extensions: Optional[List[str]] = None
+    ) -> Iterator[ArchiveMemberPath]:
+        """
+        按压缩包内的顺序产出符合条件的成员
 
-    def extract_files(self, extensions: Optional[List[str]] = None) -> dict:
+        Args:
+            reader: 已打开的压缩包
+            extensions: 文件扩展名列表，None 表示所有文件
+        """
+        suffixes = self._normalize_suffixes(extensions)
+        strategy = self.file_filter_strategy
+        for member in reader.members():
+            if suffixes is not None and not os.path.normcase(member.name).endswith(
+                suffixes
+            ):
+                continue
+            if strategy is None or strategy.should_include(member):
+                yield member
+
+    def extract_files(
+        self,
+        extensions: Optional[List[str]] = None,
+        progress_callback: Optional[Callable[[dict], None]] = None,
+        dry_run: bool = False,
+    ) -> dict:
         """
         提取文件到输出目录
 
+        目录遍历在后台线程中进行，找到的目标经有界队列交给复制流程，
+        第一个目标被找到后即开始复制，无需等待整个目录树扫描完成。
+        输出目录只在开始时读取一次，所有目标路径（包括命名冲突）都在内存中确定。
+
         Args:
             extensions: 要提取的文件扩展名列表，None 表示所有文件
+            progress_callback: 进度回调，参数为当前累计计数
+                {"found", "success", "skipped", "error"}（总数事先未知）
+            dry_run: 预演模式，只计算计划，不创建、复制或删除任何文件
 
         Returns:
             包含提取结果的字典:
-            - success_count: 成功提取的文件数
+            - success_count: 成功提取的文件数（预演时为计划提取的数量）
             - skipped_count: 跳过的文件数
             - error_count: 出错的文件数
             - total_count: 总文件数
+            - plan: 仅预演模式，计划列表 [{"source", "destination", "action"}]，
+              action 见 PLAN_ACTIONS
         """
-        # 创建输出目录
-        self.output_dir.mkdir(parents=True, exist_ok=True)
+        if self.checksum is not None and self.checksum not in CHECKSUM_ALGORITHMS:
+            # 合规场景下不能悄悄退化为不校验，直接报错
+            raise ValueError(
+                f"不支持的校验和算法: {self.checksum}，"
+                f"可选值: {', '.join(CHECKSUM_ALGORITHMS)}"
+            )
+
+        # 输出为压缩包时，目标路径仍按输出目录计算，相对输出目录的部分作为成员路径
+        archive_format = self._normalize_archive_format()
+        self._archive_format = archive_format
+        self._archive_path = None
+        checksum = self.checksum
+        if archive_format is not None:
+            compression = self._normalize_archive_compression()
+            archive_path = self._get_archive_path(archive_format, compression)
+            self._archive_path = archive_path
+            if archive_path.exists() and not self.overwrite:
+                raise FileExistsError(f"输出压缩包已存在: {archive_path}")
+            self._warn_unsupported_for_archive()
+            checksum = None
+
+        # 单次提取的规划状态
+        self._dry_run = dry_run
+        self._plan = []
+        self._planned = set()
+        self._existing = {} if archive_format else self._snapshot_output_dir()
+
+        # 创建输出目录（输出为压缩包时只创建其所在目录）
+        if not dry_run:
+            if archive_format is not None:
+                archive_path.parent.mkdir(parents=True, exist_ok=True)
+            else:
+                self.output_dir.mkdir(parents=True, exist_ok=True)
+
+        # 断点续传：读取上次未完成的提取记录，本次完成的复制继续追加
+        self._journal = None
+        self._resumed = {}
+        if self.resume and archive_format is None:
+            journal = ExtractJournal(self.input_dir, self.output_dir, logger=self.logger)
+            self._resumed = journal.load()
+            if self._resumed:
+                self.logger.info(f"从断点继续，上次已完成 {len(self._resumed)} 个目标")
+            if not dry_run:
+                self._journal = journal
 
-        # 查找所有符合条件的目标
         extract_target = self._normalize_extract_target()
-        if extract_target == "dirs":
-            all_targets = self.find_all_directories(self.input_dir)
+        target_name = self._get_extract_target_name(extract_target)
+        if dry_run:
+            self.logger.info("预演模式：只计算计划，不修改输出目录")
+        self.logger.info(f"开始查找并提取{target_name}")
+        self.logger.info(f"组织方式: {self._get_organize_mode_name()}")
+        self.logger.info(f"命名模式: {self._get_naming_mode_name()}")
+        link_mode = self._normalize_link_mode()
+        self.logger.info(f"输出方式: {LINK_MODES[link_mode]}")
+        sync_mode = self._normalize_sync_mode()
+        if sync_mode is not None:
+            self.logger.info(f"同步模式: {SYNC_MODES[sync_mode]}")
+
+        # 同步模式：上次的清单用于比较，本次的清单记录所有已同步的文件
+        self._sync_mode = sync_mode
+        self._previous_manifest = ExtractManifest(self.output_dir, self.logger)
+        if sync_mode is not None:
+            self._previous_manifest.load()
+        self._manifest = ExtractManifest(self.output_dir, self.logger)
+        self._sync_sources = {}
+
+        # 查找符合条件的目标，排除输出目录自身及其内容（避免递归复制）；
+        # 读取压缩包时，遍历中遇到的压缩包记录下来，在目录树之后处理
+        archives = [] if self._should_scan_archives(extract_target) else None
+        all_targets = prefetch(
+            self.iter_targets(
+                self.input_dir,
+                extract_target,
+                extensions,
+                exclude_output_dir=True,
+                archives=archives,
+            )
+        )
+
+        # 内容去重：{重复文件: 原件}，原件的输出路径，以及等待链接的重复文件
+        dedup_mode = self._normalize_dedup_mode(extract_target)
+        self._dedup_mode = dedup_mode
+        self._duplicates = {}
+        self._primary_dests = {}
+        self._deferred_links = []
+        copied_dests = set()
+        if dedup_mode is not None:
+            self.logger.info(f"内容去重: {DEDUP_MODES[dedup_mode]}")
+            all_targets = list(all_targets)
+            self._duplicates = find_duplicates(all_targets, self.max_workers)
+            self.logger.info(f"发现 {len(self._duplicates)} 个内容重复的文件")
+
+        counts = {"found": 0, "success": 0, "skipped": 0, "error": 0}
+        last_report = 0.0
+        sink = None
+
+        def report(force: bool = False) -> None:
+            nonlocal last_report
+            now = time.monotonic()
+            if progress_callback and (force or now - last_report >= _PROGRESS_INTERVAL):
+                last_report = now
+                progress_callback(dict(counts))
+
+        def on_done(target_path: Path, dest_path: Path, error, checksums) -> None:
+            if error is not None:
+                self.logger.error(f"复制失败 {target_path}: {error}")
+                counts["error"] += 1
+            else:
+                self.logger.info(f"已复制: {target_path.relative_to(self.input_dir)}")
+                counts["success"] += 1
+                if self._checksums is not None:
+                    self._checksums.write(checksums)
+                if dest_path in self._sync_sources:
+                    self._manifest.set(dest_path, *self._sync_sources[dest_path])
+                if dedup_mode is not None:
+                    copied_dests.add(dest_path)
+                self._record_done(target_path, dest_path)
+            self._sync_sources.pop(dest_path, None)
+            report()
+
+        def write(jobs: Iterable[Tuple[Path, Path]], max_workers: int) -> int:
+            """写出 (源路径, 目标路径) 任务，返回链接不可用而回退为复制的数量"""
+            if sink is not None:
+                # 压缩包只能依次写入
+                for src, dest in jobs:
+                    try:
+                        sink.add(src, dest.relative_to(self.output_dir).as_posix())
+                    except Exception as e:
+                        on_done(src, dest, e, {})
+                        # 写入一半的成员会使压缩包损坏，放弃整个压缩包
+                        raise RuntimeError(
+                            f"写入压缩包失败，已放弃压缩包: {sink.path}"
+                        ) from e
+                    else:
+                        on_done(src, dest, None, {})
+                return 0
+            engine = CopyEngine(
+                max_workers=max_workers, link_mode=link_mode, checksum=checksum
+            )
+            engine.run(jobs, on_done)
+            return engine.fallback_count
+
+        def plan_only(targets: Iterable[Path]) -> None:
+            for _ in self._plan_copies(targets, counts):
+                counts["success"] += 1
+                report()
+
+        def extract_archives() -> None:
+            # 目录树遍历结束后 archives 才完整
+            for archive_path in archives or ():
+                self.logger.info(
+                    f"读取压缩包: {archive_path.relative_to(self.input_dir)}"
+                )
+                try:
+                    with ArchiveReader(archive_path) as reader:
+                        members = self.iter_archive_members(reader, extensions)
+                        if dry_run:
+                            plan_only(members)
+                            continue
+                        # tar 只能顺序读取，成员在遍历的同时逐个写出
+                        write(
+                            self._plan_copies(members, counts),
+                            1 if reader.sequential else self.max_workers,
+                        )
+                except ARCHIVE_ERRORS as e:
+                    self.logger.error(f"读取压缩包失败 {archive_path}: {e}")
+                    counts["error"] += 1
+
+        if dry_run:
+            plan_only(all_targets)
+            extract_archives()
+            counts["success"] += len(self._deferred_links)
         else:
-            all_targets = self.find_all_files(self.input_dir, extensions)
+            finished = False
+            if self._journal is not None:
+                self._journal.open(resume=bool(self._resumed))
+            if checksum is not None:
+                self._checksums = ChecksumManifest(self.output_dir, checksum)
+                # 保留已有的校验和（本次跳过或断点续传时已完成的文件）
+                self._checksums.open()
+                if self._journal is not None:
+                    self._journal.before_sync = self._checksums.sync
+                self.logger.info(f"校验和: {checksum}，清单: {self._checksums.path}")
+            if archive_format is not None:
+                sink = ArchiveSink(
+                    archive_path, archive_format, compression, self.compress_level
+                )
+                sink.open()
+                self.logger.info(
+                    f"输出到{ARCHIVE_FORMATS[archive_format]}: {archive_path}"
+                    f"（{ARCHIVE_COMPRESSIONS[compression]}）"
+                )
+            try:
+                fallback_count = write(
+                    self._plan_copies(all_targets, counts), self.max_workers
+                )
+                if fallback_count:
+                    self.logger.warning(
+                        f"{fallback_count} 个文件无法使用{LINK_MODES[link_mode]}，已改为复制"
+                    )
+                extract_archives()
+                if self._deferred_links:
+                    self._link_duplicates(copied_dests, counts)
+                if sync_mode is not None:
+                    self._manifest.save()
+                finished = True
+            finally:
+                if sink is not None:
+                    # 中断时删除未完成的压缩包
+                    sink.close(commit=finished)
+                if self._checksums is not None:
+                    try:
+                        self._checksums.close()
+                    except OSError as e:
+                        self.logger.error(f"写入校验和清单失败 {self._checksums.path}: {e}")
+                    self._checksums = None
+                if self._journal is not None:
+                    # 全部成功时无需恢复，删除日志；否则保留供下次继续
+                    self._journal.close(remove=finished and counts["error"] == 0)
+        report(force=True)
+
+        success_count = counts["success"]
+        skipped_count = counts["skipped"]
+        error_count = counts["error"]
 
-        # 排除输出目录自身及其内容（避免递归复制）
-        all_targets = [
-            p for p in all_targets if not self._is_within_output_dir(p)
-        ]
+        result = {
+            "success_count": success_count,
+            "skipped_count": skipped_count,
+            "error_count": error_count,
+            "total_count": counts["found"],
+        }
+        if dry_run:
+            result["plan"] = self._plan
 
         self.logger.info(
-            f"找到 {len(all_targets)} 个{self._get_extract_target_name(extract_target)}"
+            f"{'预演' if dry_run else '提取'}完成: 找到={counts['found']}个{target_name}, "
+            f"成功={success_count}, 跳过={skipped_count}, 失败={error_count}"
         )
-        self.logger.info(f"组织方式: {self._get_organize_mode_name()}")
-        self.logger.info(f"命名模式: {self._get_naming_mode_name()}")
 
-        success_count = 0
-        skipped_count = 0
-        error_count = 0
+        return result
+
+    def _plan_copies(self, all_targets: Iterable[Path], counts: dict):
+        """
+        依次计算每个目标的输出路径并处理已存在的目标，产出 (源路径, 目标路径)
 
+        是否已存在按开始时的输出目录快照与本次已分配的路径在内存中判断，
+        不逐个访问文件系统；目标路径在本次提取中只分配一次，
+        避免并行复制时多个源写入同一路径。预演模式下只记录计划，不修改输出目录。
+        """
         for target_path in all_targets:
+            counts["found"] += 1
             try:
+                done_dest = self._resumed_dest(target_path)
+                if done_dest is not None:
+                    self._planned.add(done_dest)
+                    self._note_plan(target_path, done_dest, "skip_done")
+                    counts["skipped"] += 1
+                    continue
+
+                primary = self._duplicates.get(target_path)
+                if primary is not None and self._dedup_mode == "skip":
+                    self.logger.debug(f"内容重复，跳过: {target_path}")
+                    self._note_plan(target_path, None, "skip_duplicate")
+                    counts["skipped"] += 1
+                    continue
+
                 # 计算目标文件路径
                 dest_path = self._get_destination_path(target_path)
 
                 # 应用命名模式
                 dest_path = self._apply_naming_mode(dest_path, target_path)
 
+                if dest_path in self._planned:
+                    self.logger.info(f"跳过本次提取中重复的目标: {dest_path}")
+                    self._note_plan(target_path, dest_path, "skip_planned")
+                    counts["skipped"] += 1
+                    continue
+
+                sync = self._sync_mode is not None and not target_path.is_dir()
+                if sync:
+                    src_stat = target_path.stat()
+
                 # 检查文件是否已存在
-                if dest_path.exists():
-                    if self.overwrite:
-                        if dest_path.is_dir():
-                            shutil.rmtree(dest_path)
-                        else:
-                            dest_path.unlink()
-                        self.logger.warning(f"覆盖已存在的目标: {dest_path}")
+                action = "copy"
+                existing_is_dir = self._existing.pop(dest_path, None)
+                if existing_is_dir is not None:
+                    if sync and not existing_is_dir:
+                        unchanged, digest = self._compare_for_sync(
+                            target_path, src_stat, dest_path
+                        )
+                        if unchanged:
+                            self._manifest.set(dest_path, src_stat, digest)
+                            self.logger.debug(f"未变化，跳过: {dest_path}")
+                            self._existing[dest_path] = existing_is_dir
+                            self._note_plan(target_path, dest_path, "skip_unchanged")
+                            counts["skipped"] += 1
+                            continue
+                        action = "update"
+                        self._sync_sources[dest_path] = (src_stat, digest)
+                    elif self.overwrite:
+                        action = "overwrite"
                     else:
                         self.logger.info(f"跳过已存在的目标: {dest_path}")
-                        skipped_count += 1
+                        self._existing[dest_path] = existing_is_dir
+                        self._note_plan(target_path, dest_path, "skip_exists")
+                        counts["skipped"] += 1
                         continue
 
-                # 创建目标目录（如果需要）
-                dest_path.parent.mkdir(parents=True, exist_ok=True)
+                    if self._is_same_or_inside(target_path, dest_path):
+                        self._existing[dest_path] = existing_is_dir
+                        raise ValueError(f"目标与源是同一路径或包含源，拒绝覆盖: {dest_path}")
+                    # 已有的目标不预先删除：新内容写完后才原子替换（见 replace_path），
+                    # 复制失败时旧目标保持不变
+                    if action == "update":
+                        self.logger.info(f"已变化，更新: {dest_path}")
+                    else:
+                        self.logger.warning(f"覆盖已存在的目标: {dest_path}")
 
-                # 复制文件/目录
-                if target_path.is_dir():
-                    shutil.copytree(target_path, dest_path, copy_function=shutil.copy2)
-                else:
-                    shutil.copy2(target_path, dest_path)
-                self.logger.info(
-                    f"已复制: {target_path.relative_to(self.input_dir)}"
-                )
-                success_count += 1
+                self._planned.add(dest_path)
+                if self._dedup_mode is not None:
+                    # 原件先复制，重复文件在全部复制完成后链接到原件的输出
+                    primary_dest = self._primary_dests.get(primary)
+                    if primary_dest is not None:
+                        self._deferred_links.append(
+                            (target_path, dest_path, primary_dest)
+                        )
+                        self._note_plan(target_path, dest_path, "link")
+                        continue
+                    self._primary_dests[target_path] = dest_path
+
+                if sync and dest_path not in self._sync_sources:
+                    self._sync_sources[dest_path] = (src_stat, None)
+
+                self._note_plan(target_path, dest_path, action)
+                yield target_path, dest_path
 
             except Exception as e:
                 self.logger.error(f"复制失败 {target_path}: {e}")
-                error_count += 1
+                counts["error"] += 1
+
+    def _resumed_dest(self, target_path: Path) -> Optional[Path]:
+        """目标在上次提取中已完成且输出仍然完整时，返回其输出路径"""
+        if not self._resumed:
+            return None
+        record = self._resumed.get(target_path.relative_to(self.input_dir).as_posix())
+        if record is None:
+            return None
+        dest_path = self.output_dir / record[0]
+        try:
+            st = os.stat(dest_path)
+        except OSError:
+            return None
+        if stat.S_ISDIR(st.st_mode) if record[1] is None else st.st_size == record[1]:
+            return dest_path
+        return None
 
-        result = {
-            "success_count": success_count,
-            "skipped_count": skipped_count,
-            "error_count": error_count,
-            "total_count": len(all_targets),
-        }
+    def _record_done(self, target_path: Path, dest_path: Path) -> None:
+        """在断点日志中记录一次已完成的复制"""
+        if self._journal is None:
+            return
+        st = os.stat(dest_path)
+        size = None if stat.S_ISDIR(st.st_mode) else st.st_size
+        self._journal.record(target_path, dest_path, size)
 
-        self.logger.info(
-            f"提取完成: 成功={success_count}, 跳过={skipped_count}, 失败={error_count}"
+    def _snapshot_output_dir(self) -> dict:
+        """
+        读取输出目录中可能与目标冲突的条目：{路径: 是否为目录}
+
+        目标只会位于输出目录根目录或其下一层（按第一层目录分组），
+        因此只读取这两层，不遍历已提取的文件夹内部。
+        上次中断留下的临时文件在这里清理（预演时保留）。
+        """
+        existing = {}
+        try:
+            with os.scandir(self.output_dir) as entries:
+                subdirs = []
+                for entry in entries:
+                    if is_temp_name(entry.name):
+                        if not self._dry_run:
+                            remove_path(entry.path)
+                        continue
+                    is_dir = entry.is_dir(follow_symlinks=False)
+                    existing[Path(entry.path)] = is_dir
+                    if is_dir:
+                        subdirs.append(entry.path)
+        except FileNotFoundError:
+            return existing
+
+        if self.organize_by == "first_dir":
+            for subdir in subdirs:
+                with os.scandir(subdir) as entries:
+                    for entry in entries:
+                        if is_temp_name(entry.name):
+                            if not self._dry_run:
+                                remove_path(entry.path)
+                            continue
+                        existing[Path(entry.path)] = entry.is_dir(follow_symlinks=False)
+        return existing
+
+    def _is_taken(self, dest_path: Path) -> bool:
+        """目标路径是否已被占用（本次已分配，或不覆盖时已存在于输出目录）"""
+        if dest_path in self._planned:
+            return True
+        return (
+            not self.overwrite
+            and self._sync_mode is None
+            and dest_path in self._existing
         )
 
-        return result
+    def _note_plan(
+        self, target_path: Path, dest_path: Optional[Path], action: str
+    ) -> None:
+        """预演模式下记录一条计划"""
+        if self._dry_run:
+            self._plan.append(
+                {"source": target_path, "destination": dest_path, "action": action}
+            )
+
+    def _link_duplicates(self, copied_dests: set, counts: dict) -> None:
+        """将内容重复的文件硬链接（不支持时复制）到原件的输出"""
+        sources = {}
+        jobs = []
+        for target_path, dest_path, primary_dest in self._deferred_links:
+            if primary_dest in copied_dests:
+                sources[dest_path] = target_path
+                jobs.append((primary_dest, dest_path))
+            else:
+                self.logger.error(f"原件提取失败，未创建重复文件: {target_path}")
+                counts["error"] += 1
+
+        def on_done(primary_dest: Path, dest_path: Path, error, checksums) -> None:
+            target_path = sources[dest_path]
+            if error is not None:
+                self.logger.error(f"链接失败 {target_path}: {error}")
+                counts["error"] += 1
+            else:
+                self.logger.info(
+                    f"已链接: {target_path.relative_to(self.input_dir)} -> {primary_dest.name}"
+                )
+                counts["success"] += 1
+                if self._checksums is not None:
+                    self._checksums.write(checksums)
+                self._record_done(target_path, dest_path)
+
+        CopyEngine(
+            max_workers=self.max_workers, link_mode="hardlink", checksum=self.checksum
+        ).run(jobs, on_done)
+
+    def _compare_for_sync(
+        self, src_path: Path, src_stat: os.stat_result, dest_path: Path
+    ) -> Tuple[bool, Optional[str]]:
+        """
+        比较源文件与已存在的目标文件
+
+        源文件与上次同步时记录的大小、修改时间一致，且目标文件大小相同、修改时间
+        在容差内时，直接认为未变化；否则 quick 模式要求修改时间完全一致，
+        checksum 模式比较内容哈希（清单中与文件状态一致的哈希直接复用）。
+
+        Returns:
+            (是否未变化, 源文件内容哈希，未计算时为 None)
+        """
+        dest_stat = dest_path.stat()
+        entry = self._previous_manifest.get(dest_path)
+
+        def matches_entry(st: os.stat_result) -> bool:
+            return bool(entry) and entry[0] == st.st_size and entry[1] == st.st_mtime_ns
+
+        src_digest = entry[2] if matches_entry(src_stat) else None
+        if src_stat.st_size != dest_stat.st_size:
+            return False, src_digest
+
+        mtime_diff = abs(src_stat.st_mtime_ns - dest_stat.st_mtime_ns)
+        if matches_entry(src_stat) and mtime_diff <= _MTIME_WINDOW_NS:
+            return True, src_digest
+
+        # 压缩包成员无法直接计算哈希，按 quick 模式比较
+        if self._sync_mode == "quick" or isinstance(src_path, ArchiveMemberPath):
+            return mtime_diff == 0, src_digest
+
+        if src_digest is None:
+            src_digest = hash_file(src_path)
+        dest_digest = entry[2] if matches_entry(dest_stat) else None
+        if src_digest != (dest_digest or hash_file(dest_path)):
+            return False, src_digest
+
+        # 内容相同但修改时间不同（如被 touch 过）：同步时间，下次可直接命中清单
+        if mtime_diff and not self._dry_run:
+            shutil.copystat(src_path, dest_path)
+        return True, src_digest
 
     def _get_destination_path(self, file_path: Path) -> Path:
         """
@@ -289,19 +904,109 @@ class FileExtractor:
             return "files"
         return self.extract_target
 
+    def _normalize_link_mode(self) -> str:
+        """规范化输出方式"""
+        if self._archive_format is not None:
+            return "copy"
+        if self.link_mode not in LINK_MODES:
+            self.logger.warning(f"未知的输出方式: {self.link_mode}, 默认使用 copy")
+            return "copy"
+        return self.link_mode
+
+    def _normalize_sync_mode(self) -> Optional[str]:
+        """规范化同步模式"""
+        if self._archive_format is not None:
+            return None
+        if self.sync_mode is not None and self.sync_mode not in SYNC_MODES:
+            self.logger.warning(f"未知的同步模式: {self.sync_mode}, 不使用同步")
+            return None
+        return self.sync_mode
+
+    def _normalize_dedup_mode(self, extract_target: str) -> Optional[str]:
+        """规范化内容去重模式（提取文件夹时不去重）"""
+        if self.dedup_mode is None:
+            return None
+        if self.dedup_mode not in DEDUP_MODES:
+            self.logger.warning(f"未知的去重模式: {self.dedup_mode}, 不使用去重")
+            return None
+        if extract_target != "files":
+            self.logger.warning("提取文件夹时不支持内容去重")
+            return None
+        if self._archive_format is not None and self.dedup_mode == "link":
+            return None
+        return self.dedup_mode
+
+    def _normalize_archive_format(self) -> Optional[str]:
+        """规范化压缩包输出格式"""
+        if self.archive_format is not None and self.archive_format not in ARCHIVE_FORMATS:
+            self.logger.warning(f"未知的压缩包格式: {self.archive_format}, 输出到目录")
+            return None
+        return self.archive_format
+
+    def _normalize_archive_compression(self) -> str:
+        """规范化压缩方式"""
+        if self.archive_compression not in ARCHIVE_COMPRESSIONS:
+            self.logger.warning(
+                f"未知的压缩方式: {self.archive_compression}, 默认使用 deflate"
+            )
+            return "deflate"
+        return self.archive_compression
+
+    def _get_archive_path(self, archive_format: str, compression: str) -> Path:
+        """输出压缩包的路径：输出目录加上压缩包扩展名"""
+        suffix = archive_suffix(archive_format, compression)
+        if self.output_dir.name.lower().endswith(suffix):
+            return self.output_dir
+        return self.output_dir.with_name(self.output_dir.name + suffix)
+
+    def _warn_unsupported_for_archive(self) -> None:
+        """输出为压缩包时提示不生效的选项"""
+        unsupported = {
+            "链接方式": self.link_mode != "copy",
+            "同步模式": self.sync_mode is not None,
+            "断点续传": self.resume,
+            "重复内容硬链接": self.dedup_mode == "link",
+            "校验和清单": self.checksum is not None,
+        }
+        for name, enabled in unsupported.items():
+            if enabled:
+                self.logger.warning(f"输出为压缩包时不支持{name}，已忽略")
+
+    def _should_scan_archives(self, extract_target: str) -> bool:
+        """是否读取压缩包（提取文件夹时不读取）"""
+        if not self.scan_archives:
+            return False
+        if extract_target != "files":
+            self.logger.warning("提取文件夹时不支持读取压缩包")
+            return False
+        return True
+
+    @staticmethod
+    def _normalize_suffixes(extensions: Optional[List[str]]) -> Optional[tuple]:
+        """扩展名列表转为用于 endswith 比较的元组，None 或空列表表示不限制"""
+        if not extensions:
+            return None
+        return tuple(
+            os.path.normcase(ext if ext.startswith(".") else "." + ext)
+            for ext in extensions
+        )
+
     def _get_extract_target_name(self, extract_target: str) -> str:
         """获取提取目标的名称"""
         if extract_target == "dirs":
             return "文件夹"
         return "文件"
 
-    def _is_within_output_dir(self, path: Path) -> bool:
-        """判断路径是否位于输出目录内"""
-        try:
-            path.relative_to(self.output_dir)
-            return True
-        except ValueError:
-            return False
+    @staticmethod
+    def _is_same_or_inside(target_path: Path, dest_path: Path) -> bool:
+        """
+        删除 dest_path 是否会删掉源本身：两者是同一路径，或源位于 dest_path 目录中
+
+        dest_path 只解析其所在目录，自身是指向源的链接时删除它并不影响源
+        """
+        source = os.path.realpath(target_path)
+        dest = os.path.join(os.path.realpath(dest_path.parent), dest_path.name)
+        return source == dest or source.startswith(dest + os.sep)
 
     def _apply_naming_mode(self, dest_path: Path, file_path: Path) -> Path:
         """
@@ -353,6 +1058,11 @@ class FileExtractor:
         sequence = self.file_counters[counter_key]
 
         new_name = f"{base_name}_{sequence}{extension}"
+        while self._is_taken(parent / new_name):
+            # 跳过输出目录中已有或本次已分配的序号
+            self.file_counters[counter_key] += 1
+            sequence = self.file_counters[counter_key]
+            new_name = f"{base_name}_{sequence}{extension}"
         return parent / new_name
 
     def _add_timestamp(self, dest_path: Path) -> Path:
@@ -0,0 +1,332 @@
+"""
+提取清单与断点日志
+
+- ExtractManifest：记录每个已提取文件对应源文件的大小、修改时间（纳秒）与内容哈希，
+  保存在输出目录中，供下一次提取判断文件是否变化（增量同步）
+- ExtractJournal：提取过程中追加记录已完成的复制，中断后再次提取时据此跳过已完成的部分
+- ChecksumManifest：已提取文件的校验和清单，格式与 sha256sum / b2sum 相同
+"""
+
+from __future__ import annotations
+
+import gzip
+import json
+import os
+import time
+from logging import Logger, getLogger
+from pathlib import Path
+from typing import Callable, Dict, List, Mapping, Optional, Tuple
+
+# 清单文件名（位于输出目录根目录）
+MANIFEST_NAME = ".extract_manifest.json.gz"
+
+# 断点日志文件名（位于输出目录根目录）
+JOURNAL_NAME = ".extract_journal.jsonl"
+
+# 校验和清单文件名前缀（后接 ".<算法>"，位于输出目录根目录）
+CHECKSUMS_NAME = ".extract_checksums"
+
+# 清单格式版本，格式变化时递增以使旧清单失效
+MANIFEST_FORMAT_VERSION = 1
+
+
+class ExtractManifest:
+    """
+    提取清单。
+
+    条目以目标文件相对输出目录的路径为键，值为 [大小, 修改时间纳秒, 哈希或 None]，
+    描述"具有该大小与修改时间的内容"，源文件和目标文件都可以与之比较。
+    清单以 gzip 压缩的 JSON 存储，保存时先写临时文件再重命名。
+    """
+
+    def __init__(self, output_dir: Path, logger: Optional[Logger] = None):
+        """
+        Args:
+            output_dir: 输出目录
+            logger: 日志记录器
+        """
+        self.output_dir = output_dir
+        self.path = output_dir / MANIFEST_NAME
+        self.logger = logger or getLogger(__name__)
+        self.entries: Dict[str, List] = {}
+
+    def load(self) -> "ExtractManifest":
+        """读取清单，不存在或损坏时为空"""
+        if not self.path.exists():
+            return self
+        try:
+            with gzip.open(self.path, "rt", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == MANIFEST_FORMAT_VERSION:
+                self.entries = data["entries"]
+        except (OSError, ValueError, KeyError) as e:
+            self.logger.warning(f"读取提取清单失败 {self.path}: {e}")
+        return self
+
+    def save(self) -> None:
+        """写入清单"""
+        tmp_file = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        try:
+            with gzip.open(tmp_file, "wt", encoding="utf-8", compresslevel=6) as f:
+                json.dump(
+                    {"version": MANIFEST_FORMAT_VERSION, "entries": self.entries},
+                    f,
+                    ensure_ascii=False,
+                    separators=(",", ":"),
+                )
+            os.replace(tmp_file, self.path)
+        except (OSError, TypeError, ValueError) as e:
+            self.logger.warning(f"写入提取清单失败 {self.path}: {e}")
+            tmp_file.unlink(missing_ok=True)
+
+    def key(self, dest_path: Path) -> str:
+        return dest_path.relative_to(self.output_dir).as_posix()
+
+    def get(self, dest_path: Path) -> Optional[List]:
+        return self.entries.get(self.key(dest_path))
+
+    def set(
+        self, dest_path: Path, st: os.stat_result, digest: Optional[str] = None
+    ) -> None:
+        self.entries[self.key(dest_path)] = [st.st_size, st.st_mtime_ns, digest]
+
+
+class ExtractJournal:
+    """
+    断点日志。
+
+    每行一个 JSON 对象：第一行记录输入目录，之后每行是一次已完成的复制
+    {"s": 源相对路径, "d": 目标相对路径, "n": 大小或 None（目录）}。
+    只追加写入，每 fsync_every 条或每 fsync_interval 秒执行一次 fsync，
+    崩溃时最多丢失最后一批记录（这些文件会被重新复制）；
+    末尾不完整的行在读取时忽略。
+    """
+
+    def __init__(
+        self,
+        input_dir: Path,
+        output_dir: Path,
+        fsync_every: int = 256,
+        fsync_interval: float = 2.0,
+        logger: Optional[Logger] = None,
+    ):
+        """
+        Args:
+            input_dir: 输入目录，日志只对同一输入目录有效
+            output_dir: 输出目录
+            fsync_every: 每多少条记录 fsync 一次
+            fsync_interval: 距上次 fsync 超过该秒数时 fsync
+            logger: 日志记录器
+        """
+        self.input_dir = input_dir
+        self.output_dir = output_dir
+        self.path = output_dir / JOURNAL_NAME
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self.logger = logger or getLogger(__name__)
+
+        self._file = None
+        self._unsynced = 0
+        self._last_sync = 0.0
+        # fsync 日志之前调用（如刷写校验和清单），保证日志中的完成记录不早于相关数据落盘
+        self.before_sync: Optional[Callable[[], None]] = None
+
+    def load(self) -> Dict[str, Tuple[str, Optional[int]]]:
+        """
+        读取已完成的复制
+
+        Returns:
+            {源相对路径: (目标相对路径, 大小)}；日志不存在或属于其他输入目录时为空
+        """
+        done: Dict[str, Tuple[str, Optional[int]]] = {}
+        if not self.path.exists():
+            return done
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                lines = iter(f)
+                header = json.loads(next(lines, "{}"))
+                if header.get("input") != str(self.input_dir):
+                    self.logger.info("断点日志属于其他输入目录，忽略")
+                    return done
+                for line in lines:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # 崩溃时未写完的行
+                        continue
+                    done[record["s"]] = (record["d"], record["n"])
+        except (OSError, ValueError, KeyError) as e:
+            self.logger.warning(f"读取断点日志失败 {self.path}: {e}")
+            return {}
+        return done
+
+    def open(self, resume: bool) -> None:
+        """
+        打开日志准备追加
+
+        Args:
+            resume: 是否在已有日志之后继续追加，否则重新开始
+        """
+        if resume and self.path.exists():
+            with open(self.path, "rb") as f:
+                complete = True
+                if f.seek(0, os.SEEK_END) > 0:
+                    f.seek(-1, os.SEEK_END)
+                    complete = f.read(1) == b"\n"
+            self._file = open(self.path, "a", encoding="utf-8")
+            if not complete:
+                # 结束上次崩溃时未写完的行，避免与新记录连在一起
+                self._file.write("\n")
+        else:
+            self._file = open(self.path, "w", encoding="utf-8")
+            self._write({"input": str(self.input_dir)})
+            self.sync()
+
+    def record(self, src_path: Path, dest_path: Path, size: Optional[int]) -> None:
+        """记录一次已完成的复制"""
+        self._write(
+            {
+                "s": src_path.relative_to(self.input_dir).as_posix(),
+                "d": dest_path.relative_to(self.output_dir).as_posix(),
+                "n": size,
+            }
+        )
+        self._unsynced += 1
+        if (
+            self._unsynced >= self.fsync_every
+            or time.monotonic() - self._last_sync >= self.fsync_interval
+        ):
+            self.sync()
+
+    def sync(self) -> None:
+        """将已写入的记录刷到磁盘"""
+        if self._file is None:
+            return
+        if self.before_sync is not None:
+            self.before_sync()
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def close(self, remove: bool = False) -> None:
+        """
+        关闭日志
+
+        Args:
+            remove: 是否删除日志（全部完成、无需恢复时）
+        """
+        if self._file is not None:
+            self.sync()
+            self._file.close()
+            self._file = None
+        if remove:
+            self.path.unlink(missing_ok=True)
+
+    def _write(self, record: dict) -> None:
+        self._file.write(
+            json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n"
+        )
+
+
+class ChecksumManifest:
+    """
+    校验和清单。
+
+    每行 "<十六进制校验和>  <相对输出目录的路径>"，与 sha256sum / b2sum 的输出格式相同，
+    可在输出目录中直接用 `sha256sum -c .extract_checksums.sha256` 核对。
+
+    提取过程中只追加写入（同一文件的新记录覆盖旧记录），已有的记录不会被清空，
+    本次跳过的文件仍保留上次的校验和；close() 时去掉重复与已不存在的文件，
+    写入临时文件后重命名。
+    """
+
+    def __init__(self, output_dir: Path, algorithm: str):
+        """
+        Args:
+            output_dir: 输出目录
+            algorithm: 校验和算法名称
+        """
+        self.output_dir = output_dir
+        self.algorithm = algorithm
+        self.path = output_dir / f"{CHECKSUMS_NAME}.{algorithm}"
+        self._file = None
+        # {相对路径: 校验和}，包括已有的与本次写入的记录
+        self._entries: Dict[str, str] = {}
+
+    def open(self) -> None:
+        """读取已有的记录，打开清单准备追加"""
+        self._entries = self._load()
+        if self.path.exists():
+            with open(self.path, "rb") as f:
+                complete = True
+                if f.seek(0, os.SEEK_END) > 0:
+                    f.seek(-1, os.SEEK_END)
+                    complete = f.read(1) == b"\n"
+        else:
+            complete = True
+        self._file = open(self.path, "a", encoding="utf-8", newline="\n")
+        if not complete:
+            # 结束上次崩溃时未写完的行，避免与新记录连在一起
+            self._file.write("\n")
+
+    def write(self, checksums: Mapping[Path, str]) -> None:
+        """追加 {目标文件路径: 校验和}"""
+        for path, digest in checksums.items():
+            relative = path.relative_to(self.output_dir).as_posix()
+            self._entries[relative] = digest
+            self._file.write(f"{digest}  {relative}\n")
+
+    def sync(self) -> None:
+        """将已写入的记录刷到磁盘（在断点日志 fsync 之前调用，日志记为完成的文件
+        一定有校验和）"""
+        if self._file is None:
+            return
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self, compact: bool = True) -> None:
+        """
+        关闭清单
+
+        Args:
+            compact: 是否重写清单，去掉重复的记录与已不存在的文件
+        """
+        if self._file is None:
+            return
+        self.sync()
+        self._file.close()
+        self._file = None
+        if not compact:
+            return
+
+        tmp_file = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        try:
+            with open(tmp_file, "w", encoding="utf-8", newline="\n") as f:
+                for relative, digest in sorted(self._entries.items()):
+                    if os.path.lexists(self.output_dir / relative):
+                        f.write(f"{digest}  {relative}\n")
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_file, self.path)
+        except OSError:
+            tmp_file.unlink(missing_ok=True)
+            raise
+
+    def _load(self) -> Dict[str, str]:
+        """读取已有的记录，忽略格式不对或未写完的行"""
+        entries: Dict[str, str] = {}
+        try:
+            with open(self.path, encoding="utf-8", newline="\n") as f:
+                for line in f:
+                    if not line.endswith("\n"):
+                        # 崩溃时未写完的行
+                        continue
+                    digest, sep, relative = line[:-1].partition("  ")
+                    if sep and digest and relative:
+                        entries[relative] = digest
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError):
+            return {}
+        return entries
@@ -0,0 +1,573 @@
+"""
+暂存删除
+
+文件/目录先通过同一文件系统内的 rename 移入暂存目录（与被删文件的数量和
+大小无关，瞬间完成），之后由后台线程按保留时间与总大小上限清理；清理之前可以恢复。
+
+暂存目录只有当前用户可以访问（0o700），依次尝试：搜索的根目录、用户主目录、
+所在文件系统的挂载点（目录名带用户 ID）、文件所在目录，使用第一个与文件在同一
+文件系统上的位置。用过的暂存目录记录在 ~/.tools4linn/staging_dirs.json 中，
+程序重新启动后仍能找到并清理之前暂存的文件。
+
+暂存目录结构：
+    <暂存目录>/<批次>/<序号>         被移入的文件或目录
+    <暂存目录>/<批次>/origins.jsonl  每行 {"n": 序号, "p": 原路径, "s": 大小或 None}
+批次名以纳秒时间戳开头，按名称排序即按时间排序。写入过程中 origins 文件名带
+.writing 后缀，完成并落盘后才改为正式名称；其他进程据此跳过正在写入的批次。
+"""
+
+from __future__ import annotations
+
+import errno
+import json
+import logging
+import os
+import secrets
+import shutil
+import stat
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+# 暂存目录名（挂载点下的暂存目录名后面加上用户 ID）
+STAGING_DIR_NAME = ".tools4linn-staging"
+
+# 默认保留时间（秒），超过后清理
+DEFAULT_MAX_AGE = 3600.0
+
+# 默认暂存总大小上限（字节），超过时从最早的批次开始清理
+DEFAULT_MAX_BYTES = 1024 * 1024 * 1024
+
+# 后台线程在没有新批次时的检查间隔（秒）
+_PURGE_INTERVAL = 60.0
+
+_ORIGINS_NAME = "origins.jsonl"
+
+# 写入中的 origins 文件后缀
+_WRITING_SUFFIX = ".writing"
+
+# 未写完的批次在最后一次写入后的这段时间内不清理（秒），
+# 超过后视为写入进程已退出，按普通批次处理
+_WRITE_GRACE = 60.0
+
+
+def is_staging_name(name: str) -> bool:
+    """是否为暂存目录名"""
+    return name.startswith(STAGING_DIR_NAME)
+
+
+def default_registry_path() -> Path:
+    """记录用过的暂存目录的文件"""
+    return Path.home() / ".tools4linn" / "staging_dirs.json"
+
+
+def _private_dir(path: str) -> str:
+    """
+    创建（或检查已有的）只有当前用户可以访问的目录
+
+    Raises:
+        OSError: 无法创建，或已存在的路径不是当前用户的目录
+    """
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    st = os.lstat(path)
+    if not stat.S_ISDIR(st.st_mode):
+        raise NotADirectoryError(errno.ENOTDIR, "暂存路径不是目录", path)
+    if hasattr(os, "getuid") and st.st_uid != os.getuid():
+        raise PermissionError(errno.EPERM, "暂存目录属于其他用户", path)
+    if st.st_mode & 0o077:
+        os.chmod(path, 0o700)
+    return path
+
+
+def _mount_point(path: str, dev: int) -> str:
+    """path 所在文件系统的挂载点（向上查找设备号相同的最上层目录）"""
+    path = os.path.abspath(path)
+    while True:
+        parent = os.path.dirname(path)
+        if parent == path:
+            return path
+        try:
+            if os.stat(parent).st_dev != dev:
+                return path
+        except OSError:
+            return path
+        path = parent
+
+
+def _tree_size(path: str) -> int:
+    """目录树中文件的总大小（不跟随符号链接）"""
+    total = 0
+    for dirpath, _, filenames in os.walk(path):
+        for name in filenames:
+            try:
+                total += os.lstat(os.path.join(dirpath, name)).st_size
+            except OSError:
+                continue
+    return total
+
+
+def _fsync_dir(path: str) -> None:
+    """fsync 目录，使其中的新建与改名落盘（平台不支持时忽略）"""
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+class _Batch:
+    """一次 stage() 在某个暂存目录中创建的批次"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.count = 0
+        self._next = 0
+        self._writing = os.path.join(path, _ORIGINS_NAME + _WRITING_SUFFIX)
+        os.mkdir(path)
+        try:
+            self._origins = open(self._writing, "w", encoding="utf-8")
+        except OSError:
+            os.rmdir(path)
+            raise
+
+    def add(self, path: str, size: Optional[int]) -> None:
+        """
+        记录原路径后将 path 改名到批次中
+
+        先写记录再改名，中途崩溃时批次中的每个文件都能找到原路径；
+        改名失败时留下的记录没有对应的文件，恢复与统计时忽略
+        """
+        name = str(self._next)
+        self._next += 1
+        self._origins.write(
+            json.dumps({"n": name, "p": path, "s": size}, ensure_ascii=False) + "\n"
+        )
+        self._origins.flush()
+        os.rename(path, os.path.join(self.path, name))
+        self.count += 1
+
+    def close(self) -> None:
+        """将记录与改名落盘，origins 文件改为正式名称"""
+        try:
+            self._origins.flush()
+            os.fsync(self._origins.fileno())
+        finally:
+            self._origins.close()
+        os.replace(self._writing, os.path.join(self.path, _ORIGINS_NAME))
+        _fsync_dir(self.path)
+
+
+class StagingArea:
+    """
+    暂存区
+
+    stage() 只做 rename，立即返回；后台线程清理超过 max_age 的批次，
+    总大小超过 max_bytes 时从最早的批次开始提前清理。
+    """
+
+    def __init__(
+        self,
+        max_age: float = DEFAULT_MAX_AGE,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        logger: Optional[logging.Logger] = None,
+        registry: Optional[Path | str] = None,
+    ):
+        """
+        Args:
+            max_age: 保留时间（秒），0 表示尽快清理
+            max_bytes: 暂存总大小上限（字节）
+            logger: 日志记录器
+            registry: 记录用过的暂存目录的文件，None 表示 default_registry_path()
+        """
+        self.max_age = max_age
+        self.max_bytes = max_bytes
+        self.logger = logger or logging.getLogger(__name__)
+        self.registry = Path(registry) if registry is not None else default_registry_path()
+
+        # {设备号: 暂存目录}，以及所有用过的暂存目录
+        self._dirs: Dict[int, str] = {}
+        self._known: Set[str] = set()
+        # 正在写入的批次，清理时跳过
+        self._active: Set[str] = set()
+        self._sizes: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._load_registry()
+
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def stage(
+        self,
+        paths: Iterable[os.PathLike | str],
+        root_dir: Optional[str] = None,
+        progress_callback: Optional[Callable[[int, int], None]] = None,
+    ) -> Tuple[int, List[str]]:
+        """
+        将文件或目录移入暂存区
+
+        Args:
+            paths: 要删除的文件或目录
+            root_dir: 搜索的根目录；与文件在同一文件系统上时，暂存目录建在这里
+            progress_callback: 进度回调函数 (current, total)
+
+        Returns:
+            (成功移入的数量, 错误信息列表)
+        """
+        paths = [os.path.abspath(path) for path in paths]
+        total = len(paths)
+        staged = 0
+        errors = []
+        batches: Dict[str, _Batch] = {}
+
+        try:
+            for idx, path in enumerate(paths):
+                try:
+                    st = os.lstat(path)
+                    size = None if stat.S_ISDIR(st.st_mode) else st.st_size
+                    staging_dir = self._staging_dir(path, st.st_dev, root_dir)
+                    try:
+                        self._batch(staging_dir, batches).add(path, size)
+                    except OSError as e:
+                        # 同一设备的不同挂载（如 bind mount）之间也不能 rename，
+                        # 改用文件所在目录中的暂存目录
+                        if e.errno != errno.EXDEV:
+                            raise
+                        staging_dir = self._local_staging_dir(path)
+                        self._batch(staging_dir, batches).add(path, size)
+                    staged += 1
+                except OSError as e:
+                    error_msg = f"移入暂存区失败 {path}: {str(e)}"
+                    errors.append(error_msg)
+                    self.logger.error(error_msg)
+
+                if progress_callback:
+                    progress_callback(idx + 1, total)
+        finally:
+            for batch in batches.values():
+                try:
+                    batch.close()
+                except OSError as e:
+                    error_msg = f"写入暂存记录失败 {batch.path}: {str(e)}"
+                    errors.append(error_msg)
+                    self.logger.error(error_msg)
+                finally:
+                    with self._lock:
+                        self._active.discard(batch.path)
+
+        for batch in batches.values():
+            self.logger.info(f"已移入暂存区 {batch.count} 个: {batch.path}")
+        self.start()
+        self._wake.set()
+        return staged, errors
+
+    def _batch(self, staging_dir: str, batches: Dict[str, "_Batch"]) -> "_Batch":
+        """本次 stage() 在 staging_dir 中的批次，首次使用时创建"""
+        batch = batches.get(staging_dir)
+        if batch is None:
+            path = os.path.join(staging_dir, f"{time.time_ns()}-{secrets.token_hex(4)}")
+            with self._lock:
+                # 先登记再创建，后台清理不会看到未写完的批次
+                self._active.add(path)
+            try:
+                batch = batches[staging_dir] = _Batch(path)
+            except BaseException:
+                with self._lock:
+                    self._active.discard(path)
+                raise
+        return batch
+
+    def _staging_dir(self, path: str, dev: int, root_dir: Optional[str]) -> str:
+        """
+        path 所在文件系统的暂存目录：依次尝试根目录、用户主目录、挂载点，
+        都不在同一文件系统上或无法使用时用文件所在目录
+        """
+        staging_dir = self._dirs.get(dev)
+        if staging_dir is not None:
+            return staging_dir
+
+        candidates = []
+        for base in (root_dir, str(Path.home())):
+            if base is None:
+                continue
+            try:
+                if os.stat(base).st_dev == dev:
+                    candidates.append(os.path.join(os.path.abspath(base), STAGING_DIR_NAME))
+            except OSError:
+                continue
+        # 挂载点可能由多个用户共用，每个用户使用自己的暂存目录
+        user_suffix = f"-{os.getuid()}" if hasattr(os, "getuid") else ""
+        candidates.append(
+            os.path.join(_mount_point(path, dev), STAGING_DIR_NAME + user_suffix)
+        )
+        for staging_dir in candidates:
+            try:
+                _private_dir(staging_dir)
+            except OSError:
+                continue
+            with self._lock:
+                self._dirs[dev] = staging_dir
+            self._register(staging_dir)
+            return staging_dir
+
+        return self._local_staging_dir(path)
+
+    def _local_staging_dir(self, path: str) -> str:
+        """
+        文件所在目录中的暂存目录
+
+        能删除文件就一定能在其所在目录中创建条目；不按设备缓存，其他目录各自判断
+        """
+        staging_dir = _private_dir(
+            os.path.join(os.path.dirname(path), STAGING_DIR_NAME)
+        )
+        self._register(staging_dir)
+        return staging_dir
+
+    def _load_registry(self) -> None:
+        """读取记录的暂存目录（包括其他实例或上次运行用过的）"""
+        try:
+            with open(self.registry, encoding="utf-8") as f:
+                staging_dirs = json.load(f)
+        except (OSError, ValueError):
+            return
+        if not isinstance(staging_dirs, list):
+            return
+        with self._lock:
+            self._known.update(d for d in staging_dirs if isinstance(d, str))
+
+    def _register(self, staging_dir: str) -> None:
+        """记录新用到的暂存目录"""
+        with self._lock:
+            if staging_dir in self._known:
+                return
+            self._known.add(staging_dir)
+        self._save_registry()
+
+    def _save_registry(self, removed: Iterable[str] = ()) -> None:
+        """与文件中的记录合并、去掉 removed 后写回（先写临时文件再重命名）"""
+        self._load_registry()
+        with self._lock:
+            self._known.difference_update(removed)
+            staging_dirs = sorted(self._known)
+        tmp = self.registry.with_name(f"{self.registry.name}.{os.getpid()}.tmp")
+        try:
+            self.registry.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(staging_dirs, f, ensure_ascii=False, indent=2)
+            os.replace(tmp, self.registry)
+        except OSError as e:
+            self.logger.warning(f"记录暂存目录失败 {self.registry}: {e}")
+
+    def batches(self) -> List[dict]:
+        """
+        暂存区中的批次，从早到晚排列
+
+        Returns:
+            [{"path": 批次目录, "created": 创建时间（秒）, "origins": [原路径, ...]}]
+        """
+        result = []
+        for batch_dir in self._list_batches():
+            result.append(
+                {
+                    "path": batch_dir,
+                    "created": self._created(batch_dir),
+                    "origins": [record["p"] for record in self._read_origins(batch_dir)],
+                }
+            )
+        result.sort(key=lambda batch: batch["created"])
+        return result
+
+    def restore(self, batch_dir: str) -> Tuple[int, List[str]]:
+        """
+        将一个批次中的文件移回原位置（原位置已存在时保留在暂存区）
+
+        Returns:
+            (恢复的数量, 错误信息列表)
+        """
+        restored = 0
+        errors = []
+        with self._lock:
+            # 防止恢复过程中被清理
+            self._active.add(batch_dir)
+        try:
+            for record in self._read_origins(batch_dir):
+                staged = os.path.join(batch_dir, str(record["n"]))
+                original = record["p"]
+                if not os.path.lexists(staged):
+                    continue
+                if os.path.lexists(original):
+                    errors.append(f"原位置已存在，未恢复: {original}")
+                    continue
+                try:
+                    os.makedirs(os.path.dirname(original), exist_ok=True)
+                    os.rename(staged, original)
+                    restored += 1
+                except OSError as e:
+                    errors.append(f"恢复失败 {original}: {str(e)}")
+            if not errors:
+                shutil.rmtree(batch_dir, ignore_errors=True)
+                self._sizes.pop(batch_dir, None)
+        finally:
+            with self._lock:
+                self._active.discard(batch_dir)
+        self.logger.info(f"已从暂存区恢复 {restored} 个: {batch_dir}")
+        return restored, errors
+
+    def purge(self, everything: bool = False) -> int:
+        """
+        清理暂存区：超过保留时间的批次，以及超出总大小上限的最早批次
+
+        Args:
+            everything: 清理所有批次（忽略保留时间与大小上限）
+
+        Returns:
+            清理的批次数
+        """
+        now = time.time()
+        batches = sorted(self._list_batches(), key=self._created)
+        to_purge = []
+        kept = []
+        for batch_dir in batches:
+            if everything or now - self._created(batch_dir) >= self.max_age:
+                to_purge.append(batch_dir)
+            else:
+                kept.append(batch_dir)
+
+        total = sum(self._batch_size(batch_dir) for batch_dir in kept)
+        for batch_dir in kept:
+            if total <= self.max_bytes:
+                break
+            to_purge.append(batch_dir)
+            total -= self._batch_size(batch_dir)
+
+        for batch_dir in to_purge:
+            shutil.rmtree(batch_dir, ignore_errors=True)
+            self._sizes.pop(batch_dir, None)
+            self.logger.debug(f"已清理暂存批次: {batch_dir}")
+        if to_purge:
+            self.logger.info(f"已清理暂存区 {len(to_purge)} 个批次")
+        return len(to_purge)
+
+    def start(self) -> None:
+        """启动后台清理线程（已启动时忽略）"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="staging-purge", daemon=True
+        )
+        self._thread.start()
+
+    def close(self) -> None:
+        """停止后台清理线程（暂存的文件保留，下次启动后继续清理）"""
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.purge()
+            except Exception as e:
+                self.logger.error(f"清理暂存区失败: {e}")
+            # 有新批次时立即再检查，否则定期检查是否有批次到期
+            timeout = min(_PURGE_INTERVAL, max(self.max_age, 0.1))
+            self._wake.wait(timeout)
+            self._wake.clear()
+
+    def _list_batches(self) -> List[str]:
+        """
+        所有已知暂存目录中可以清理的批次（已不存在的暂存目录从记录中删除）
+
+        跳过本实例正在使用的批次，以及其他进程可能正在写入的批次（见 _is_writing）
+        """
+        self._load_registry()
+        with self._lock:
+            staging_dirs = list(self._known)
+            active = set(self._active)
+        batches = []
+        missing = []
+        for staging_dir in staging_dirs:
+            try:
+                with os.scandir(staging_dir) as entries:
+                    for entry in entries:
+                        if (
+                            entry.is_dir(follow_symlinks=False)
+                            and entry.path not in active
+                            and not self._is_writing(entry.path)
+                        ):
+                            batches.append(entry.path)
+            except FileNotFoundError:
+                missing.append(staging_dir)
+            except OSError:
+                continue
+        if missing:
+            self._save_registry(removed=missing)
+        return batches
+
+    @staticmethod
+    def _created(batch_dir: str) -> float:
+        """批次的创建时间（秒），来自批次名开头的纳秒时间戳"""
+        try:
+            return int(os.path.basename(batch_dir).split("-", 1)[0]) / 1e9
+        except ValueError:
+            return 0.0
+
+    @classmethod
+    def _is_writing(cls, batch_dir: str) -> bool:
+        """批次的 origins 文件尚未完成，且创建或最后一次写入在 _WRITE_GRACE 之内"""
+        if os.path.exists(os.path.join(batch_dir, _ORIGINS_NAME)):
+            return False
+        last_write = cls._created(batch_dir)
+        try:
+            last_write = max(
+                last_write,
+                os.stat(os.path.join(batch_dir, _ORIGINS_NAME + _WRITING_SUFFIX)).st_mtime,
+            )
+        except OSError:
+            pass
+        return time.time() - last_write < _WRITE_GRACE
+
+    @staticmethod
+    def _read_origins(batch_dir: str) -> List[dict]:
+        """读取批次的原路径记录；写入进程崩溃时读取未完成的文件，忽略末尾未写完的行"""
+        records = []
+        for name in (_ORIGINS_NAME, _ORIGINS_NAME + _WRITING_SUFFIX):
+            try:
+                with open(os.path.join(batch_dir, name), encoding="utf-8") as f:
+                    for line in f:
+                        if not line.endswith("\n"):
+                            continue
+                        try:
+                            records.append(json.loads(line))
+                        except ValueError:
+                            continue
+            except FileNotFoundError:
+                continue
+            except OSError:
+                pass
+            break
+        return records
+
+    def _batch_size(self, batch_dir: str) -> int:
+        """批次的总大小，目录按需遍历计算，结果缓存"""
+        size = self._sizes.get(batch_dir)
+        if size is None:
+            size = 0
+            for record in self._read_origins(batch_dir):
+                staged = os.path.join(batch_dir, str(record["n"]))
+                if record.get("s") is None:
+                    size += _tree_size(staged)
+                elif os.path.lexists(staged):
+                    size += record["s"]
+            self._sizes[batch_dir] = size
+        return size
@@ -1,5 +1,6 @@
 from .name_generator import NameGenerator
 from .name_anonymizer import anonymize_name, anonymize_names
+from .hashing import hash_file
 from .naming import (
     NamingStrategy,
     FileNameStrategy,
@@ -17,6 +18,7 @@ __all__ = [
     "NameGenerator",
     "anonymize_name",
     "anonymize_names",
+    "hash_file",
     "NamingStrategy",
     "FileNameStrategy",
     "DirectoryNameStrategy",
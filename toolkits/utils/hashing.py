@@ -0,0 +1,28 @@
+"""
+文件内容哈希
+
+解析缓存与提取清单共用，哈希值会写入磁盘上的缓存键与清单，修改算法会使已有记录失效。
+"""
+
+from __future__ import annotations
+
+import hashlib
+from pathlib import Path
+
+
+def hash_file(file_path: Path | str, chunk_size: int = 1024 * 1024) -> str:
+    """
+    计算文件内容哈希（blake2b，20 字节）
+
+    Args:
+        file_path: 文件路径
+        chunk_size: 每次读取的字节数
+
+    Returns:
+        十六进制哈希字符串
+    """
+    hasher = hashlib.blake2b(digest_size=20)
+    with open(file_path, "rb") as f:
+        while chunk := f.read(chunk_size):
+            hasher.update(chunk)
+    return hasher.hexdigest()
@@ -9,7 +9,7 @@ from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Optional, Callable, Dict, Any
 
-from toolkits.excel import ExcelTimeFiller, ExcelHumanLoader
+from toolkits.excel import ExcelTimeFiller, ExcelHumanLoader, ParseCache
 from toolkits.utils import NameGenerator, anonymize_names
 
 
@@ -129,7 +129,9 @@ class ExcelTimeFillerController:
             # 初始化
             self._update_progress(0.1, "初始化工具...")
             self.time_filler = ExcelTimeFiller(self.logger)
-            self.human_loader = ExcelHumanLoader(self.logger)
+            self.human_loader = ExcelHumanLoader(
+                self.logger, cache=ParseCache(logger=self.logger)
+            )
 
             # 加载人员信息
             self._update_progress(0.2, "加载人员信息...")
@@ -25,13 +25,13 @@ class FileDeleterController:
         self.processing = False
 
         # 回调函数
-        self.progress_callback: Optional[Callable[[float, str], None]] = None
+        self.progress_callback: Optional[Callable[[Optional[float], str], None]] = None
         self.log_callback: Optional[Callable[[str], None]] = None
         self.complete_callback: Optional[Callable[[bool, str], None]] = None
 
     def set_callbacks(
         self,
-        progress_callback: Optional[Callable[[float, str], None]] = None,
+        progress_callback: Optional[Callable[[Optional[float], str], None]] = None,
         log_callback: Optional[Callable[[str], None]] = None,
         complete_callback: Optional[Callable[[bool, str], None]] = None,
     ):
@@ -39,7 +39,8 @@ class FileDeleterController:
         设置回调函数
 
         Args:
-            progress_callback: 进度回调 (progress, message)
+            progress_callback: 进度回调 (progress, message)，progress 为 None 表示
+                总量未知，只更新消息
             log_callback: 日志回调 (message)
             complete_callback: 完成回调 (success, message)
         """
@@ -117,11 +118,12 @@ class FileDeleterController:
                 self.log_message(f"匹配模式: {match_mode}")
                 self.log_message(f"匹配条件: {pattern}")
 
-            # 查找文件
-            def progress_func(current, total):
+            # 查找文件（总数事先未知，进度条保持不变，只更新计数）
+            def progress_func(scanned, matched):
                 if self.progress_callback:
-                    progress = current / total if total > 0 else 0
-                    self.progress_callback(progress, f"扫描中... {current}/{total}")
+                    self.progress_callback(
+                        None, f"扫描中... 已扫描 {scanned} 个文件，匹配 {matched} 个"
+                    )
 
             matched_files, errors = self.deleter.find_files(
                 root_dir=root_dir,
@@ -174,12 +176,18 @@ class FileDeleterController:
     def delete_files(
         self,
         files: List[Path],
+        remove_empty_dirs: bool = False,
+        root_dir: Optional[str] = None,
+        staged: bool = False,
     ) -> Tuple[bool, str]:
         """
         删除文件
 
         Args:
             files: 要删除的文件列表
+            remove_empty_dirs: 是否删除因此变空的目录
+            root_dir: 搜索的根目录，只删除其中的空目录
+            staged: 暂存删除，文件移入暂存区后立即返回，由后台清理
 
         Returns:
             (success, message)
@@ -203,10 +211,19 @@ class FileDeleterController:
                     progress = current / total if total > 0 else 0
                     self.progress_callback(progress, f"删除中... {current}/{total}")
 
-            success_count, errors = self.deleter.delete_files(
-                files=files,
-                progress_callback=progress_func,
-            )
+            if staged:
+                success_count, errors = self.deleter.stage_files(
+                    files=files,
+                    progress_callback=progress_func,
+                    root_dir=root_dir,
+                )
+            else:
+                success_count, errors = self.deleter.delete_files(
+                    files=files,
+                    progress_callback=progress_func,
+                    remove_empty_dirs=remove_empty_dirs,
+                    root_dir=root_dir,
+                )
 
             # 日志输出
             if self.log_callback:
@@ -1,9 +1,10 @@
 import logging
+from collections import Counter
 from pathlib import Path
 from typing import Optional, Callable, List
 import re
 
-from toolkits.file.file_extractor import FileExtractor
+from toolkits.file.file_extractor import PLAN_ACTIONS, FileExtractor
 from toolkits.utils.file_filter import (
     FileFilterStrategy,
     NameIncludeStrategy,
@@ -69,6 +70,15 @@ class FileExtractorController:
         custom_prefix: str = "",
         custom_suffix: str = "",
         extract_target: str = "文件",
+        max_workers: int = 4,
+        link_mode: str = "复制",
+        sync_mode: str = "不同步",
+        dedup_mode: str = "不去重",
+        dry_run: bool = False,
+        resume: bool = False,
+        scan_archives: bool = False,
+        archive_format: str = "输出到文件夹",
+        archive_compression: str = "deflate / gzip",
     ):
         """开始提取文件"""
         if self.processing:
@@ -126,6 +136,50 @@ class FileExtractorController:
             }
             extract_target_value = extract_target_map.get(extract_target, "files")
 
+            # 映射输出方式
+            link_mode_map = {
+                "复制": "copy",
+                "硬链接": "hardlink",
+                "写时复制": "reflink",
+                "符号链接": "symlink",
+            }
+            link_mode_value = link_mode_map.get(link_mode, "copy")
+
+            # 映射同步模式
+            sync_mode_map = {
+                "不同步": None,
+                "比较大小与修改时间": "quick",
+                "比较内容哈希": "checksum",
+            }
+            sync_mode_value = sync_mode_map.get(sync_mode)
+
+            # 映射内容去重模式
+            dedup_mode_map = {
+                "不去重": None,
+                "跳过重复内容": "skip",
+                "重复内容硬链接": "link",
+            }
+            dedup_mode_value = dedup_mode_map.get(dedup_mode)
+
+            # 映射输出格式
+            archive_format_map = {
+                "输出到文件夹": None,
+                "zip 压缩包": "zip",
+                "tar 归档": "tar",
+            }
+            archive_format_value = archive_format_map.get(archive_format)
+
+            # 映射压缩方式
+            archive_compression_map = {
+                "不压缩（仅存储）": "store",
+                "deflate / gzip": "deflate",
+                "bzip2": "bzip2",
+                "lzma / xz": "lzma",
+            }
+            archive_compression_value = archive_compression_map.get(
+                archive_compression, "deflate"
+            )
+
             # 创建提取器
             extractor = FileExtractor(
                 logger=self.logger,
@@ -138,24 +192,49 @@ class FileExtractorController:
                 custom_prefix=custom_prefix,
                 custom_suffix=custom_suffix,
                 extract_target=extract_target_value,
+                max_workers=max_workers,
+                link_mode=link_mode_value,
+                sync_mode=sync_mode_value,
+                dedup_mode=dedup_mode_value,
+                resume=resume,
+                scan_archives=scan_archives,
+                archive_format=archive_format_value,
+                archive_compression=archive_compression_value,
             )
 
             target_label = "文件夹" if extract_target_value == "dirs" else "文件"
             self._update_progress(0.2, f"开始提取{target_label}...")
 
-            # 提取文件
-            result = extractor.extract_files()
+            def progress_func(counts: dict):
+                self._update_progress(
+                    0.5,
+                    f"已找到 {counts['found']} 个{target_label}，"
+                    f"成功 {counts['success']}，跳过 {counts['skipped']}，"
+                    f"失败 {counts['error']}",
+                )
 
-            # 构建结果消息
-            message = (
-                f"提取完成!\n"
-                f"总计: {result['total_count']} 个{target_label}\n"
-                f"成功: {result['success_count']} 个{target_label}\n"
-                f"跳过: {result['skipped_count']} 个{target_label}\n"
-                f"失败: {result['error_count']} 个{target_label}"
+            # 提取文件
+            result = extractor.extract_files(
+                progress_callback=progress_func, dry_run=dry_run
             )
 
-            self._update_progress(1.0, "提取完成!")
+            # 构建结果消息
+            if dry_run:
+                action_counts = Counter(item["action"] for item in result["plan"])
+                message = "预演完成（未修改任何文件）!\n" + "\n".join(
+                    f"{PLAN_ACTIONS[action]}: {count} 个{target_label}"
+                    for action, count in action_counts.items()
+                )
+            else:
+                message = (
+                    f"提取完成!\n"
+                    f"总计: {result['total_count']} 个{target_label}\n"
+                    f"成功: {result['success_count']} 个{target_label}\n"
+                    f"跳过: {result['skipped_count']} 个{target_label}\n"
+                    f"失败: {result['error_count']} 个{target_label}"
+                )
+
+            self._update_progress(1.0, "预演完成!" if dry_run else "提取完成!")
             self._complete(True, message)
 
         except Exception as e:
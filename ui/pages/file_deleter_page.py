@@ -496,9 +496,10 @@ class FileDeleterPage(ctk.CTkFrame):
         else:
             messagebox.showerror("删除失败", message)
 
-    def _on_progress_update(self, progress: float, message: str):
-        """进度更新回调"""
-        self.progress_bar.set(progress)
+    def _on_progress_update(self, progress: Optional[float], message: str):
+        """进度更新回调（progress 为 None 时总量未知，只更新文字）"""
+        if progress is not None:
+            self.progress_bar.set(progress)
         self.progress_label.configure(text=message)
 
     def _on_log_message(self, message: str):